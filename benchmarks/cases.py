@@ -0,0 +1,102 @@
+import numpy as np
+
+from trading_lab import kernels
+from trading_lab.indicators import indicators
+from trading_lab.strategies import strategies
+from trading_lab.backtest import metrics, monitoring, portfolio
+from trading_lab.machineLearning import data as ml_data
+
+from data import gbm_prices, ohlcv_table, price_table, signal_table, strategy_returns
+
+# -------------------------------------------------
+# Benchmark cases: name -> (setup, function)
+# setup(n_bars) builds fresh arguments for every repeat (not timed,
+# several functions modify their input table), function(*args) is timed.
+
+def _signal_arrays(n):
+    prices = gbm_prices(n)
+    specs = strategies.sma_cross_indicators({"fast_ma": 20, "slow_ma": 50})
+    values = {column: indicators.INDICATORS[name](prices, length) for column, (name, length) in specs.items()}
+    valid = ~np.isnan(values["sma_50"])
+    return prices[valid], {column: v[valid] for column, v in values.items()}
+
+def _rsi_arrays(n):
+    prices = gbm_prices(n)
+    rsi = indicators.rsi_array(prices, 14)
+    valid = ~np.isnan(rsi)
+    return prices[valid], {"RSI_14": rsi[valid]}
+
+def _pos_and_table(n):
+    df = signal_table(n)
+    return df, portfolio.signal_to_pos(df.copy())
+
+def _prices_and_pos(n):
+    prices, values = _signal_arrays(n)
+    signal = strategies.sma_cross_signal(prices, values, {"fast_ma": 20, "slow_ma": 50})
+    return prices, portfolio.signal_to_pos_array(signal)
+
+def _rets_and_pos(n):
+    prices, pos = _prices_and_pos(n)
+    return portfolio.strat_rets_array(prices, pos), pos
+
+def _sma_above(n):
+    _, values = _signal_arrays(n)
+    return (values["sma_20"] > values["sma_50"],)
+
+def _signal_matrix(n):
+    signal = signal_table(n)["signal"].to_numpy(dtype=float)
+    return (signal[:signal.size // 10 * 10].reshape(-1, 10),)
+
+def _features_and_target(n):
+    df = ohlcv_table(n)
+    return ml_data.create_features(df), ml_data.create_target(df)
+
+CASES = {
+    # indicators
+    "indicators.add_sma": (lambda n: (price_table(n), 50), indicators.add_sma),
+    "indicators.add_rsi": (lambda n: (price_table(n), 14), indicators.add_rsi),
+    "indicators.sma_array": (lambda n: (gbm_prices(n), 50), indicators.sma_array),
+    "indicators.rsi_array": (lambda n: (gbm_prices(n), 14), indicators.rsi_array),
+    # strategies
+    "strategies.sma_cross": (lambda n: (price_table(n), 20, 50), strategies.sma_cross),
+    "strategies.rsi_cross": (lambda n: (price_table(n), 14), strategies.rsi_cross),
+    "strategies.sma_cross_signal": (lambda n: (*_signal_arrays(n), {"fast_ma": 20, "slow_ma": 50}),
+                                    strategies.sma_cross_signal),
+    "strategies.rsi_cross_signal": (lambda n: (*_rsi_arrays(n), {"length": 14, "strips": [30, 70]}),
+                                    strategies.rsi_cross_signal),
+    # kernels
+    "kernels.cross_signal": (_sma_above, kernels.cross_signal),
+    "kernels.threshold_signal": (lambda n: (_rsi_arrays(n)[1]["RSI_14"], 30.0, 70.0), kernels.threshold_signal),
+    "kernels.signal_to_pos": (lambda n: (signal_table(n)["signal"].to_numpy(),), kernels.signal_to_pos),
+    "kernels.signal_to_pos_columns": (_signal_matrix, kernels.signal_to_pos_columns),
+    # backtest.portfolio
+    "portfolio.signal_to_pos": (lambda n: (signal_table(n),), portfolio.signal_to_pos),
+    "portfolio.strat_rets": (_pos_and_table, portfolio.strat_rets),
+    "portfolio.equity_curve": (lambda n: (strategy_returns(n),), portfolio.equity_curve),
+    "portfolio.signal_to_pos_array": (lambda n: (signal_table(n)["signal"].to_numpy(),), portfolio.signal_to_pos_array),
+    "portfolio.strat_rets_array": (_prices_and_pos, portfolio.strat_rets_array),
+    "portfolio.equity_curve_array": (lambda n: (strategy_returns(n).to_numpy(),), portfolio.equity_curve_array),
+    "portfolio.trade_ledger": (lambda n: (*_prices_and_pos(n), None, None, 0.001, 5.0), portfolio.trade_ledger),
+    "portfolio.apply_costs": (lambda n: (*_rets_and_pos(n), 0.001, 5.0), portfolio.apply_costs),
+    # backtest.metrics
+    "metrics.annualized_ret": (lambda n: (strategy_returns(n),), metrics.annualized_ret),
+    "metrics.annualized_vol": (lambda n: (strategy_returns(n),), metrics.annualized_vol),
+    "metrics.sharpe_ratio": (lambda n: (strategy_returns(n),), metrics.sharpe_ratio),
+    "metrics.max_drawdown": (lambda n: ((1 + strategy_returns(n)).cumprod(),), metrics.max_drawdown),
+    "metrics.win_rate": (lambda n: (strategy_returns(n),), metrics.win_rate),
+    "metrics.profit_factor": (lambda n: (strategy_returns(n),), metrics.profit_factor),
+    "metrics.summary_stats": (lambda n: (strategy_returns(n),), metrics.summary_stats),
+    "metrics.summary_stats_matrix": (lambda n: (strategy_returns(n).to_numpy().reshape(-1, 10),),
+                                     metrics.summary_stats_matrix),
+    "metrics.fused_stats": (lambda n: (strategy_returns(n).to_numpy().reshape(-1, 10),), metrics.fused_stats),
+    "metrics.trade_stats": (lambda n: (portfolio.trade_ledger(*_prices_and_pos(n), fee=0.001),), metrics.trade_stats),
+    # backtest.monitoring
+    "monitoring.OnlineStats.update_many": (lambda n: (monitoring.OnlineStats(), strategy_returns(n).to_numpy()),
+                                           monitoring.OnlineStats.update_many),
+    "monitoring.rolling_stats": (lambda n: (strategy_returns(n),), monitoring.rolling_stats),
+    # machineLearning.data
+    "ml.create_features": (lambda n: (ohlcv_table(n),), ml_data.create_features),
+    "ml.create_target": (lambda n: (ohlcv_table(n),), ml_data.create_target),
+    "ml.train_test_split": (_features_and_target, ml_data.train_test_split),
+    "ml.process_data": (lambda n: (ohlcv_table(n),), ml_data.process_data),
+}
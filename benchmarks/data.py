@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic inputs for the benchmarks: geometric Brownian motion prices
+
+def gbm_prices(n_bars: int, seed: int = 0, mu: float = 0.0003, sigma: float = 0.015) -> np.ndarray:
+    """
+    Geometric Brownian motion price path starting at 100
+    """
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(mu, sigma, n_bars)))
+
+def price_table(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Table with a single 'adj close' column, as returned by import_yahoo(raw=False)
+    """
+    index = pd.date_range("1990-01-01", periods=n_bars, freq="min")
+    df = pd.DataFrame({"adj close": gbm_prices(n_bars, seed)}, index=index)
+    df.attrs["name"] = "GBM"
+    return df
+
+def ohlcv_table(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Raw OHLCV table, as returned by import_yahoo(raw=True)
+    """
+    rng = np.random.default_rng(seed + 1)
+    close = gbm_prices(n_bars, seed)
+    index = pd.date_range("1990-01-01", periods=n_bars, freq="min")
+    df = pd.DataFrame({
+        "Adj Close": close,
+        "Close": close,
+        "High": close * (1 + np.abs(rng.normal(0, 0.005, n_bars))),
+        "Low": close * (1 - np.abs(rng.normal(0, 0.005, n_bars))),
+        "Open": close * (1 + rng.normal(0, 0.002, n_bars)),
+        "Volume": rng.integers(100_000, 1_000_000, n_bars).astype(float),
+    }, index=index)
+    df.attrs["name"] = "GBM"
+    return df
+
+def signal_table(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Price table with the 'signal' column of a 20/50 SMA crossover
+    """
+    from trading_lab.strategies.strategies import sma_cross
+    return sma_cross(price_table(n_bars, seed), fast_ma=20, slow_ma=50)
+
+def strategy_returns(n_bars: int, seed: int = 0) -> pd.Series:
+    """
+    Daily-like strategy returns, about half of the bars out of the market
+    """
+    rng = np.random.default_rng(seed)
+    rets = rng.normal(0.0003, 0.012, n_bars)
+    rets[rng.random(n_bars) < 0.5] = 0.0
+    return pd.Series(rets, index=pd.date_range("1990-01-01", periods=n_bars, freq="min"))
@@ -0,0 +1,86 @@
+"""
+Import-time budget of trading_lab modules
+
+    python benchmarks/imports.py                  # every module, default budgets
+    python benchmarks/imports.py --filter backtest --repeat 7
+    python benchmarks/imports.py --scale 2        # slower machine, doubled budgets
+
+Each module is imported in a fresh interpreter (like a pool worker
+or a CLI call), the median wall time is kept. The run fails (exit
+code 1) when a module is over its budget, or when importing it
+loads one of the HEAVY optional dependencies.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Budgets in seconds, pandas + numpy alone take most of them
+MODULES = {
+    "trading_lab": 0.05,
+    "trading_lab.cli": 0.1,
+    "trading_lab.config": 0.05,
+    "trading_lab.profiling": 0.05,
+    "trading_lab.indicators.indicators": 0.5,
+    "trading_lab.backtest.metrics": 0.5,
+    "trading_lab.backtest.engine": 0.5,
+    "trading_lab.backtest.batch": 0.5,
+    "trading_lab.backtest.visuals": 0.5,
+    "trading_lab.data.store": 0.5,
+    "trading_lab.machineLearning.models": 0.5,
+    "trading_lab.machineLearning.search": 0.5,
+    "trading_lab.machineLearning.strategy": 0.5,
+}
+
+# Optional dependencies that must only load on first use
+HEAVY = ["xgboost", "sklearn", "matplotlib", "yfinance", "numba"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"time_s": elapsed, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    """
+    Median import time of a module in fresh interpreters, and the heavy modules it loaded
+    """
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY)],
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout))
+    return {"time_s": statistics.median(run["time_s"] for run in runs), "heavy": runs[-1]["heavy"]}
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="trading_lab import-time budget")
+    parser.add_argument("--filter", default="", help="only modules whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per module (median kept)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module, budget in MODULES.items():
+        if args.filter not in module:
+            continue
+        res = measure(module, args.repeat)
+        budget *= args.scale
+        status = "ok" if res["time_s"] <= budget and not res["heavy"] else "FAIL"
+        print(f"{module:<40} | {res['time_s'] * 1e3:>8.1f} ms | budget {budget * 1e3:>6.0f} ms | {status}"
+              + (f" | loaded {', '.join(res['heavy'])}" if res["heavy"] else ""), flush=True)
+        if status == "FAIL":
+            failures.append(module)
+
+    if failures:
+        print(f"\n⚠️ {len(failures)} module(s) over budget or loading heavy dependencies: {', '.join(failures)}")
+        return 1
+    print("\n✅ Every module within its import budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Benchmark suite for the hot paths of trading_lab
+
+    python benchmarks/run.py                              # 1k, 100k and 10M bars
+    python benchmarks/run.py --sizes 1k,100k --filter metrics
+    python benchmarks/run.py --save baseline.json         # record a baseline
+    python benchmarks/run.py --compare baseline.json --threshold 0.25
+
+Each case is timed 'repeat' times on fresh inputs (median kept), then run
+once more under tracemalloc for its peak memory. With --compare the run
+fails (exit code 1) when a case is slower, or uses more memory, than the
+baseline by more than the threshold.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cases import CASES
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+
+
+def bench_case(setup, function, n_bars: int, repeat: int) -> dict:
+    """
+    Median wall time and peak traced memory of one case at one size
+    """
+    times = []
+    for _ in range(repeat):
+        args = setup(n_bars)
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+
+    args = setup(n_bars)
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"time_s": statistics.median(times), "peak_mb": peak / 2**20}
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Regressions of results against a baseline, as readable lines
+    """
+    regressions = []
+    for case, sizes in results.items():
+        for size, res in sizes.items():
+            ref = baseline.get(case, {}).get(size)
+            if ref is None:
+                continue
+            for metric in ("time_s", "peak_mb"):
+                if ref[metric] > 0 and res[metric] > ref[metric] * (1 + threshold):
+                    regressions.append(f"{case} [{size}] {metric}: {ref[metric]:.4g} -> {res[metric]:.4g} "
+                                       f"(+{res[metric] / ref[metric] - 1:.0%})")
+    return regressions
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="trading_lab benchmarks")
+    parser.add_argument("--sizes", default="1k,100k,10M", help="comma separated, among " + ",".join(SIZES))
+    parser.add_argument("--filter", default="", help="only cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (median kept)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes.split(",")
+    results = {}
+    for case, (setup, function) in CASES.items():
+        if args.filter not in case:
+            continue
+        results[case] = {}
+        for size in sizes:
+            # Big inputs are slow to build, fewer repeats
+            repeat = args.repeat if SIZES[size] < 1_000_000 else 1
+            res = bench_case(setup, function, SIZES[size], repeat)
+            results[case][size] = res
+            print(f"{case:<36} {size:>5} | {res['time_s'] * 1e3:>10.2f} ms | {res['peak_mb']:>9.1f} MB", flush=True)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=1))
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.threshold)
+        if regressions:
+            print(f"\n⚠️ {len(regressions)} regression(s) above {args.threshold:.0%}:")
+            print("\n".join(regressions))
+            return 1
+        print(f"\n✅ No regression above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,14 @@
+import importlib
+
+# Subpackages are imported on first attribute access (PEP 562),
+# 'import trading_lab' alone loads nothing heavy.
+
+_SUBPACKAGES = ("backtest", "data", "indicators", "machineLearning", "strategies")
+
+def __getattr__(name: str):
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__() -> list:
+    return sorted(list(globals()) + list(_SUBPACKAGES))
@@ -0,0 +1,36 @@
+import functools
+
+from trading_lab.config import USE_NUMBA
+
+# -------------------------------------------------
+# Optional Numba: a kernel is written as a plain loop and
+# compiled on its first call; without numba (or with
+# TRADING_LAB_NUMBA=0) its NumPy fallback runs instead.
+# Importing numba is slow, so nothing happens at import time.
+
+def jit_kernel(fallback):
+    """
+    Decorator compiling a loop kernel with numba.njit on first call
+
+    :param fallback: Vectorized NumPy function with the same signature and results
+    """
+    def decorator(loop):
+        compiled = {}
+
+        @functools.wraps(loop)
+        def kernel(*args):
+            if "fn" not in compiled:
+                compiled["fn"] = fallback
+                if USE_NUMBA:
+                    try:
+                        import numba
+                        compiled["fn"] = numba.njit(cache=True, error_model="numpy")(loop)
+                    except ImportError:
+                        pass
+            return compiled["fn"](*args)
+
+        kernel.loop = loop
+        kernel.fallback = fallback
+        return kernel
+
+    return decorator
@@ -0,0 +1,154 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trading_lab import profiling
+from trading_lab.backtest.engine import run_backtest
+from trading_lab.backtest.metrics import summary_stats
+from trading_lab.data.store import PriceProvider, load_panel
+from trading_lab.strategies.protocol import Strategy
+from trading_lab.strategies.strategies import STRATEGIES
+
+# -------------------------------------------------
+# Universe backtests: one strategy config over many tickers.
+# Prices are aligned once into a (tickers x dates) matrix saved
+# as .npy, every worker memory-maps it in its initializer and
+# only receives lists of row numbers afterwards.
+# When a profiler is active, each task records its own stages
+# and sends them back with its results, they are merged into it.
+
+_WORKER = {}
+
+def _init_worker(path: str, index: pd.Index, strategy: Strategy, params: dict,
+                 rf: float, periods_per_year: int, profile: dict | None = None) -> None:
+    _WORKER.update(prices=np.load(path, mmap_mode="r"), index=index, strategy=strategy,
+                   params=params, rf=rf, periods_per_year=periods_per_year, profile=profile)
+
+def _run_rows(rows: list) -> tuple:
+    """
+    Backtest some rows of the memory-mapped price matrix, and the stages recorded if profiled
+    """
+    if _WORKER["profile"] is None:
+        return _backtest_rows(rows), None
+    with profiling.profiling(**_WORKER["profile"]) as profiler:
+        out = _backtest_rows(rows)
+    return out, profiler.to_dict()
+
+def _backtest_rows(rows: list) -> list:
+    out = []
+    for row in rows:
+        prices = np.asarray(_WORKER["prices"][row], dtype=float)
+
+        # Trim the dates before listing / after delisting
+        listed = np.flatnonzero(~np.isnan(prices))
+        if listed.size == 0:
+            out.append((row, None, "no price"))
+            continue
+        first, last = listed[0], listed[-1] + 1
+        series = pd.Series(prices[first:last], index=_WORKER["index"][first:last])
+
+        try:
+            res = run_backtest(_WORKER["strategy"], series, params=_WORKER["params"])
+        except ValueError as e:
+            out.append((row, None, str(e)))
+            continue
+
+        stats = summary_stats(res["rets"], rf=_WORKER["rf"], periods_per_year=_WORKER["periods_per_year"])
+        out.append((row, stats["Strategy"].to_dict(), None))
+    return out
+
+def run_batch(prices: pd.DataFrame, strategy: Strategy | str, params: dict | None = None,
+              n_workers: int | None = None, chunksize: int = 16,
+              rf: float = 0.00, periods_per_year: int = 252, profile: bool = False) -> pd.DataFrame | tuple:
+    """
+    Backtest one strategy config on every column of a price table
+
+    :param prices: Adjusted close prices, table (dates x tickers)
+    :param strategy: Strategy or its name in STRATEGIES
+    :param params: Strategy parameters, overriding strategy.params
+    :param n_workers: Worker processes, os.cpu_count() by default, 1 runs in process
+    :param chunksize: Tickers per task
+    :param rf: Annual risk free rate
+    :param periods_per_year: Number of periods per year
+    :param profile: Also return the time spent in each stage, summed over the workers
+    :return: One row per ticker with the summary_stats metrics and an 'error' column,
+             and the stage breakdown if profile
+    :rtype: DataFrame | tuple
+    """
+    if profile:
+        with profiling.profiling() as profiler:
+            res = run_batch(prices, strategy, params=params, n_workers=n_workers, chunksize=chunksize,
+                            rf=rf, periods_per_year=periods_per_year)
+        return res, profiler.summary()
+
+    if isinstance(strategy, str):
+        strategy = STRATEGIES[strategy]
+    params = params or {}
+    n_workers = n_workers or os.cpu_count()
+
+    tickers = list(prices.columns)
+    chunks = [list(range(i, min(i + chunksize, len(tickers)))) for i in range(0, len(tickers), chunksize)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "prices.npy")
+        np.save(path, np.ascontiguousarray(prices.to_numpy(dtype=float).T))
+        initargs = (path, prices.index, strategy, params, rf, periods_per_year)
+
+        if n_workers == 1:
+            # In process, the stages go straight to the active profiler
+            _init_worker(*initargs)
+            try:
+                results = [_run_rows(chunk) for chunk in chunks]
+            finally:
+                _WORKER.clear()         # Releases the memmap before the directory is removed
+        else:
+            active = profiling.active()
+            worker_profile = {"trace": active.trace, "memory": active.memory} if active is not None else None
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=initargs + (worker_profile,)) as pool:
+                results = list(pool.map(_run_rows, chunks))
+
+    for _, state in results:
+        if state is not None:
+            profiling.active().merge(state)
+    results = [out for out, _ in results]
+
+    rows = []
+    for row, stats, error in (item for chunk in results for item in chunk):
+        rows.append({"ticker": tickers[row], **(stats or {}), "error": error})
+
+    res = pd.DataFrame(rows).set_index("ticker")
+    n_failed = res["error"].notna().sum()
+    if n_failed:
+        print(f"⚠️ {n_failed}/{len(res)} tickers could not be backtested")
+    return res
+
+def run_universe(tickers: list, strategy: Strategy | str, start: str, end: str,
+                 params: dict | None = None, n_workers: int | None = None, chunksize: int = 16,
+                 root: Path | str | None = None, provider: PriceProvider | None = None,
+                 offline: bool = False, rf: float = 0.00, periods_per_year: int = 252) -> pd.DataFrame:
+    """
+    Backtest one strategy config over a ticker universe read from the price store
+
+    :param tickers: Tickers
+    :param strategy: Strategy or its name in STRATEGIES
+    :param start: First date (inclusive)
+    :param end: Last date (exclusive)
+    :param params: Strategy parameters, overriding strategy.params
+    :param n_workers: Worker processes, os.cpu_count() by default, 1 runs in process
+    :param chunksize: Tickers per task
+    :param root: Price store root, defaults to config.PRICE_STORE_DIR
+    :param provider: Price provider for missing dates, yahoo_provider by default
+    :param offline: Only use the prices already stored
+    :param rf: Annual risk free rate
+    :param periods_per_year: Number of periods per year
+    :return: One row per ticker with the summary_stats metrics and an 'error' column
+    :rtype: DataFrame
+    """
+    prices = load_panel(tickers, start, end, field="Adj Close", root=root, provider=provider, offline=offline)
+    return run_batch(prices, strategy, params=params, n_workers=n_workers, chunksize=chunksize,
+                     rf=rf, periods_per_year=periods_per_year)
@@ -0,0 +1,184 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.backtest.metrics import summary_stats
+from trading_lab.profiling import timed
+
+# -------------------------------------------------
+# Multi-asset book: per-ticker positions (same convention as
+# signal_to_pos) are combined into one portfolio.
+# Everything runs on aligned (dates x assets) arrays, the only
+# loop is over dates:
+#   - weights drift with the asset returns between rebalances
+#   - on rebalance dates, and on every date where the set of held
+#     assets changes (an entry or an exit), the weights are reset to
+#     the target of the scheme over the assets held at that date
+#   - the uninvested part is cash, earning cash_rate
+
+SCHEMES = ("equal", "inverse_vol", "signal")
+
+@dataclass
+class BookResult:
+    """
+    Output of run_book
+
+    :param rets: Book returns
+    :param eq_curve: Book equity
+    :param weights: Weights after trading at the close of each date, shape (dates, assets)
+    :param cash: Cash weight at the close of each date
+    :param turnover: Traded weight (sum of |weight changes|) at each date
+    :param assets: Asset names, columns of weights
+    """
+    rets: pd.Series
+    eq_curve: pd.Series
+    weights: np.ndarray
+    cash: pd.Series
+    turnover: pd.Series
+    assets: list
+
+    def weights_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.weights, index=self.rets.index, columns=self.assets)
+
+    def summary(self, rf: float = 0.00, periods_per_year: int = 252, extended: bool = False) -> pd.DataFrame:
+        """
+        Book-level summary_stats, 'Exposure' is the share of dates with something invested
+        """
+        return summary_stats(self.rets, rf=rf, periods_per_year=periods_per_year, eq_curve=self.eq_curve,
+                             pos=1 - self.cash, extended=extended)
+
+
+def _rebalance_mask(index: pd.Index, n_dates: int, rebalance: int | str | None) -> np.ndarray:
+    """
+    True on rebalance dates: every 'rebalance' bars, or the last bar of each pandas period ('W', 'M', ...)
+    """
+    mask = np.zeros(n_dates, dtype=bool)
+    mask[0] = True
+    if rebalance is None:
+        return mask
+    if isinstance(rebalance, str):
+        if not isinstance(index, pd.DatetimeIndex):
+            raise ValueError("⚠️ A calendar rebalance needs dates as index")
+        periods = index.to_period(rebalance).asi8
+        mask[:-1] |= periods[1:] != periods[:-1]
+        return mask
+    mask[::rebalance] = True
+    return mask
+
+def _target_weights(scheme: str, held: np.ndarray, rets: np.ndarray, t: int, vol_window: int,
+                    scores: np.ndarray | None, max_weight: float | None) -> np.ndarray:
+    """
+    Target weights at date t over the held assets, summing to 1 (0 if nothing is held)
+    """
+    if scheme == "equal":
+        raw = held.astype(float)
+    elif scheme == "inverse_vol":
+        window = rets[max(1, t - vol_window + 1):t + 1]
+        raw = np.zeros(held.size)
+        if window.shape[0] > 1:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                vol = np.nanstd(window[:, held], axis=0)
+                raw[held] = np.where(vol > 0, 1 / vol, 0.0)
+    else:
+        raw = np.where(held, np.nan_to_num(np.maximum(scores[t], 0)), 0.0)
+
+    total = raw.sum()
+    if total <= 0:
+        return raw * 0
+    weights = raw / total
+    if max_weight is not None:
+        weights = np.minimum(weights, max_weight)        # The excess stays in cash
+    return weights
+
+@timed("book.run_book")
+def run_book(prices: pd.DataFrame | np.ndarray, pos: pd.DataFrame | np.ndarray, scheme: str = "equal",
+             rebalance: int | str | None = 21, scores: pd.DataFrame | np.ndarray | None = None,
+             vol_window: int = 63, invested: float = 1.0, max_weight: float | None = None,
+             cash_rate: float = 0.0, fee: float = 0.0, slippage_bps: float = 0.0,
+             init_wealth: float = 1000, periods_per_year: int = 252) -> BookResult:
+    """
+    Combine per-asset long only positions into one book
+
+    :param prices: Adjusted close prices, (dates x assets), NaN before listing / after delisting
+    :param pos: Positions (1 or 0), same shape, e.g. signal_to_pos of each ticker
+    :param scheme: 'equal', 'inverse_vol' (1 / trailing volatility) or 'signal' (proportional to scores)
+    :param rebalance: Every n dates, a pandas period alias ('W', 'M', 'Q') or None (only when the held assets change)
+    :param scores: Signal strength (dates x assets) for the 'signal' scheme, negative scores get 0
+    :param vol_window: Trailing window of the 'inverse_vol' scheme
+    :param invested: Share of the book allocated on rebalance dates, the rest stays in cash
+    :param max_weight: Cap on a single asset weight, the excess stays in cash
+    :param cash_rate: Annual rate earned by cash
+    :param fee: Proportional fee on the traded weight
+    :param slippage_bps: Slippage on the traded weight, in bps
+    :param init_wealth: Initial wealth
+    :param periods_per_year: Number of periods per year, to convert cash_rate
+    :return: Book returns, equity, weights, cash and turnover
+    :rtype: BookResult
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"⚠️ scheme must be one of {SCHEMES}")
+    if scheme == "signal" and scores is None:
+        raise ValueError("⚠️ The 'signal' scheme needs scores")
+
+    index = prices.index if isinstance(prices, pd.DataFrame) else pd.RangeIndex(len(prices))
+    assets = list(prices.columns) if isinstance(prices, pd.DataFrame) else list(range(np.shape(prices)[1]))
+    prices = np.asarray(prices, dtype=float)
+    pos = np.asarray(pos, dtype=float)
+    scores = np.asarray(scores, dtype=float) if scores is not None else None
+    if pos.shape != prices.shape or (scores is not None and scores.shape != prices.shape):
+        raise ValueError("⚠️ prices, pos and scores must have the same (dates x assets) shape")
+
+    n_dates, n_assets = prices.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        asset_rets = np.empty_like(prices)
+        asset_rets[0] = np.nan
+        asset_rets[1:] = prices[1:] / prices[:-1] - 1
+    held = (pos != 0) & ~np.isnan(prices)
+    clean_rets = np.nan_to_num(asset_rets, nan=0.0, posinf=0.0, neginf=0.0)
+
+    rebalance_on = _rebalance_mask(index, n_dates, rebalance)
+    cash_ret = cash_rate / periods_per_year
+    cost = fee + slippage_bps / 1e4
+
+    weights = np.zeros((n_dates, n_assets))
+    book_rets = np.zeros(n_dates)
+    cash = np.ones(n_dates)
+    turnover = np.zeros(n_dates)
+
+    w = np.zeros(n_assets)
+    c = 1.0
+    for t in range(n_dates):
+        # Returns of the weights held since the previous close, then drift
+        if t:
+            growth = w * (1 + clean_rets[t])
+            c *= 1 + cash_ret
+            total = growth.sum() + c
+            book_rets[t] = total - 1
+            w = growth / total
+            c /= total
+
+        # Entries and exits trade at the target, in between the weights drift
+        new_w = w
+        if rebalance_on[t] or (t and (held[t] != held[t - 1]).any()):
+            new_w = invested * _target_weights(scheme, held[t], asset_rets, t, vol_window, scores, max_weight)
+
+        traded = np.abs(new_w - w).sum()
+        if traded:
+            c += w.sum() - new_w.sum()
+            w = new_w
+            turnover[t] = traded
+            if cost:
+                book_rets[t] = (1 + book_rets[t]) * (1 - traded * cost) - 1
+
+        weights[t] = w
+        cash[t] = c
+
+    book_rets[np.abs(book_rets) <= 1e-12] = 0.0
+    rets = pd.Series(book_rets, index=index, name="rets")
+    return BookResult(rets=rets,
+                      eq_curve=(init_wealth * (1 + rets).cumprod()).rename("eq_curve"),
+                      weights=weights,
+                      cash=pd.Series(cash, index=index, name="cash"),
+                      turnover=pd.Series(turnover, index=index, name="turnover"),
+                      assets=assets)
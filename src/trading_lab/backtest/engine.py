@@ -1,44 +1,132 @@
+import numpy as np
 import pandas as pd
 
-from trading_lab.backtest.portfolio import signal_to_pos, strat_rets, equity_curve
-from trading_lab.data.loaders import import_yahoo
-from trading_lab.strategies.strategies import sma_cross, rsi_cross
-from trading_lab.indicators.indicators import add_sma, add_rsi
+from trading_lab import profiling
+from trading_lab.backtest.portfolio import signal_to_pos_array, strat_rets_array, equity_curve_array
+from trading_lab.data.store import import_cached
+from trading_lab.strategies.protocol import Strategy
+from trading_lab.strategies.strategies import SMA_CROSS, RSI_CROSS
+from trading_lab.indicators.indicators import INDICATORS
+from trading_lab.indicators.cache import IndicatorCache, default_cache, fingerprint
+
+# -------------------------------------------------
+# Generic engine: prices -> indicators -> signal -> pos -> rets -> equity curve
+# for any Strategy, on NumPy arrays, a single table is built at the end
+# Each step is a profiling stage (engine.indicators, engine.signal, ...)
+
+def compute_indicators(prices: np.ndarray, specs: dict, cache: dict | IndicatorCache | None = None) -> dict:
+    """
+    Compute the indicators declared by a strategy
+
+    :param prices: Prices
+    :param specs: {column name: (indicator, length)} as returned by Strategy.indicators
+    :param cache: Dict shared between strategies run on the same prices, filled in place,
+                  or an IndicatorCache shared across price series
+    :return: {column name: indicator array}
+    :rtype: dict
+    """
+    if isinstance(cache, IndicatorCache):
+        key = fingerprint(prices)
+        return {column: cache.get(prices, indicator, length, key=key)
+                for column, (indicator, length) in specs.items()}
+
+    cache = {} if cache is None else cache
+    values = {}
+    for column, (indicator, length) in specs.items():
+        if (indicator, length) not in cache:
+            cache[(indicator, length)] = INDICATORS[indicator](prices, length)
+        values[column] = cache[(indicator, length)]
+    return values
+
+def _prices_array(prices: pd.Series | pd.DataFrame | np.ndarray) -> tuple:
+    if isinstance(prices, pd.DataFrame):
+        prices = prices["adj close"]
+    if isinstance(prices, pd.Series):
+        return prices.to_numpy(dtype=float), prices.index
+    prices = np.asarray(prices, dtype=float)
+    return prices, pd.RangeIndex(prices.size)
+
+def run_backtest(strategy: Strategy, prices: pd.Series | pd.DataFrame | np.ndarray,
+                 params: dict | None = None, cache: dict | IndicatorCache | None = None,
+                 init_wealth: float = 1000, profile: bool = False) -> pd.DataFrame | tuple:
+    """
+    Backtest any strategy on a price series
+
+    :param strategy: Strategy to run (e.g. SMA_CROSS, RSI_CROSS)
+    :param prices: Adjusted close prices (Series, array or table with 'adj close')
+    :param params: Strategy parameters, overriding strategy.params
+    :param cache: Indicator dict shared between runs on the same prices, or an IndicatorCache
+    :param init_wealth: Initial wealth of the equity curve
+    :param profile: Also return the time spent in each stage (profiling.Profiler.summary)
+    :return: Table with 'pos', 'rets' and 'eq_curve', warm-up rows dropped,
+             and the stage breakdown if profile
+    :rtype: DataFrame | tuple
+    """
+    if profile:
+        with profiling.profiling() as profiler:
+            res = run_backtest(strategy, prices, params=params, cache=cache, init_wealth=init_wealth)
+        return res, profiler.summary()
+
+    params = {**strategy.params, **(params or {})}
+    prices, index = _prices_array(prices)
+
+    with profiling.stage("engine.indicators"):
+        indicators = compute_indicators(prices, strategy.indicators(params), cache=cache)
+
+        # Drop rows where the price or any indicator is missing (warm-up)
+        valid = ~np.isnan(prices)
+        for values in indicators.values():
+            valid &= ~np.isnan(values)
+        prices = prices[valid]
+        indicators = {column: values[valid] for column, values in indicators.items()}
+
+    with profiling.stage("engine.signal"):
+        signal = strategy.signal(prices, indicators, params)
+    with profiling.stage("engine.positions"):
+        pos = signal_to_pos_array(signal)
+    with profiling.stage("engine.returns"):
+        rets = strat_rets_array(prices, pos)
+        rets[np.abs(rets) <= 1e-12] = 0.0
+        eq_curve = equity_curve_array(rets, init_wealth=init_wealth)
+
+    return pd.DataFrame({"pos": pos, "rets": rets, "eq_curve": eq_curve}, index=index[valid])
+
+def run_backtests(runs: list, prices: pd.Series | pd.DataFrame | np.ndarray,
+                  cache: IndicatorCache | None = None, init_wealth: float = 1000) -> list:
+    """
+    Backtest several (strategy, params) on the same prices,
+    shared indicators are computed once
+
+    :param runs: List of (strategy, params) tuples
+    :param prices: Adjusted close prices (Series, array or table with 'adj close')
+    :param cache: IndicatorCache to use, a dict local to this call by default
+    :param init_wealth: Initial wealth of the equity curves
+    :return: One run_backtest table per run
+    :rtype: list
+    """
+    cache = {} if cache is None else cache
+    return [run_backtest(strategy, prices, params=params, cache=cache, init_wealth=init_wealth)
+            for strategy, params in runs]
+
+def _rounded(res: pd.DataFrame) -> pd.DataFrame:
+    res["rets"] = res["rets"].round(4)
+    res["eq_curve"] = res["eq_curve"].round(2)
+    return res
 
 def engine_sma(ticker: str, start: str, end: str, fast_sma: int, slow_sma: int) -> pd.DataFrame:
     """
     Docstring
-    Computes signal, pos, returns and equity curve in a single table 
+    Computes signal, pos, returns and equity curve in a single table
     Used later in summary stats to backtest the strategy
     """
-    # Import data and indicators (maybe outside)
-    df = import_yahoo(ticker=ticker, start=start, end=end, raw=False)
-    df = add_sma(df=df, length=fast_sma)
-    df = add_sma(df=df, length=slow_sma)
-
-    # Create signal column with strategy
-    df = sma_cross(df=df, fast_ma=fast_sma, slow_ma=slow_sma)
-
-    # Compute pos, rets and equity curve
-    pos = signal_to_pos(df=df)
-    rets = strat_rets(df=df, pos=pos)
-    eq_curve = equity_curve(rets=rets)
-
-    res = pd.DataFrame()
-    res["pos"] = pos
-    res["rets"] = (rets.where(rets.abs() > 1e-12, 0.0)).round(4)
-    res["eq_curve"] = eq_curve.round(2)
-    
-    # Continue to print summary stats
-    # engine doit etre générique pour toute les stratégies
-    # pipeline import -> strat -> engine -> metrics
-
-    return res
+    df = import_cached(ticker=ticker, start=start, end=end, raw=False)
+    res = run_backtest(SMA_CROSS, df, params={"fast_ma": fast_sma, "slow_ma": slow_sma}, cache=default_cache())
+    return _rounded(res)
 
 def engine_rsi(ticker: str, start: str, end:str, length:int, strips: list = [30, 70]) -> pd.DataFrame:
     """
     Docstring pour engine_rsi
-    
+
     :param ticker: Description
     :type ticker: str
     :param start: Description
@@ -50,19 +138,6 @@ def engine_rsi(ticker: str, start: str, end:str, length:int, strips: list = [30,
     :return: Description
     :rtype: DataFrame
     """
-    df = import_yahoo(ticker=ticker, start=start, end=end, raw=False)
-    df = add_rsi(df=df, length=length)
-
-    df = rsi_cross(df=df, length=length, strips=strips)
-
-    # Compute pos, rets and equity curve
-    pos = signal_to_pos(df=df)
-    rets = strat_rets(df=df, pos=pos)
-    eq_curve = equity_curve(rets=rets)
-
-    res = pd.DataFrame()
-    res["pos"] = pos
-    res["rets"] = (rets.where(rets.abs() > 1e-12, 0.0)).round(4)
-    res["eq_curve"] = eq_curve.round(2)
-
-    return res
\ No newline at end of file
+    df = import_cached(ticker=ticker, start=start, end=end, raw=False)
+    res = run_backtest(RSI_CROSS, df, params={"length": length, "strips": strips}, cache=default_cache())
+    return _rounded(res)
@@ -0,0 +1,211 @@
+import csv
+import math
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from trading_lab.indicators.streaming import RollingSMA, WilderRSI
+from trading_lab.strategies.protocol import Strategy
+from trading_lab.strategies.strategies import STRATEGIES
+
+# -------------------------------------------------
+# Event driven mode: bars go one at a time through a streaming
+# strategy and a position tracker, with constant memory.
+# Same long only rules as signal_to_pos -> strat_rets -> equity_curve,
+# so rows match run_backtest exactly. A row is emitted one bar late,
+# once we know it is not the last one (force-closed at the end).
+
+# ------------ Streaming strategies ------------
+
+class StreamingSMACross:
+    """
+    Bar by bar sma_cross, on_bar returns None during the warm-up
+    """
+    def __init__(self, fast_ma: int, slow_ma: int):
+        if fast_ma >= slow_ma:
+            raise ValueError("⚠️ fast must be < than slow")
+        self.fast = RollingSMA(fast_ma)
+        self.slow = RollingSMA(slow_ma)
+        self.prev_fast_above = None
+
+    def on_bar(self, price: float) -> int | None:
+        fast, slow = self.fast.update(price), self.slow.update(price)
+        if math.isnan(price) or math.isnan(fast) or math.isnan(slow):
+            return None
+
+        fast_above = fast > slow
+        signal = 0
+        if self.prev_fast_above is not None:
+            if fast_above and not self.prev_fast_above:
+                signal = 1
+            elif not fast_above and self.prev_fast_above:
+                signal = -1
+        self.prev_fast_above = fast_above
+        return signal
+
+
+class StreamingRSICross:
+    """
+    Bar by bar rsi_cross, on_bar returns None during the warm-up
+    """
+    def __init__(self, length: int, strips: list = [30, 70]):
+        if length <= 0:
+            raise ValueError("⚠️ length must be positive")
+        self.rsi = WilderRSI(length)
+        self.lower_strip, self.upper_strip = strips
+        if self.upper_strip < self.lower_strip:
+            raise ValueError("⚠️ The upper strip must not be below the lower strip")
+        self.prev_above = None
+        self.prev_below = None
+        self.position = 0
+
+    def on_bar(self, price: float) -> int | None:
+        rsi = self.rsi.update(price)
+        if math.isnan(price) or math.isnan(rsi):
+            return None
+
+        rsi_above, rsi_below = rsi > self.upper_strip, rsi < self.lower_strip
+        raw_signal = 0
+        if self.prev_above is not None:
+            if rsi_below and not self.prev_below:
+                raw_signal = -1
+            elif rsi_above and not self.prev_above:
+                raw_signal = 1
+        self.prev_above, self.prev_below = rsi_above, rsi_below
+
+        prev_position = self.position
+        if raw_signal != 0:
+            self.position = raw_signal
+        return max(-1, min(1, self.position - prev_position))
+
+
+# Streaming counterparts of the array strategies, by name
+STREAMING_STRATEGIES = {
+    "sma_cross": lambda params: StreamingSMACross(params["fast_ma"], params["slow_ma"]),
+    "rsi_cross": lambda params: StreamingRSICross(params["length"], params["strips"]),
+}
+
+# ------------ Position tracker ------------
+
+class PositionTracker:
+    """
+    Long only position, returns and equity updated bar by bar
+
+    :param init_wealth: Initial wealth of the equity curve
+    """
+    def __init__(self, init_wealth: float = 1000):
+        self.init_wealth = init_wealth
+        self.pos = 0.0
+        self.prev_price = None
+        self.growth = 1.0
+        self.n_signals = 0
+        self.bought = False
+        self.pending = None
+
+    def on_bar(self, date, price: float, signal: int) -> tuple | None:
+        """
+        Process a bar, return the previous bar's (date, pos, rets, eq_curve) row
+        """
+        if signal != 0:
+            self.n_signals += 1
+        if signal == -1 and not self.bought:
+            signal = 0                                 # Delete a would-be first sell signal
+        self.bought |= signal == 1
+
+        rets = 0.0
+        if self.prev_price is not None:
+            rets = self.pos * (price / self.prev_price - 1)
+            if abs(rets) <= 1e-12:
+                rets = 0.0
+        self.growth *= 1 + rets
+
+        if signal == 1:
+            self.pos = 1.0
+        elif signal == -1:
+            self.pos = 0.0
+        self.prev_price = price
+
+        row, self.pending = self.pending, (date, self.pos, rets, self.init_wealth * self.growth)
+        return row
+
+    def close(self) -> tuple | None:
+        """
+        End of data: force a final sell and return the last row
+        """
+        if self.n_signals == 0:
+            raise ValueError("⚠️ No signal found - cannot proceed")
+        if self.pending is None:
+            return None
+        date, _, rets, eq_curve = self.pending
+        self.pending = None
+        return date, 0.0, rets, eq_curve
+
+
+# ------------ Runners ------------
+
+def iter_csv_bars(path: Path | str, column: str = "adj close", chunksize: int = 100_000) -> Iterator[tuple]:
+    """
+    Stream (date, price) bars from a CSV file of any size
+
+    :param path: CSV file, dates in the first column
+    :param column: Price column
+    :param chunksize: Rows read at once
+    """
+    for chunk in pd.read_csv(path, index_col=0, parse_dates=True, chunksize=chunksize):
+        yield from zip(chunk.index, chunk[column].to_numpy(dtype=float))
+
+def run_event_backtest(bars: Iterable[tuple], strategy: Strategy | str,
+                       params: dict | None = None, init_wealth: float = 1000) -> Iterator[tuple]:
+    """
+    Stream a backtest bar by bar
+
+    :param bars: Iterable of (date, price)
+    :param strategy: Strategy or its name in STREAMING_STRATEGIES
+    :param params: Strategy parameters, overriding strategy.params
+    :param init_wealth: Initial wealth of the equity curve
+    :return: Iterator of (date, pos, rets, eq_curve) rows, warm-up bars skipped
+    """
+    if isinstance(strategy, str):
+        strategy = STRATEGIES[strategy]
+    streaming = STREAMING_STRATEGIES[strategy.name]({**strategy.params, **(params or {})})
+    tracker = PositionTracker(init_wealth=init_wealth)
+
+    for date, price in bars:
+        signal = streaming.on_bar(price)
+        if signal is None:
+            continue
+        row = tracker.on_bar(date, price, signal)
+        if row is not None:
+            yield row
+
+    row = tracker.close()
+    if row is not None:
+        yield row
+
+def event_backtest(bars: Iterable[tuple], strategy: Strategy | str,
+                   params: dict | None = None, init_wealth: float = 1000) -> pd.DataFrame:
+    """
+    run_event_backtest collected in the same table as run_backtest
+    """
+    rows = list(run_event_backtest(bars, strategy, params=params, init_wealth=init_wealth))
+    res = pd.DataFrame(rows, columns=["Date", "pos", "rets", "eq_curve"]).set_index("Date")
+    res.index.name = None
+    return res
+
+def event_backtest_to_csv(bars: Iterable[tuple], strategy: Strategy | str, path: Path | str,
+                          params: dict | None = None, init_wealth: float = 1000) -> int:
+    """
+    run_event_backtest written row by row to a CSV file, constant memory
+
+    :return: Number of rows written
+    :rtype: int
+    """
+    n_rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Date", "pos", "rets", "eq_curve"])
+        for row in run_event_backtest(bars, strategy, params=params, init_wealth=init_wealth):
+            writer.writerow(row)
+            n_rows += 1
+    return n_rows
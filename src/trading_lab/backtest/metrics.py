@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 
+from trading_lab._jit import jit_kernel
+from trading_lab.profiling import timed
+
 # ------------ Return based metrics ------------ 
 
 def annualized_ret(rets: pd.Series, periods_per_year: int = 252) -> float:
@@ -50,19 +53,193 @@ def profit_factor(rets: pd.Series) -> float:
     losses = - rets[rets < 0].sum()
     return gains / losses
 
+def trade_stats(ledger: pd.DataFrame, pnl: str = "net_pnl") -> pd.DataFrame:
+    """
+    Win rate and profit factor counted per trade instead of per period
+
+    :param ledger: As returned by portfolio.trade_ledger
+    :param pnl: 'net_pnl' (after costs) or 'pnl'
+    """
+    stats = {
+        "Trade Count" : len(ledger),
+        "Trade Win Rate" : win_rate(ledger[pnl]),
+        "Trade Profit Factor" : profit_factor(ledger[pnl]),
+        "Average Trade" : ledger[pnl].mean(),
+        "Average Holding" : ledger["holding"].mean(),
+    }
+    return pd.DataFrame(stats, index=['Strategy']).T.round(4)
+
+# ------------- Fused kernel ------------- 
+
+# All metrics in a single pass over the rows, for every column of a
+# (n_periods, n_strategies) returns matrix. Same definitions as the
+# functions above: NaN returns are skipped, annualized return uses len(rets).
+
+METRICS = ["Annualized Return", "Annualized Volatility", "Sharpe Ratio", "Max Drawdown",
+           "Win Rate", "Profit Factor"]
+EXTRA_METRICS = ["Sortino Ratio", "Calmar Ratio", "Exposure", "Trade Count"]
+
+def _fused_numpy(rets, pos, eq_curve, rf, periods_per_year):
+    n_rows = rets.shape[0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valid = ~np.isnan(rets)
+        clean = np.where(valid, rets, 0.0)
+        count = valid.sum(axis=0)
+        mean = clean.sum(axis=0) / count
+        std = np.sqrt((np.where(valid, rets - mean, 0.0) ** 2).sum(axis=0) / count)
+        growth = np.cumprod(1 + clean, axis=0)
+        if eq_curve.shape[0] == 0:
+            eq_curve = np.where(valid, growth, np.nan)
+        max_dd = - np.nanmin(eq_curve / np.fmax.accumulate(eq_curve, axis=0) - 1, axis=0)
+        wins, losses = (clean > 0).sum(axis=0), (clean < 0).sum(axis=0)
+        gains, loss_sum = np.where(clean > 0, clean, 0).sum(axis=0), - np.where(clean < 0, clean, 0).sum(axis=0)
+        down_std = np.sqrt((np.minimum(clean, 0) ** 2).sum(axis=0) / count)
+
+        out = np.empty((rets.shape[1], 10))
+        excess = mean - rf / periods_per_year
+        out[:, 0] = growth[-1] ** (periods_per_year / n_rows) - 1
+        out[:, 1] = std * np.sqrt(periods_per_year)
+        out[:, 2] = (excess / std) * np.sqrt(periods_per_year)
+        out[:, 3] = max_dd
+        out[:, 4] = wins / (wins + losses)
+        out[:, 5] = gains / loss_sum
+        out[:, 6] = (excess / down_std) * np.sqrt(periods_per_year)
+        out[:, 7] = out[:, 0] / max_dd
+        if pos.shape[0] > 0:
+            held = pos != 0
+            out[:, 8] = held.sum(axis=0) / n_rows
+            out[:, 9] = held[0] + (held[1:] & ~held[:-1]).sum(axis=0)
+        else:
+            out[:, 8:] = np.nan
+    return out
+
+@jit_kernel(_fused_numpy)
+def _fused_kernel(rets, pos, eq_curve, rf, periods_per_year):
+    n_rows, n_cols = rets.shape
+    has_pos = pos.shape[0] > 0
+    has_eq = eq_curve.shape[0] > 0
+
+    count = np.zeros(n_cols)
+    mean = np.zeros(n_cols)
+    m2 = np.zeros(n_cols)
+    growth = np.ones(n_cols)
+    peak = np.full(n_cols, -np.inf)
+    max_dd = np.zeros(n_cols)
+    wins = np.zeros(n_cols)
+    losses = np.zeros(n_cols)
+    gains = np.zeros(n_cols)
+    loss_sum = np.zeros(n_cols)
+    down_sq = np.zeros(n_cols)
+    held = np.zeros(n_cols)
+    trades = np.zeros(n_cols)
+    prev_pos = np.zeros(n_cols)
+
+    for t in range(n_rows):
+        for j in range(n_cols):
+            r = rets[t, j]
+            if r == r:
+                # Welford mean / variance
+                count[j] += 1
+                delta = r - mean[j]
+                mean[j] += delta / count[j]
+                m2[j] += delta * (r - mean[j])
+                growth[j] *= 1 + r
+                if r > 0:
+                    wins[j] += 1
+                    gains[j] += r
+                elif r < 0:
+                    losses[j] += 1
+                    loss_sum[j] -= r
+                    down_sq[j] += r * r
+
+            eq = eq_curve[t, j] if has_eq else (growth[j] if r == r else np.nan)
+            if eq == eq:
+                if eq > peak[j]:
+                    peak[j] = eq
+                drawdown = 1 - eq / peak[j]
+                if drawdown > max_dd[j]:
+                    max_dd[j] = drawdown
+
+            if has_pos:
+                p = pos[t, j]
+                if p != 0:
+                    held[j] += 1
+                    if prev_pos[j] == 0:
+                        trades[j] += 1
+                prev_pos[j] = p
+
+    out = np.empty((n_cols, 10))
+    for j in range(n_cols):
+        std = np.sqrt(m2[j] / count[j])
+        excess = mean[j] - rf / periods_per_year
+        out[j, 0] = growth[j] ** (periods_per_year / n_rows) - 1
+        out[j, 1] = std * np.sqrt(periods_per_year)
+        out[j, 2] = (excess / std) * np.sqrt(periods_per_year)
+        out[j, 3] = max_dd[j]
+        out[j, 4] = wins[j] / (wins[j] + losses[j])
+        out[j, 5] = gains[j] / loss_sum[j]
+        out[j, 6] = (excess / np.sqrt(down_sq[j] / count[j])) * np.sqrt(periods_per_year)
+        out[j, 7] = out[j, 0] / max_dd[j]
+        out[j, 8] = held[j] / n_rows if has_pos else np.nan
+        out[j, 9] = trades[j] if has_pos else np.nan
+    return out
+
+def _as_matrix(values) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    return np.ascontiguousarray(values.reshape(len(values), -1))
+
+def fused_stats(rets, pos=None, eq_curve=None, rf: float = 0.00, periods_per_year: int = 252) -> pd.DataFrame:
+    """
+    Every metric of every column of a returns matrix, in one pass
+
+    :param rets: Returns, Series / 1-D array or matrix (n_periods, n_strategies)
+    :param pos: Positions, same shape, needed for 'Exposure' and 'Trade Count'
+    :param eq_curve: Equity curves, same shape, used for 'Max Drawdown' instead of rebuilding them
+    :param rf: Annual risk free rate
+    :param periods_per_year: Number of periods per year
+    :return: One row per column of rets, METRICS + EXTRA_METRICS columns (not rounded)
+    :rtype: DataFrame
+    """
+    rets = _as_matrix(rets)
+    empty = np.empty((0, rets.shape[1]))
+    pos = _as_matrix(pos) if pos is not None else empty
+    eq_curve = _as_matrix(eq_curve) if eq_curve is not None else empty
+
+    out = _fused_kernel(rets, pos, eq_curve, float(rf), float(periods_per_year))
+    return pd.DataFrame(out, columns=METRICS + EXTRA_METRICS)
+
 # ------------- Summary statistics ------------- 
 
-def summary_stats(rets: pd.Series, rf: int = 0.00, periods_per_year: int = 252) -> pd.DataFrame:
+@timed("metrics.summary_stats")
+def summary_stats(rets: pd.Series, rf: int = 0.00, periods_per_year: int = 252,
+                  eq_curve: pd.Series | None = None, pos: pd.Series | None = None,
+                  extended: bool = False) -> pd.DataFrame:
     """
     Docstring
+    All metrics come from the fused kernel (one pass over rets)
+
+    :param eq_curve: Equity curve already computed by the engine, for the max drawdown
+    :param pos: Positions, for the extended 'Exposure' and 'Trade Count'
+    :param extended: Also report Sortino, Calmar, exposure and trade count
     """
-    stats = {
-        "Annualized Return" : annualized_ret(rets=rets, periods_per_year=periods_per_year),
-        "Annualized Volatility" : annualized_vol(rets=rets, periods_per_year=periods_per_year),
-        "Sharpe Ratio" : sharpe_ratio(rets=rets, rf=rf, periods_per_year=periods_per_year),
-        "Max Drawdown" : max_drawdown((1 + rets).cumprod()),
-        "Win Rate" : win_rate(rets=rets),
-        "Profit Factor" : profit_factor(rets=rets),
-    }
+    stats = fused_stats(rets, pos=pos, eq_curve=eq_curve, rf=rf, periods_per_year=periods_per_year)
+    stats = stats[METRICS + EXTRA_METRICS if extended else METRICS]
     
-    return pd.DataFrame(stats, index=['Strategy']).T.round(4)
+    return pd.DataFrame(stats.iloc[0].to_dict(), index=['Strategy']).T.round(4)
+
+@timed("metrics.summary_stats_matrix")
+def summary_stats_matrix(rets: np.ndarray, rf: float = 0.00, periods_per_year: int = 252,
+                         pos: np.ndarray | None = None, extended: bool = False) -> pd.DataFrame:
+    """
+    summary_stats for every column of a 2-D returns matrix at once
+
+    :param rets: Returns, shape (n_periods, n_strategies)
+    :param rf: Annual risk free rate
+    :param periods_per_year: Number of periods per year
+    :param pos: Positions, same shape, for the extended metrics
+    :param extended: Also report Sortino, Calmar, exposure and trade count
+    :return: One row per column of rets, one column per metric
+    :rtype: DataFrame
+    """
+    stats = fused_stats(rets, pos=pos, rf=rf, periods_per_year=periods_per_year)
+    return stats[METRICS + EXTRA_METRICS if extended else METRICS].round(4)
@@ -0,0 +1,200 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from trading_lab._jit import jit_kernel
+from trading_lab.backtest.metrics import METRICS, EXTRA_METRICS
+
+# -------------------------------------------------
+# Metrics for long running strategies
+#   - OnlineStats: O(1) update per bar, whole-period metrics
+#     with the same definitions as summary_stats
+#   - rolling_stats: trailing-window metrics for a full series,
+#     built from O(n) rolling sums (no rolling().apply), the
+#     window max drawdown is a compiled scan of each window
+# Both use the summary_stats metric names.
+
+class OnlineStats:
+    """
+    Running summary_stats, updated one return at a time
+
+    :param rf: Annual risk free rate
+    :param periods_per_year: Number of periods per year
+    """
+    __slots__ = ("rf", "periods_per_year", "n_total", "count", "mean", "m2", "growth", "peak",
+                 "max_dd", "wins", "losses", "gains", "loss_sum", "down_sq")
+
+    def __init__(self, rf: float = 0.00, periods_per_year: int = 252):
+        self.rf = rf
+        self.periods_per_year = periods_per_year
+        self.n_total = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.growth = 1.0
+        self.peak = -math.inf
+        self.max_dd = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.gains = 0.0
+        self.loss_sum = 0.0
+        self.down_sq = 0.0
+
+    def update(self, ret: float) -> None:
+        """
+        Add one period return (NaN is counted in the length only, like summary_stats)
+        """
+        self.n_total += 1
+        if ret != ret:
+            return
+
+        # Welford mean / variance
+        self.count += 1
+        delta = ret - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (ret - self.mean)
+
+        if ret > 0:
+            self.wins += 1
+            self.gains += ret
+        elif ret < 0:
+            self.losses += 1
+            self.loss_sum -= ret
+            self.down_sq += ret * ret
+
+        self.growth *= 1 + ret
+        self.peak = max(self.peak, self.growth)
+        self.max_dd = max(self.max_dd, 1 - self.growth / self.peak)
+
+    def update_many(self, rets) -> None:
+        for ret in rets:
+            self.update(float(ret))
+
+    def stats(self) -> dict:
+        """
+        Current metrics, keyed by the summary_stats names plus Sortino and Calmar
+        """
+        def ratio(a: float, b: float) -> float:
+            return a / b if b else (math.nan if a == 0 or a != a else math.copysign(math.inf, a))
+
+        sqrt_ppy = math.sqrt(self.periods_per_year)
+        std = math.sqrt(self.m2 / self.count) if self.count else math.nan
+        down_std = math.sqrt(self.down_sq / self.count) if self.count else math.nan
+        excess = self.mean - self.rf / self.periods_per_year if self.count else math.nan
+        ann_ret = self.growth ** (self.periods_per_year / self.n_total) - 1 if self.n_total else math.nan
+
+        return {
+            "Annualized Return": ann_ret,
+            "Annualized Volatility": std * sqrt_ppy,
+            "Sharpe Ratio": ratio(excess, std) * sqrt_ppy,
+            "Max Drawdown": self.max_dd,
+            "Win Rate": ratio(self.wins, self.wins + self.losses),
+            "Profit Factor": ratio(self.gains, self.loss_sum),
+            "Sortino Ratio": ratio(excess, down_std) * sqrt_ppy,
+            "Calmar Ratio": ratio(ann_ret, self.max_dd),
+        }
+
+    def summary(self, extended: bool = False) -> pd.DataFrame:
+        """
+        Current metrics in the summary_stats layout
+        """
+        stats = self.stats()
+        names = METRICS + EXTRA_METRICS[:2] if extended else METRICS
+        return pd.DataFrame({name: stats[name] for name in names}, index=['Strategy']).T.round(4)
+
+    def state(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "OnlineStats":
+        online = cls(state["rf"], state["periods_per_year"])
+        for name in cls.__slots__:
+            setattr(online, name, state[name])
+        return online
+
+
+def _window_max_drawdown_numpy(eq_curve, window):
+    out = np.full(eq_curve.size, np.nan)
+    if eq_curve.size < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(eq_curve, window)
+    step = max(1, 2**20 // window)                 # Windows per chunk, bounds the memory
+    for start in range(0, len(windows), step):
+        chunk = windows[start:start + step]
+        out[window - 1 + start:window - 1 + start + len(chunk)] = \
+            (1 - chunk / np.maximum.accumulate(chunk, axis=1)).max(axis=1)
+    return out
+
+@jit_kernel(_window_max_drawdown_numpy)
+def _window_max_drawdown(eq_curve, window):
+    """
+    Maximum drawdown inside the trailing window of every bar, NaN during the warm-up
+    """
+    out = np.full(eq_curve.size, np.nan)
+    for t in range(window - 1, eq_curve.size):
+        peak = -np.inf
+        max_dd = 0.0
+        for k in range(t - window + 1, t + 1):
+            if eq_curve[k] > peak:
+                peak = eq_curve[k]
+            drawdown = 1 - eq_curve[k] / peak
+            if drawdown > max_dd:
+                max_dd = drawdown
+        out[t] = max_dd
+    return out
+
+def rolling_stats(rets: pd.Series, window: int = 252, rf: float = 0.00,
+                  periods_per_year: int = 252) -> pd.DataFrame:
+    """
+    Trailing-window metrics for every bar, e.g. a 252-day rolling Sharpe
+
+    'Max Drawdown' is the maximum drawdown inside the window, like summary_stats
+    on the window returns. 'Current Drawdown' (extra) is the drawdown of each bar
+    from the highest equity of its window.
+
+    :param rets: Strategy returns
+    :param window: Window length in periods
+    :param rf: Annual risk free rate
+    :param periods_per_year: Number of periods per year
+    :return: Table indexed like rets, summary_stats metric names as columns, NaN during the warm-up
+    :rtype: DataFrame
+    """
+    rets = pd.Series(rets, dtype=float)
+    clean = rets.fillna(0.0)
+    sqrt_ppy = np.sqrt(periods_per_year)
+
+    def rolling_sum(values: pd.Series) -> pd.Series:
+        return values.rolling(window).sum()
+
+    # NaN returns are skipped, as in summary_stats
+    warm_up = np.arange(len(rets)) < window - 1
+    roll = rets.rolling(window, min_periods=1)
+    count = roll.count().mask(warm_up)
+    mean = roll.mean().mask(warm_up)
+    std = roll.std(ddof=0).mask(warm_up)
+    excess = mean - rf / periods_per_year
+    downside = np.sqrt(rolling_sum(np.minimum(clean, 0) ** 2) / count)
+
+    wins = rolling_sum((clean > 0).astype(float))
+    losses = rolling_sum((clean < 0).astype(float))
+    gains = rolling_sum(clean.clip(lower=0))
+    loss_sum = - rolling_sum(clean.clip(upper=0))
+
+    eq_curve = (1 + clean).cumprod()
+    max_drawdown = _window_max_drawdown(eq_curve.to_numpy(), window)
+    drawdown = 1 - eq_curve / eq_curve.rolling(window).max()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        res = pd.DataFrame({
+            "Annualized Return": np.expm1(rolling_sum(np.log1p(clean)) * periods_per_year / window),
+            "Annualized Volatility": std * sqrt_ppy,
+            "Sharpe Ratio": excess / std * sqrt_ppy,
+            "Max Drawdown": max_drawdown,
+            "Win Rate": wins / (wins + losses),
+            "Profit Factor": gains / loss_sum,
+            "Sortino Ratio": excess / downside * sqrt_ppy,
+            "Current Drawdown": drawdown,
+        }, index=rets.index)
+
+    return res
@@ -1,8 +1,13 @@
+import numpy as np
 import pandas as pd
 
+from trading_lab import kernels
+from trading_lab.profiling import timed
+
 # Long only portfolios
 # Usable on any dataframes with a 'adj close' and 'signal' columns (created by the strategy)
 
+@timed("portfolio.signal_to_pos")
 def signal_to_pos(df: pd.DataFrame) -> pd.Series:
     """
     Docstring
@@ -24,14 +29,11 @@ def signal_to_pos(df: pd.DataFrame) -> pd.Series:
         df.loc[first_idx_sell, 'signal'] = 0
 
     # Convert signal into position
-    pos = (df["signal"]
-                .replace(0, pd.NA)
-                .ffill()
-                .replace(-1, 0)
-                .fillna(0))
+    pos = kernels.signal_to_pos(df["signal"].to_numpy()).astype(np.int64)
     
-    return pos
+    return pd.Series(pos, index=df.index, name="signal")
 
+@timed("portfolio.strat_rets")
 def strat_rets(df: pd.DataFrame, pos: pd.Series) -> pd.Series:
     """
     Docstring
@@ -40,12 +42,138 @@ def strat_rets(df: pd.DataFrame, pos: pd.Series) -> pd.Series:
     strat_rets = pos.shift(1) * prices_rets
     return strat_rets
 
+@timed("portfolio.equity_curve")
 def equity_curve(rets: pd.Series, init_wealth: float = 1000) -> pd.Series:
     """
     Docstring
     """
     return init_wealth * (1 + rets).cumprod()
 
+# Same three steps on NumPy arrays (used by the backtest engine)
+
+def signal_to_pos_array(signal: np.ndarray) -> np.ndarray:
+    """
+    Array version of signal_to_pos, the signal array is left untouched
+
+    :param signal: Signal array (1 buy, -1 sell, 0 otherwise)
+    :return: Long only position (1 or 0)
+    :rtype: ndarray
+    """
+    nz_signal = signal[signal != 0]
+    if nz_signal.size == 0:
+        raise ValueError("⚠️ No signal found - cannot proceed")
+
+    # A would-be first sell gives a flat position anyway, the last bar is a forced sell
+    return kernels.signal_to_pos(signal)
+
+def strat_rets_array(prices: np.ndarray, pos: np.ndarray) -> np.ndarray:
+    """
+    Array version of strat_rets, first return is 0 instead of NaN
+
+    :param prices: Prices, (n_bars,) or (n_bars, n_columns)
+    :param pos: Position held at the close of each bar, same shape
+    :return: Strategy returns
+    :rtype: ndarray
+    """
+    rets = np.zeros(prices.shape)
+    rets[1:] = pos[:-1] * (prices[1:] / prices[:-1] - 1)
+    return rets
+
+def equity_curve_array(rets: np.ndarray, init_wealth: float = 1000) -> np.ndarray:
+    """
+    Array version of equity_curve, column-wise for a (n_bars, n_columns) matrix
+    """
+    return init_wealth * np.cumprod(1 + rets, axis=0)
+
+
+# ------------ Trades and costs ------------
+# Vectorized over a single series (n_bars,) or a matrix of
+# series (n_bars, n_columns), e.g. the positions of a sweep.
+# A trade is bought at the close of its entry bar and sold at
+# the close of the first flat bar after it.
+
+@timed("portfolio.trade_ledger")
+def trade_ledger(prices: np.ndarray, pos: np.ndarray, index: pd.Index | None = None,
+                 columns: list | None = None, fee: float = 0.0, slippage_bps: float = 0.0,
+                 spread_bps: float | np.ndarray = 0.0) -> pd.DataFrame:
+    """
+    One row per trade: entry/exit bar, prices, holding period and PnL
+
+    :param prices: Prices, (n_bars,) or (n_bars, n_columns)
+    :param pos: Long only positions (1 or 0), same shape
+    :param index: Dates of the bars, to add entry/exit dates
+    :param columns: Names of the columns, 0..n_columns-1 by default
+    :param fee: Proportional fee per side (0.001 = 10 bps of the traded value)
+    :param slippage_bps: Slippage per side, in bps
+    :param spread_bps: Bid/ask spread in bps (half paid per side), scalar or per bar array
+    :return: Ledger with gross 'pnl' and 'net_pnl' after costs, 'open' for trades still running at the end
+    :rtype: DataFrame
+    """
+    prices = np.asarray(prices, dtype=float).reshape(len(prices), -1)
+    held = np.asarray(pos).reshape(len(pos), -1) != 0
+    n_bars = held.shape[0]
+
+    # +1 on entry bars, -1 on the first flat bar after a trade (n_bars if never)
+    padded = np.zeros((n_bars + 2, held.shape[1]), dtype=np.int8)
+    padded[1:-1] = held
+    change = np.diff(padded, axis=0).T
+    entry_col, entry_bar = np.nonzero(change == 1)
+    _, exit_bar = np.nonzero(change == -1)
 
+    is_open = exit_bar >= n_bars
+    exit_bar = np.minimum(exit_bar, n_bars - 1)
+    entry_price = prices[entry_bar, entry_col]
+    exit_price = prices[exit_bar, entry_col]
+    pnl = exit_price / entry_price - 1
+
+    cost = _cost_per_side(n_bars, held.shape[1], fee, slippage_bps, spread_bps)
+    net_pnl = (1 + pnl) * (1 - cost[entry_bar, entry_col]) * (1 - np.where(is_open, 0.0, cost[exit_bar, entry_col])) - 1
+
+    ledger = pd.DataFrame({
+        "column": np.asarray(columns)[entry_col] if columns is not None else entry_col,
+        "entry_idx": entry_bar,
+        "exit_idx": exit_bar,
+        "entry_price": entry_price,
+        "exit_price": exit_price,
+        "holding": exit_bar - entry_bar,
+        "pnl": pnl,
+        "net_pnl": net_pnl,
+        "open": is_open,
+    })
+    if index is not None:
+        ledger.insert(3, "entry_date", index[entry_bar])
+        ledger.insert(4, "exit_date", index[exit_bar])
+    return ledger
+
+def _cost_per_side(n_bars: int, n_columns: int, fee: float, slippage_bps: float,
+                   spread_bps: float | np.ndarray) -> np.ndarray:
+    spread = np.asarray(spread_bps, dtype=float)
+    if spread.ndim == 1:
+        spread = spread[:, None]
+    cost = fee + slippage_bps / 1e4 + spread / 2 / 1e4
+    return np.broadcast_to(cost, (n_bars, n_columns))
+
+@timed("portfolio.apply_costs")
+def apply_costs(rets: np.ndarray, pos: np.ndarray, fee: float = 0.0, slippage_bps: float = 0.0,
+                spread_bps: float | np.ndarray = 0.0) -> np.ndarray:
+    """
+    Strategy returns net of trading costs, charged on the bars where the position changes
+
+    :param rets: Gross strategy returns, (n_bars,) or (n_bars, n_columns)
+    :param pos: Positions, same shape
+    :param fee: Proportional fee per side (0.001 = 10 bps of the traded value)
+    :param slippage_bps: Slippage per side, in bps
+    :param spread_bps: Bid/ask spread in bps (half paid per side), scalar or per bar array
+    :return: Net returns, same shape as rets
+    :rtype: ndarray
+    """
+    rets = np.asarray(rets, dtype=float)
+    pos = np.asarray(pos, dtype=float)
+    shape = rets.shape
+    rets, pos = rets.reshape(len(rets), -1), pos.reshape(len(pos), -1)
 
+    turnover = np.abs(np.diff(pos, axis=0, prepend=0.0))
+    cost = _cost_per_side(rets.shape[0], rets.shape[1], fee, slippage_bps, spread_bps)
+    net = (1 + rets) * (1 - turnover * cost) - 1
 
+    return net.reshape(shape)
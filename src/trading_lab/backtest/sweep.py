@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from trading_lab.backtest.metrics import summary_stats_matrix
+from trading_lab.backtest.portfolio import apply_costs
+
+# -------------------------------------------------
+# Parameter sweeps: every (fast, slow) pair of a grid is
+# backtested at once on NumPy matrices instead of calling
+# engine_sma once per pair.
+# Same rules as sma_cross -> signal_to_pos -> strat_rets:
+#   - rows before the slow SMA warm-up are dropped
+#   - long from the first bullish cross, flat after a bearish one
+#   - a leading sell is ignored, an open trade is closed at the end
+
+def _to_array(prices: pd.Series | pd.DataFrame | np.ndarray) -> np.ndarray:
+    if isinstance(prices, pd.DataFrame):
+        prices = prices["adj close"]
+    prices = np.asarray(prices, dtype=float)
+    if np.isnan(prices).any():
+        raise ValueError("⚠️ Prices contain NaN - clean them before sweeping")
+    return prices
+
+def rolling_means(prices: np.ndarray, windows) -> dict:
+    """
+    Every rolling mean of a price array from a single cumulative sum
+
+    :param prices: 1-D price array
+    :param windows: Window lengths
+    :return: {window: rolling mean}, NaN during the warm-up like Series.rolling
+    :rtype: dict
+    """
+    # Centering keeps the cumulative sum small, comparisons between means are unchanged
+    centered = prices - prices.mean()
+    csum = np.concatenate([[0.0], np.cumsum(centered)])
+
+    means = {}
+    for window in windows:
+        sma = np.full(prices.size, np.nan)
+        sma[window - 1:] = (csum[window:] - csum[:-window]) / window
+        means[window] = sma
+    return means
+
+def sma_cross_block(prices: np.ndarray, means: dict, fasts: list, slow: int) -> tuple:
+    """
+    Positions and returns of several fast SMAs against one slow SMA
+
+    :param prices: 1-D price array
+    :param means: Rolling means as returned by rolling_means
+    :param fasts: Fast windows, all < slow
+    :param slow: Slow window
+    :return: (pos, rets), both of shape (n_prices - slow + 1, len(fasts))
+    :rtype: tuple
+    """
+    start = slow - 1
+    fast_above = np.column_stack([means[fast][start:] for fast in fasts]) > means[slow][start:, None]
+
+    # Long once a bullish cross happened: above now after having been below before
+    was_below = np.logical_or.accumulate(~fast_above, axis=0)
+    pos = (fast_above & was_below).astype(float)
+    pos[-1] = 0                                         # Force the final sell
+
+    prices_rets = prices[start + 1:] / prices[start:-1] - 1
+    rets = np.zeros_like(pos)
+    rets[1:] = pos[:-1] * prices_rets[:, None]
+    rets[np.abs(rets) <= 1e-12] = 0.0
+
+    return pos, rets
+
+def sweep_sma(prices: pd.Series | pd.DataFrame | np.ndarray, fast_range, slow_range,
+              rf: float = 0.00, periods_per_year: int = 252, fee: float = 0.0,
+              slippage_bps: float = 0.0, spread_bps: float | np.ndarray = 0.0) -> pd.DataFrame:
+    """
+    Backtest every valid (fast, slow) SMA crossover pair of a grid
+
+    :param prices: Adjusted close prices (Series, array or table with 'adj close')
+    :param fast_range: Fast SMA lengths
+    :param slow_range: Slow SMA lengths, only pairs with fast < slow are run
+    :param rf: Annual risk free rate
+    :param periods_per_year: Number of periods per year
+    :param fee: Proportional fee per side, see portfolio.apply_costs
+    :param slippage_bps: Slippage per side, in bps
+    :param spread_bps: Bid/ask spread in bps, scalar or per bar array
+    :return: One row per pair: fast_sma, slow_sma and the summary_stats metrics
+    :rtype: DataFrame
+    """
+    prices = _to_array(prices)
+    fast_range = sorted(set(fast_range))
+    slow_range = sorted(set(slow_range))
+    if slow_range and slow_range[-1] >= prices.size:
+        raise ValueError("⚠️ slow SMA longer than the price history")
+
+    means = rolling_means(prices, sorted(set(fast_range) | set(slow_range)))
+
+    tables = []
+    for slow in slow_range:
+        fasts = [fast for fast in fast_range if fast < slow]
+        if not fasts:
+            continue
+        pos, rets = sma_cross_block(prices, means, fasts, slow)
+        if fee or slippage_bps or np.any(spread_bps):
+            spread = spread_bps if np.ndim(spread_bps) == 0 else np.asarray(spread_bps)[slow - 1:]
+            rets = apply_costs(rets, pos, fee=fee, slippage_bps=slippage_bps, spread_bps=spread)
+
+        stats = summary_stats_matrix(rets, rf=rf, periods_per_year=periods_per_year)
+        stats.insert(0, "slow_sma", slow)
+        stats.insert(0, "fast_sma", fasts)
+        tables.append(stats)
+
+    if not tables:
+        raise ValueError("⚠️ No valid pair - fast must be < than slow")
+
+    return pd.concat(tables, ignore_index=True)
@@ -1,62 +1,324 @@
-import matplotlib.pyplot as plt
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 
+# matplotlib is imported on first plot, it is slow to import and useless to headless runs
+
+# -------------------------------------------------
+# Plots of strategy tables (as returned by sma_cross / rsi_cross)
+#   - every line is downsampled to about the pixel width of the
+#     figure before reaching matplotlib: min and max of each
+#     bucket (default) or LTTB, the extreme points are kept
+#   - trade bars (signal != 0) are kept exactly, markers and
+#     lines go through the true prices
+#   - panels: price (+ SMA overlays), oscillators (RSI + strips),
+#     equity curve
+#   - headless path: plot_backtest builds a bare Figure (no pyplot
+#     state), render_pngs writes one PNG per ticker across processes,
+#     the workers only receive the downsampled panels
+
+PRICE_COLOR = "#201D1D"
+OVERLAY_COLORS = ["#BD5810", "#285D13", "#1F5A8C", "#8C1F5A"]
+OSCILLATOR_COLOR = "#610A7E"
+STRIP_COLOR = "#D5DF11"
+BUY_COLOR = "#0C12CA"
+SELL_COLOR = "#B60505"
+EQUITY_COLOR = "#285D13"
+
+# ------------ Downsampling ------------
+
+def minmax_indices(values: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Positions of the first and last points and of the min and max of each bucket
+
+    :param values: 1-D array, NaN are ignored
+    :param n_buckets: Number of equal buckets (about half the points returned)
+    :return: Sorted positions, every position if the array is already small
+    :rtype: ndarray
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.size
+    if n <= 2 * n_buckets + 2:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    blocks = np.full(n_buckets * size, np.nan)
+    blocks[:n] = values
+    blocks = blocks.reshape(n_buckets, size)
+    missing = np.isnan(blocks)
+
+    offsets = np.arange(n_buckets) * size
+    lows = np.where(missing, np.inf, blocks).argmin(axis=1) + offsets
+    highs = np.where(missing, -np.inf, blocks).argmax(axis=1) + offsets
+    return np.unique(np.concatenate(([0, n - 1], lows, highs)))
+
+def lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions kept by Largest-Triangle-Three-Buckets: in each bucket, the point
+    making the largest triangle with the previous kept point and the next bucket mean
+
+    :param values: 1-D array, NaN points are never picked (unless a bucket has nothing else)
+    :param n_out: Number of points returned
+    :return: Sorted positions, every position if the array is already small
+    :rtype: ndarray
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.size
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    out = np.empty(n_out, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+
+    a = 0
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for k in range(n_out - 2):
+            lo, hi = edges[k], edges[k + 1]
+            next_hi = edges[k + 2] if k + 2 < edges.size else n
+            mean_x = (hi + next_hi - 1) / 2
+            mean_y = np.nanmean(values[hi:next_hi])
+            if np.isnan(mean_y):
+                mean_y = values[a]
+
+            xs = np.arange(lo, hi)
+            area = np.abs((a - mean_x) * (values[lo:hi] - values[a]) - (a - xs) * (mean_y - values[a]))
+            a = lo + int(np.where(np.isnan(area), -1.0, area).argmax())
+            out[k + 1] = a
+    return out
+
+DOWNSAMPLERS = {
+    "minmax": lambda values, n_points: minmax_indices(values, max(1, n_points // 2)),
+    "lttb": lttb_indices,
+}
+
+def downsample(values: np.ndarray, n_points: int, method: str = "minmax", keep: np.ndarray | None = None) -> np.ndarray:
+    """
+    Positions of the points to draw for a line of about n_points pixels
+
+    :param values: 1-D array
+    :param n_points: Target number of points, e.g. the pixel width of the axes
+    :param method: 'minmax' or 'lttb'
+    :param keep: Positions always kept (e.g. trade bars)
+    :return: Sorted positions, including the global min and max
+    :rtype: ndarray
+    """
+    if method not in DOWNSAMPLERS:
+        raise ValueError(f"⚠️ Unknown method '{method}', expected one of {list(DOWNSAMPLERS)}")
+    values = np.asarray(values, dtype=float)
+    parts = [DOWNSAMPLERS[method](values, n_points)]
+    if keep is not None:
+        parts.append(np.asarray(keep, dtype=np.intp))
+    if method != "minmax" and not np.isnan(values).all():
+        parts.append([np.nanargmin(values), np.nanargmax(values)])
+    return np.unique(np.concatenate(parts))
+
+# ------------ Panels ------------
+
+def _line(x: np.ndarray, y: np.ndarray, n_points: int, method: str, keep: np.ndarray | None = None) -> tuple:
+    idx = downsample(y, n_points, method=method, keep=keep)
+    return x[idx], y[idx]
+
+def backtest_panels(df: pd.DataFrame, eq_curve: pd.Series | np.ndarray | None = None, n_points: int = 1600,
+                    method: str = "minmax", buy_sell_signals: bool = True) -> dict:
+    """
+    Downsampled data of the panels of a strategy table, small and picklable
+
+    :param df: Table with 'adj close', indicator columns (sma_*, RSI_*) and 'signal'
+    :param eq_curve: Equity curve, Series or array aligned with df
+    :param n_points: Target points per line, about the pixel width of the axes
+    :param method: 'minmax' or 'lttb'
+    :param buy_sell_signals: Mark the buys and sells
+    :return: {'name', 'price', 'overlays', 'oscillators', 'strips', 'buys', 'sells', 'equity'},
+             lines as (x, y) tuples
+    :rtype: dict
+    """
+    dates = df.index.to_numpy()
+    prices = df["adj close"].to_numpy(dtype=float)
+
+    signal = df["signal"].to_numpy() if "signal" in df.columns else np.zeros(len(df), dtype=np.int64)
+    buys, sells = np.flatnonzero(signal == 1), np.flatnonzero(signal == -1)
+    trades = np.concatenate((buys, sells)) if buy_sell_signals else None
+
+    panels = {
+        "name": df.attrs.get("name", ""),
+        "price": _line(dates, prices, n_points, method, keep=trades),
+        "overlays": {},
+        "oscillators": {},
+        "strips": df.attrs.get("RSI_strips"),
+        "buys": (dates[buys], prices[buys]) if buy_sell_signals else None,
+        "sells": (dates[sells], prices[sells]) if buy_sell_signals else None,
+        "equity": None,
+    }
+    for column in df.columns:
+        if column.startswith("sma_"):
+            panels["overlays"][column] = _line(dates, df[column].to_numpy(dtype=float), n_points, method, keep=trades)
+        elif column.startswith("RSI_"):
+            panels["oscillators"][column] = _line(dates, df[column].to_numpy(dtype=float), n_points, method, keep=trades)
+
+    if eq_curve is not None:
+        if isinstance(eq_curve, pd.Series):
+            eq_dates, eq_values = eq_curve.index.to_numpy(), eq_curve.to_numpy(dtype=float)
+        else:
+            eq_values = np.asarray(eq_curve, dtype=float)
+            eq_dates = dates[len(dates) - eq_values.size:]
+        eq_trades = np.flatnonzero(np.isin(eq_dates, dates[trades])) if trades is not None else None
+        panels["equity"] = _line(eq_dates, eq_values, n_points, method, keep=eq_trades)
+    return panels
+
+def draw_backtest(fig, panels: dict, title: str | None = None):
+    """
+    Draw the panels of backtest_panels on an empty figure
+
+    :param fig: matplotlib Figure (pyplot or bare)
+    :param panels: As returned by backtest_panels
+    :param title: Figure title
+    :return: The figure
+    :rtype: Figure
+    """
+    ratios = [3] + [1] * bool(panels["oscillators"]) + [1.5] * (panels["equity"] is not None)
+    axs = fig.subplots(len(ratios), 1, sharex=True, squeeze=False, gridspec_kw={"height_ratios": ratios})[:, 0]
+
+    # Stock price, SMA overlays and trades
+    ax = axs[0]
+    ax.plot(*panels["price"], c=PRICE_COLOR, linewidth=1, label=panels["name"] or "adj close")
+    for color, (column, line) in zip(OVERLAY_COLORS, panels["overlays"].items()):
+        ax.plot(*line, c=color, linestyle="--", linewidth=1, label=column)
+    if panels["buys"] is not None:
+        ax.scatter(*panels["buys"], marker="^", c=BUY_COLOR, s=80, label="Buy", zorder=5)
+        ax.scatter(*panels["sells"], marker="v", c=SELL_COLOR, s=80, label="Sell", zorder=5)
+    ax.set_ylabel("Price")
+    ax.grid(True, linestyle="--")
+    ax.legend(loc="upper left")
+
+    # RSI indicator and strips
+    k = 1
+    if panels["oscillators"]:
+        ax = axs[k]
+        for column, line in panels["oscillators"].items():
+            ax.plot(*line, c=OSCILLATOR_COLOR, alpha=0.8, linewidth=1, label=column)
+        for strip in panels["strips"] or []:
+            ax.axhline(strip, linestyle="--", c=STRIP_COLOR)
+        ax.grid(True, linestyle="--")
+        ax.legend(loc="upper left")
+        k += 1
+
+    # Equity curve
+    if panels["equity"] is not None:
+        ax = axs[k]
+        ax.plot(*panels["equity"], c=EQUITY_COLOR, linewidth=1, label="Equity curve")
+        ax.set_ylabel("Wealth")
+        ax.grid(True, linestyle="--")
+        ax.legend(loc="upper left")
+
+    if title:
+        fig.suptitle(title, fontweight="bold")
+    return fig
+
+def plot_backtest(df: pd.DataFrame, eq_curve: pd.Series | np.ndarray | None = None, title: str | None = None,
+                  width: int = 1400, height: int = 800, dpi: int = 100, method: str = "minmax",
+                  buy_sell_signals: bool = True):
+    """
+    Headless figure of a strategy table, no pyplot (safe in workers and without display)
+
+    :param df: Table with 'adj close', indicator columns (sma_*, RSI_*) and 'signal'
+    :param eq_curve: Equity curve, Series or array aligned with df
+    :param title: Figure title
+    :param width: Width in pixels, also the number of points kept per line
+    :param height: Height in pixels
+    :param dpi: Dots per inch
+    :param method: 'minmax' or 'lttb'
+    :param buy_sell_signals: Mark the buys and sells
+    :return: Figure, e.g. fig.savefig('plot.png')
+    :rtype: Figure
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    panels = backtest_panels(df, eq_curve, n_points=width, method=method, buy_sell_signals=buy_sell_signals)
+    return draw_backtest(fig, panels, title=title)
+
+# ------------ Batch rendering ------------
+
+def _render(task: tuple) -> str:
+    from matplotlib.figure import Figure
+
+    panels, path, title, width, height, dpi = task
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    draw_backtest(fig, panels, title=title).savefig(path)
+    return str(path)
+
+def render_pngs(frames: dict, out_dir: Path | str, title: str = "{name}", width: int = 1400, height: int = 800,
+                dpi: int = 100, method: str = "minmax", buy_sell_signals: bool = True,
+                n_workers: int | None = None) -> list:
+    """
+    One PNG per strategy table, rendered in worker processes
+
+    :param frames: {name: table} or {name: (table, eq_curve)}
+    :param out_dir: Output directory, files are <name>.png
+    :param title: Title template, formatted with the name
+    :param width: Width in pixels, also the number of points kept per line
+    :param height: Height in pixels
+    :param dpi: Dots per inch
+    :param method: 'minmax' or 'lttb'
+    :param buy_sell_signals: Mark the buys and sells
+    :param n_workers: Worker processes, os.cpu_count() by default, 1 renders in process
+    :return: Paths of the PNG files
+    :rtype: list
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    n_workers = n_workers or os.cpu_count()
+
+    # Downsampled here, the workers only receive a few thousand points per table
+    tasks = []
+    for name, item in frames.items():
+        df, eq_curve = item if isinstance(item, tuple) else (item, None)
+        panels = backtest_panels(df, eq_curve, n_points=width, method=method, buy_sell_signals=buy_sell_signals)
+        tasks.append((panels, out_dir / f"{name}.png", title.format(name=name), width, height, dpi))
+
+    if n_workers == 1 or len(tasks) <= 1:
+        return [_render(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        return list(pool.map(_render, tasks, chunksize=max(1, len(tasks) // (4 * n_workers))))
+
+# ------------ Interactive ------------
+
 def visuals_sma_strat(df: pd.DataFrame, eq_curve: pd.Series, buy_sell_signals: bool = True) -> None:
     """
     Docstring pour visuals_sma_strat
-    
+
     :param df: as returned by sma_cross
-    :param eq_curve: Description
-    """
-    # Also plot equity curve?????????
-    df['adj close'].plot(c="#201D1D", linewidth=1, label=df.attrs['name'])
-    df.iloc[:, 1].plot(c="#BD5810", linestyle='--')
-    df.iloc[:, 2].plot(c="#285D13", linestyle='--')
-    if buy_sell_signals:
-        buys = df['signal'] == 1
-        sells = df["signal"] == -1
-        plt.scatter(df.index[buys], df["adj close"][buys], marker='^', c="#0C12CA", s=80, label='Buy', zorder=5)
-        plt.scatter(df.index[sells], df["adj close"][sells], marker='v', c="#B60505", s=80, label='Sell', zorder=5)
-    plt.ylabel("Price")
-    plt.grid(True, linestyle='--')
-    plt.title(f"SMA crossover strategy for {df.attrs['name']}", fontweight='bold')
-    plt.legend()
+    :param eq_curve: Equity curve of the strategy, drawn in a panel below the prices
+    :param buy_sell_signals: Mark the buys and sells
+    """
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(14, 8))
+    panels = backtest_panels(df, eq_curve, n_points=int(fig.get_figwidth() * fig.dpi), buy_sell_signals=buy_sell_signals)
+    draw_backtest(fig, panels, title=f"SMA crossover strategy for {df.attrs['name']}")
     plt.show()
 
 def visuals_rsi_strat(df: pd.DataFrame, eq_curve: pd.Series, buy_sell_signals: bool = True) -> None:
     """
     Docstring pour visuals_rsi_strat
-        
+
     :param df: Description
     :type df: pd.DataFrame
-    :param eq_curve: Description
+    :param eq_curve: Equity curve of the strategy, drawn in a panel below the RSI
     :type eq_curve: pd.Series
     :param buy_sell_signals: Description
     :type buy_sell_signals: bool
     """
-    # Also plot equity curve?????????
-    lower_strip, upper_strip = df.attrs.get('RSI_strips')
-    fig, axs = plt.subplots(2, 1, figsize=(14, 8), sharex=True, gridspec_kw={"height_ratios": [3, 1]})
-    ax1, ax2 = axs
-    # Stock price
-    ax1.plot(df.index, df['adj close'], c="#201D1D", linewidth=1, label=df.attrs['name'])
-    # RSI indicator and strips
-    ax2.plot(df.index, df.iloc[:, 1], c="#610A7E", alpha=0.8, label=df.columns[1])
-    ax2.axhline(lower_strip, linestyle='--', c="#D5DF11")
-    ax2.axhline(upper_strip, linestyle='--', c="#D5DF11")
-    # Buy and Sell signals
-    if buy_sell_signals:
-        buys = df['signal'] == 1
-        sells = df["signal"] == -1
-        ax1.scatter(df.index[buys], df["adj close"][buys], marker='^', c="#0C12CA", s=80, label='Buy', zorder=5)
-        ax1.scatter(df.index[sells], df["adj close"][sells], marker='v', c="#B60505", s=80, label='Sell', zorder=5)
-    ax1.set_ylabel("Price")
-    plt.grid(True, linestyle='--')
-
-    plt.suptitle(f"RSI crossover strategy for {df.attrs['name']}", fontweight='bold')
-    ax1.legend(loc='upper left')
-    ax2.legend(loc='upper left')
-    plt.show()
+    import matplotlib.pyplot as plt
 
-        
+    fig = plt.figure(figsize=(14, 8))
+    panels = backtest_panels(df, eq_curve, n_points=int(fig.get_figwidth() * fig.dpi), buy_sell_signals=buy_sell_signals)
+    draw_backtest(fig, panels, title=f"RSI crossover strategy for {df.attrs['name']}")
+    plt.show()
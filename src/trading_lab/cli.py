@@ -0,0 +1,233 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from trading_lab.config import load_run_config
+
+# -------------------------------------------------
+# Command line: trading-lab <command> <config>
+#   run      run every job of a config, finished jobs are skipped
+#   jobs     list the jobs of a config and whether they are done
+#   collect  concatenate the results of a config into one table
+#   fetch    fill the local price store for the tickers of a config
+# Jobs are the config expanded over strategies x parameter grids
+# (backtests) and XGBoost grids (walk-forward training). Each job
+# writes its own part file, named by a hash of its definition,
+# under <output>/<kind>/, so a rerun resumes where it stopped.
+# Only argparse and the config module are imported here, the
+# backtest / ML stack (pandas, xgboost, ...) is imported by the
+# commands that need it.
+
+# ------------ Jobs ------------
+
+def _grid(grid: dict | None) -> list:
+    """
+    Every combination of a {param: list of values} grid, in itertools.product order
+    """
+    grid = grid or {}
+    values = [value if isinstance(value, list) else [value] for value in grid.values()]
+    return [dict(zip(grid, combo)) for combo in itertools.product(*values)]
+
+def _job_id(job: dict, config: dict) -> str:
+    key = {**job, **{name: config[name] for name in ("tickers", "start", "end", "rf", "periods_per_year")}}
+    return hashlib.blake2b(json.dumps(key, sort_keys=True, default=str).encode(), digest_size=6).hexdigest()
+
+def expand_jobs(config: dict) -> list:
+    """
+    Jobs of a run config
+
+    :param config: Config from config.load_run_config
+    :return: List of {'id', 'kind', ...} dicts, 'backtest' jobs then 'train' jobs
+    :rtype: list
+    """
+    jobs = []
+    for spec in config["backtests"]:
+        for params in _grid(spec.get("grid")):
+            jobs.append({"kind": "backtest", "strategy": spec["strategy"], "params": params})
+
+    for spec in config["train"]:
+        options = {key: value for key, value in spec.items() if key != "grid"}
+        for params in _grid(spec.get("grid")):
+            jobs.append({"kind": "train", "params": params, "options": options})
+
+    for job in jobs:
+        job["id"] = _job_id(job, config)
+    return jobs
+
+# ------------ Sinks ------------
+
+def _part_path(config: dict, job: dict, suffix: str = "") -> Path:
+    extension = "parquet" if config["format"] == "parquet" else "csv"
+    return Path(config["output"]) / job["kind"] / f"{job['id']}{suffix}.{extension}"
+
+def _write_part(df, path: Path, fmt: str) -> None:
+    """
+    Write a result table atomically (a killed run never leaves a half written part)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    if fmt == "parquet":
+        df.to_parquet(tmp)
+    else:
+        df.to_csv(tmp)
+    os.replace(tmp, path)
+
+def _read_part(path: Path):
+    import pandas as pd
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path, index_col=0)
+
+# ------------ Job runners ------------
+
+def _run_backtest_job(job: dict, config: dict, panels: dict, workers: int | None):
+    from trading_lab.backtest.batch import run_batch
+
+    res = run_batch(panels["Adj Close"], job["strategy"], params=job["params"], n_workers=workers,
+                    rf=config["rf"], periods_per_year=config["periods_per_year"])
+    res.insert(0, "strategy", job["strategy"])
+    res.insert(1, "params", json.dumps(job["params"]))
+    return {"": res}
+
+def _run_train_job(job: dict, config: dict, panels: dict, workers: int | None):
+    from trading_lab.machineLearning.registry import ModelRegistry
+    from trading_lab.machineLearning.strategy import walk_forward_backtest
+
+    # XGBoost uses every core itself, workers only apply to backtests
+    res = walk_forward_backtest(panels["Adj Close"], panels["Volume"], job["params"], registry=ModelRegistry(),
+                                rf=config["rf"], periods_per_year=config["periods_per_year"], **job["options"])
+    stats = res.stats.copy()
+    stats.insert(0, "params", json.dumps(job["params"]))
+    return {"": stats, "_folds": res.folds}
+
+RUNNERS = {
+    "backtest": _run_backtest_job,
+    "train": _run_train_job,
+}
+
+def _load_panels(config: dict, fields: list) -> dict:
+    from trading_lab.data.store import load_panel
+
+    return {field: load_panel(config["tickers"], config["start"], config["end"], field=field,
+                              offline=config["offline"])
+            for field in fields}
+
+# ------------ Commands ------------
+
+def cmd_run(args) -> int:
+    config = load_run_config(args.config)
+    workers = args.workers or config["workers"]
+    jobs = expand_jobs(config)
+    todo = [job for job in jobs if args.force or not _part_path(config, job).exists()]
+    print(f"{len(jobs)} jobs, {len(jobs) - len(todo)} already done, {len(todo)} to run")
+    if args.dry_run or not todo:
+        return 0
+
+    profiler = None
+    if args.profile:
+        from trading_lab import profiling
+        profiler = profiling.enable(trace=True)
+
+    fields = ["Adj Close"] + (["Volume"] if any(job["kind"] == "train" for job in todo) else [])
+    panels = _load_panels(config, fields)
+
+    n_failed = 0
+    for k, job in enumerate(todo, 1):
+        start = time.perf_counter()
+        try:
+            tables = RUNNERS[job["kind"]](job, config, panels, workers)
+        except Exception as e:
+            n_failed += 1
+            print(f"⚠️ [{k}/{len(todo)}] {job['kind']} {job['id']} failed: {e}")
+            continue
+        # The main part is written last: it marks the job as done
+        for suffix, table in sorted(tables.items(), reverse=True):
+            _write_part(table, _part_path(config, job, suffix), config["format"])
+        print(f"✅ [{k}/{len(todo)}] {job['kind']} {job.get('strategy', 'xgboost')} {job['params']} "
+              f"({time.perf_counter() - start:.1f}s)")
+
+    if profiler is not None:
+        profiling.disable()
+        profiler.to_chrome_trace(args.profile)
+        print(profiler.summary().round(4).to_string())
+        print(f"✅ Chrome trace -> {args.profile}")
+
+    return 1 if n_failed else 0
+
+def cmd_jobs(args) -> int:
+    config = load_run_config(args.config)
+    for job in expand_jobs(config):
+        done = "done" if _part_path(config, job).exists() else "todo"
+        print(f"{job['id']}  {done:<4}  {job['kind']:<8}  {job.get('strategy', 'xgboost'):<12}  {job['params']}")
+    return 0
+
+def cmd_collect(args) -> int:
+    import pandas as pd
+
+    config = load_run_config(args.config)
+    tables = []
+    for job in expand_jobs(config):
+        path = _part_path(config, job)
+        if path.exists():
+            table = _read_part(path)
+            table.insert(0, "job", job["id"])
+            tables.append(table)
+    if not tables:
+        print("⚠️ No finished job")
+        return 1
+
+    res = pd.concat(tables)
+    out = Path(args.out) if args.out else Path(config["output"]) / f"{config['name']}.{config['format']}"
+    _write_part(res, out, "parquet" if out.suffix == ".parquet" else "csv")
+    print(f"✅ {len(tables)} jobs, {len(res)} rows -> {out}")
+    return 0
+
+def cmd_fetch(args) -> int:
+    config = load_run_config(args.config)
+    panels = _load_panels(config, ["Adj Close", "Volume"])
+    prices = panels["Adj Close"]
+    print(f"✅ {prices.shape[1]} tickers, {prices.shape[0]} dates "
+          f"({prices.index.min().date()} -> {prices.index.max().date()})")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="trading-lab", description="Headless backtests and model training")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the jobs of a config, finished jobs are skipped")
+    run.add_argument("config", help="YAML or TOML run config")
+    run.add_argument("--workers", type=int, help="worker processes, overrides the config")
+    run.add_argument("--force", action="store_true", help="rerun finished jobs")
+    run.add_argument("--dry-run", action="store_true", help="only count the jobs")
+    run.add_argument("--profile", metavar="TRACE", help="time the pipeline stages, write a Chrome trace (.json)")
+    run.set_defaults(func=cmd_run)
+
+    jobs = commands.add_parser("jobs", help="list the jobs of a config")
+    jobs.add_argument("config")
+    jobs.set_defaults(func=cmd_jobs)
+
+    collect = commands.add_parser("collect", help="concatenate the results of a config")
+    collect.add_argument("config")
+    collect.add_argument("--out", help="output file (.parquet or .csv), <output>/<name>.<format> by default")
+    collect.set_defaults(func=cmd_collect)
+
+    fetch = commands.add_parser("fetch", help="fill the local price store for a config")
+    fetch.add_argument("config")
+    fetch.set_defaults(func=cmd_fetch)
+
+    return parser
+
+def main(argv: list | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (ValueError, FileNotFoundError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import os
+from pathlib import Path
+
+# ------------ Local storage ------------
+# Every on-disk store of the lab lives under a single root,
+# overridable with the TRADING_LAB_HOME environment variable
+
+DATA_DIR = Path(os.environ.get("TRADING_LAB_HOME", Path.home() / ".trading_lab"))
+PRICE_STORE_DIR = DATA_DIR / "prices"
+FEATURE_STORE_DIR = DATA_DIR / "features"
+MODEL_REGISTRY_DIR = DATA_DIR / "models"
+
+# ------------ Caches ------------
+
+INDICATOR_CACHE_BYTES = 256 * 2**20
+MODEL_REGISTRY_BYTES = 2 * 2**30
+
+# ------------ Compiled kernels ------------
+# Set TRADING_LAB_NUMBA=0 to force the pure NumPy fallbacks
+
+USE_NUMBA = os.environ.get("TRADING_LAB_NUMBA", "1") != "0"
+
+# ------------ Profiling ------------
+# Set TRADING_LAB_PROFILE=1 to record the pipeline stages from the
+# start (worker processes included), see trading_lab.profiling
+
+PROFILE = os.environ.get("TRADING_LAB_PROFILE", "0") == "1"
+
+# ------------ Run configs ------------
+# Batch runs of the command line (trading-lab run <config>) are
+# described in a YAML or TOML file, see load_run_config
+
+RUN_DEFAULTS = {
+    "tickers": [],
+    "start": None,
+    "end": None,
+    "workers": None,
+    "output": "results",
+    "format": "parquet",
+    "offline": False,
+    "rf": 0.0,
+    "periods_per_year": 252,
+    "backtests": [],
+    "train": [],
+}
+
+def load_run_config(path: str | Path) -> dict:
+    """
+    Read a run config (.yaml / .yml / .toml), missing keys get RUN_DEFAULTS
+
+    Example (YAML):
+        tickers: [AAPL, MSFT]
+        start: 2015-01-01
+        end: 2024-01-01
+        workers: 4
+        output: results/universe
+        backtests:
+          - strategy: sma_cross
+            grid: {fast_ma: [10, 20], slow_ma: [50, 100]}
+        train:
+          - grid: {max_depth: [3], n_estimators: [100]}
+            n_splits: 5
+
+    :param path: Config file
+    :return: Config dict
+    :rtype: dict
+    """
+    path = Path(path)
+    if path.suffix == ".toml":
+        try:
+            import tomllib
+        except ImportError:                     # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ValueError("⚠️ TOML configs need tomli on Python < 3.11 (pip install trading-lab[cli])") from None
+        config = tomllib.loads(path.read_text())
+    elif path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("⚠️ YAML configs need pyyaml (pip install trading-lab[cli])") from None
+        config = yaml.safe_load(path.read_text()) or {}
+    else:
+        raise ValueError("⚠️ Run configs must be .yaml, .yml or .toml files")
+
+    unknown = set(config) - set(RUN_DEFAULTS) - {"name"}
+    if unknown:
+        raise ValueError(f"⚠️ Unknown config keys: {sorted(unknown)}")
+    config = {**RUN_DEFAULTS, "name": path.stem, **config}
+    if not config["tickers"]:
+        raise ValueError("⚠️ The config must list tickers")
+    if config["format"] not in ("parquet", "csv"):
+        raise ValueError("⚠️ format must be 'parquet' or 'csv'")
+    for key in ("start", "end"):
+        config[key] = str(config[key]) if config[key] is not None else None
+    return config
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+from trading_lab.indicators.indicators import INDICATORS
+
+# -------------------------------------------------
+# Compact price / feature container
+#   - one contiguous NumPy array per column, optionally float32
+#   - dates kept as int64 nanoseconds
+#   - metadata in slots instead of df.attrs
+# Column names are the ones of the DataFrames ('adj close',
+# 'sma_20', 'RSI_14', ...) so add_sma / add_rsi work on both,
+# and to_frame gives a DataFrame view for plotting and notebooks.
+
+# Column names given by add_sma / add_rsi
+INDICATOR_COLUMNS = {"sma": "sma_{length}", "rsi": "RSI_{length}"}
+
+class PriceFrame:
+    """
+    Column arrays sharing one date index
+
+    :param dates: Dates, anything convertible to datetime64[ns]
+    :param columns: {column name: 1-D array}, all of len(dates)
+    :param dtype: Storage dtype of the columns, float64 or float32
+    :param name: Ticker name (df.attrs['name'])
+    :param rsi_strips: RSI strips of rsi_cross (df.attrs['RSI_strips'])
+    """
+    __slots__ = ("dates", "columns", "dtype", "name", "rsi_strips")
+
+    def __init__(self, dates, columns: dict | None = None, dtype=np.float64,
+                 name: str | None = None, rsi_strips: list | None = None):
+        self.dates = np.asarray(pd.DatetimeIndex(dates).as_unit("ns").asi8, dtype=np.int64)
+        self.dtype = np.dtype(dtype)
+        self.name = name
+        self.rsi_strips = rsi_strips
+        self.columns = {}
+        for column, values in (columns or {}).items():
+            self[column] = values
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dtype=np.float64, name: str | None = None) -> "PriceFrame":
+        """
+        Build from a price / feature DataFrame, metadata taken from df.attrs
+        """
+        return cls(df.index, {column: df[column].to_numpy() for column in df.columns}, dtype=dtype,
+                   name=name or df.attrs.get("name"), rsi_strips=df.attrs.get("RSI_strips"))
+
+    # ------------ Columns ------------
+
+    def __len__(self) -> int:
+        return self.dates.size
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __setitem__(self, column: str, values) -> None:
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        if values.shape != self.dates.shape:
+            raise ValueError(f"⚠️ Column '{column}' has {values.size} values for {self.dates.size} dates")
+        self.columns[column] = values
+
+    def keys(self) -> list:
+        return list(self.columns)
+
+    def drop(self, columns: list) -> "PriceFrame":
+        """
+        New PriceFrame without some columns, the others are shared
+        """
+        return self._with({column: values for column, values in self.columns.items() if column not in columns})
+
+    def add_indicator(self, indicator: str, length: int, cache=None) -> np.ndarray:
+        """
+        Add an indicator of indicators.INDICATORS on 'adj close', named like add_sma / add_rsi
+
+        Computed in float64 then stored in the frame dtype.
+        """
+        prices = np.asarray(self["adj close"], dtype=float)
+        values = cache.get(prices, indicator, length) if cache is not None else INDICATORS[indicator](prices, length)
+        self[INDICATOR_COLUMNS[indicator].format(length=length)] = values
+        return self[INDICATOR_COLUMNS[indicator].format(length=length)]
+
+    # ------------ Views ------------
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.dates.view("datetime64[ns]"))
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    def slice(self, start: int, stop: int | None = None) -> "PriceFrame":
+        """
+        Rows [start, stop), every column is a view
+        """
+        frame = self._with({column: values[start:stop] for column, values in self.columns.items()})
+        frame.dates = self.dates[start:stop]
+        return frame
+
+    def astype(self, dtype) -> "PriceFrame":
+        return PriceFrame(self.dates, self.columns, dtype=dtype, name=self.name, rsi_strips=self.rsi_strips)
+
+    def to_frame(self, columns: list | None = None) -> pd.DataFrame:
+        """
+        DataFrame view of some columns (all by default), the arrays are not copied
+
+        df.attrs gets 'name' and 'RSI_strips' for the plotting functions.
+        """
+        columns = self.keys() if columns is None else columns
+        df = pd.DataFrame({column: self.columns[column] for column in columns}, index=self.index, copy=False)
+        df.attrs["name"] = self.name
+        if self.rsi_strips is not None:
+            df.attrs["RSI_strips"] = self.rsi_strips
+        return df
+
+    def matrix(self, columns: list | None = None) -> np.ndarray:
+        """
+        (n_dates, n_columns) matrix of some columns, e.g. for a model (copies)
+        """
+        columns = self.keys() if columns is None else columns
+        return np.column_stack([self.columns[column] for column in columns])
+
+    def _with(self, columns: dict) -> "PriceFrame":
+        frame = PriceFrame.__new__(PriceFrame)
+        frame.dates, frame.dtype, frame.name, frame.rsi_strips = self.dates, self.dtype, self.name, self.rsi_strips
+        frame.columns = dict(columns)
+        return frame
+
+    def __repr__(self) -> str:
+        return (f"PriceFrame(name={self.name!r}, rows={len(self)}, columns={self.keys()}, "
+                f"dtype={self.dtype}, {self.nbytes / 2**20:.1f} MB)")
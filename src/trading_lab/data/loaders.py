@@ -1,7 +1,13 @@
-import yfinance as yf
 import pandas as pd
 
+from trading_lab.profiling import timed
+
+# yfinance is imported on first use, it is slow to import and only needed to download
+
+@timed("data.import_yahoo")
 def import_yahoo(ticker: str, start: str, end: str, raw: bool) -> pd.DataFrame:
+    import yfinance as yf
+
     df = yf.download(tickers=ticker, start=start, end=end, auto_adjust=False)
     df.attrs['name'] = ticker
     df.columns = df.columns.get_level_values(0)
@@ -11,4 +17,24 @@ def import_yahoo(ticker: str, start: str, end: str, raw: bool) -> pd.DataFrame:
         df.columns = ['adj close']
 
     print(f"✅ {ticker} data successfully imported")
-    return df
\ No newline at end of file
+    return df
+
+@timed("data.fetch")
+def yahoo_provider(ticker: str, start: str, end: str) -> pd.DataFrame:
+    """
+    Price provider backed by yfinance, used by the local price store
+
+    :param ticker: Yahoo ticker
+    :param start: First date (inclusive)
+    :param end: Last date (exclusive)
+    :return: OHLCV table with the raw Yahoo column names
+    :rtype: DataFrame
+    """
+    import yfinance as yf
+
+    df = yf.download(tickers=ticker, start=start, end=end, auto_adjust=False, progress=False)
+    df.columns = df.columns.get_level_values(0)
+    df.columns.name = None
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    return df
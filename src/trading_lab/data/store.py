@@ -0,0 +1,264 @@
+import json
+from pathlib import Path
+from typing import Protocol
+
+import pandas as pd
+
+from trading_lab.config import PRICE_STORE_DIR
+from trading_lab.data.loaders import yahoo_provider
+from trading_lab.profiling import timed
+
+# -------------------------------------------------
+# Local columnar price store
+# One Parquet file per (ticker, field) under <root>/<TICKER>/
+# plus a 'coverage.json' listing the date ranges already
+# requested from the provider, so that week-ends, holidays
+# and empty answers are never fetched twice.
+# All ranges are [start, end) like yf.download. Coverage never
+# goes past today: bars not published yet are fetched later.
+
+FIELDS = ["Adj Close", "Close", "High", "Low", "Open", "Volume"]
+
+
+class PriceProvider(Protocol):
+    """
+    Anything returning an OHLCV table (DatetimeIndex, columns among FIELDS)
+    for a ticker and a [start, end) range. Swap it for a local fake in tests.
+    """
+    def __call__(self, ticker: str, start: str, end: str) -> pd.DataFrame: ...
+
+
+# ------------ Paths and coverage ------------
+
+def _ticker_dir(ticker: str, root: Path | str | None) -> Path:
+    return Path(root or PRICE_STORE_DIR) / ticker.upper()
+
+def _field_path(ticker: str, field: str, root: Path | str | None) -> Path:
+    return _ticker_dir(ticker, root) / f"{field.lower().replace(' ', '_')}.parquet"
+
+def _read_coverage(ticker: str, root: Path | str | None) -> dict:
+    path = _ticker_dir(ticker, root) / "coverage.json"
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+def _write_coverage(ticker: str, coverage: dict, root: Path | str | None) -> None:
+    path = _ticker_dir(ticker, root) / "coverage.json"
+    path.write_text(json.dumps(coverage, indent=1))
+
+def _today() -> pd.Timestamp:
+    return pd.Timestamp.today().normalize()
+
+def _merge_intervals(intervals: list) -> list:
+    """
+    Merge overlapping or adjacent [start, end) date intervals
+    """
+    merged = []
+    for start, end in sorted((pd.Timestamp(s), pd.Timestamp(e)) for s, e in intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [[s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d")] for s, e in merged]
+
+def missing_ranges(ticker: str, start: str, end: str, field: str = "Adj Close",
+                   root: Path | str | None = None) -> list:
+    """
+    Date ranges of [start, end) not yet covered by the store for a field
+
+    :param ticker: Ticker
+    :param start: First date (inclusive)
+    :param end: Last date (exclusive)
+    :param field: One of FIELDS
+    :param root: Store root, defaults to config.PRICE_STORE_DIR
+    :return: List of [start, end) string pairs, empty when fully cached
+    :rtype: list
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    gaps = []
+    cursor = start
+    for cov_start, cov_end in _read_coverage(ticker, root).get(field, []):
+        cov_start, cov_end = pd.Timestamp(cov_start), pd.Timestamp(cov_end)
+        if cov_end <= cursor:
+            continue
+        if cov_start >= end:
+            break
+        if cov_start > cursor:
+            gaps.append([cursor, cov_start])
+        cursor = max(cursor, cov_end)
+    if cursor < end:
+        gaps.append([cursor, end])
+    return [[s.strftime("%Y-%m-%d"), e.strftime("%Y-%m-%d")] for s, e in gaps]
+
+
+# ------------ Read / write ------------
+
+def write_prices(df: pd.DataFrame, ticker: str, start: str | None = None, end: str | None = None,
+                 root: Path | str | None = None) -> None:
+    """
+    Merge an OHLCV table into the store and mark [start, min(end, today)) as covered
+
+    :param df: Table with a DatetimeIndex and columns among FIELDS
+    :param ticker: Ticker
+    :param start: Covered range start, defaults to the first date of df
+    :param end: Covered range end (exclusive), defaults to the day after the last date of df
+    :param root: Store root, defaults to config.PRICE_STORE_DIR
+    """
+    if start is None or end is None:
+        if df.empty:
+            raise ValueError("⚠️ Empty table - give explicit start and end")
+        start = start or df.index[0]
+        end = end or df.index[-1] + pd.Timedelta(days=1)
+    start, end = pd.Timestamp(start), min(pd.Timestamp(end), _today())
+
+    _ticker_dir(ticker, root).mkdir(parents=True, exist_ok=True)
+    coverage = _read_coverage(ticker, root)
+
+    # An empty answer (holidays, delisted) still covers the range
+    fields = FIELDS if df.empty else [field for field in FIELDS if field in df.columns]
+
+    for field in fields:
+        path = _field_path(ticker, field, root)
+        if field in df.columns and not df.empty:
+            new = df[[field]].astype("float64")
+            if path.exists():
+                new = pd.concat([pd.read_parquet(path), new])
+                new = new[~new.index.duplicated(keep="last")].sort_index()
+            new.index.name = "Date"
+            new.to_parquet(path)
+
+        if start < end:
+            coverage[field] = _merge_intervals(coverage.get(field, []) + [[start, end]])
+
+    _write_coverage(ticker, coverage, root)
+
+def read_prices(ticker: str, start: str, end: str, fields: list | None = None,
+                root: Path | str | None = None) -> pd.DataFrame:
+    """
+    Read stored prices for [start, end) without any network call
+
+    :param ticker: Ticker
+    :param start: First date (inclusive)
+    :param end: Last date (exclusive)
+    :param fields: Subset of FIELDS, all stored fields by default
+    :param root: Store root, defaults to config.PRICE_STORE_DIR
+    :return: OHLCV table, possibly empty
+    :rtype: DataFrame
+    """
+    frames = []
+    for field in fields or FIELDS:
+        path = _field_path(ticker, field, root)
+        if path.exists():
+            frames.append(pd.read_parquet(path))
+
+    if not frames:
+        return pd.DataFrame(columns=fields or FIELDS, index=pd.DatetimeIndex([], name="Date"))
+
+    df = pd.concat(frames, axis=1)
+    df = df.loc[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+    df.attrs["name"] = ticker
+    return df
+
+@timed("data.load_prices")
+def load_prices(ticker: str, start: str, end: str, fields: list | None = None,
+                root: Path | str | None = None, provider: PriceProvider | None = None,
+                offline: bool = False) -> pd.DataFrame:
+    """
+    Serve [start, end) from the store, fetching only the missing head/tail
+
+    :param ticker: Ticker
+    :param start: First date (inclusive)
+    :param end: Last date (exclusive)
+    :param fields: Subset of FIELDS, all of them by default
+    :param root: Store root, defaults to config.PRICE_STORE_DIR
+    :param provider: Price provider, yahoo_provider by default
+    :param offline: Never call the provider, serve what is stored
+    :return: OHLCV table
+    :rtype: DataFrame
+    """
+    fields = fields or FIELDS
+    provider = provider or yahoo_provider
+
+    if not offline:
+        gaps = []
+        for field in fields:
+            gaps += missing_ranges(ticker, start, end, field=field, root=root)
+        for gap_start, gap_end in _merge_intervals(gaps):
+            fetched = provider(ticker, gap_start, gap_end)
+            write_prices(fetched, ticker, start=gap_start, end=gap_end, root=root)
+            print(f"✅ {ticker} data fetched from {gap_start} to {gap_end}")
+
+    return read_prices(ticker, start, end, fields=fields, root=root)
+
+def import_cached(ticker: str, start: str, end: str, raw: bool,
+                  root: Path | str | None = None, provider: PriceProvider | None = None) -> pd.DataFrame:
+    """
+    Drop-in replacement of import_yahoo going through the local store
+
+    :param ticker: Ticker
+    :param start: First date (inclusive)
+    :param end: Last date (exclusive)
+    :param raw: Full OHLCV table if True, a single 'adj close' column otherwise
+    :param root: Store root, defaults to config.PRICE_STORE_DIR
+    :param provider: Price provider, yahoo_provider by default
+    :return: Same layout as import_yahoo
+    :rtype: DataFrame
+    """
+    fields = FIELDS if raw else ["Adj Close"]
+    df = load_prices(ticker, start, end, fields=fields, root=root, provider=provider)
+    df.index.name = "Date"
+
+    if raw == False:
+        df = df.rename(columns={"Adj Close": "adj close"})
+
+    df.attrs["name"] = ticker
+    return df
+
+def fill_from_file(path: Path | str, ticker: str, start: str | None = None, end: str | None = None,
+                   root: Path | str | None = None) -> None:
+    """
+    Fill the store offline from a CSV or Parquet export
+
+    :param path: CSV (first column holds the dates) or Parquet file
+    :param ticker: Ticker
+    :param start: Covered range start, defaults to the first date of the file
+    :param end: Covered range end (exclusive), defaults to the day after the last date
+    :param root: Store root, defaults to config.PRICE_STORE_DIR
+    """
+    path = Path(path)
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+
+    # Accept 'adj close', 'Adj_Close', 'ADJ CLOSE'... as 'Adj Close'
+    names = {field.lower(): field for field in FIELDS}
+    df = df.rename(columns=lambda c: names.get(str(c).lower().replace("_", " "), c))
+    df.index = pd.DatetimeIndex(df.index)
+
+    write_prices(df.sort_index(), ticker, start=start, end=end, root=root)
+
+def load_panel(tickers: list, start: str, end: str, field: str = "Adj Close",
+               root: Path | str | None = None, provider: PriceProvider | None = None,
+               offline: bool = False) -> pd.DataFrame:
+    """
+    One field for a whole universe, aligned on the union of dates
+
+    :param tickers: Tickers
+    :param start: First date (inclusive)
+    :param end: Last date (exclusive)
+    :param field: One of FIELDS
+    :param root: Store root, defaults to config.PRICE_STORE_DIR
+    :param provider: Price provider, yahoo_provider by default
+    :param offline: Never call the provider, serve what is stored
+    :return: Table (dates x tickers), NaN where a ticker has no data
+    :rtype: DataFrame
+    """
+    columns = {}
+    for ticker in tickers:
+        df = load_prices(ticker, start, end, fields=[field], root=root, provider=provider, offline=offline)
+        columns[ticker] = df[field] if field in df.columns else pd.Series(dtype="float64")
+
+    panel = pd.concat(columns, axis=1).sort_index()
+    panel.index.name = "Date"
+    return panel
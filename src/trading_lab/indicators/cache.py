@@ -0,0 +1,124 @@
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from trading_lab.config import INDICATOR_CACHE_BYTES
+from trading_lab.indicators.indicators import INDICATORS
+
+# -------------------------------------------------
+# Memoized indicators, keyed by a fingerprint of the price
+# array plus the indicator name and length.
+# In memory LRU bounded in bytes, evicted arrays can spill
+# to .npy files and are reloaded from there on the next hit.
+
+def fingerprint(prices: np.ndarray) -> str:
+    """
+    Cheap content hash of a price array
+
+    :param prices: Price array
+    :return: Hex digest, equal for arrays with the same values
+    :rtype: str
+    """
+    prices = np.ascontiguousarray(prices, dtype=float)
+    digest = hashlib.blake2b(prices.view(np.uint8), digest_size=16)
+    digest.update(str(prices.shape).encode())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator arrays
+
+    :param max_bytes: Memory budget of the cached arrays
+    :param spill_dir: Directory where evicted arrays are saved, None to drop them
+    """
+    def __init__(self, max_bytes: int = INDICATOR_CACHE_BYTES, spill_dir: Path | str | None = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._items = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.spill_hits = 0
+        self.evictions = 0
+
+    def _spill_path(self, key: tuple) -> Path:
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return self.spill_dir / f"{name}.npy"
+
+    def _insert(self, key: tuple, values: np.ndarray) -> None:
+        values.flags.writeable = False
+        self._items[key] = values
+        self.nbytes += values.nbytes
+
+        while self.nbytes > self.max_bytes and self._items:
+            old_key, old_values = self._items.popitem(last=False)
+            self.nbytes -= old_values.nbytes
+            self.evictions += 1
+            if self.spill_dir is not None:
+                np.save(self._spill_path(old_key), old_values)
+
+    def get(self, prices: np.ndarray, name: str, length: int, key: str | None = None) -> np.ndarray:
+        """
+        Indicator values, computed only on a miss
+
+        :param prices: Price array
+        :param name: Indicator name in indicators.INDICATORS
+        :param length: Indicator length
+        :param key: Precomputed fingerprint(prices), to hash the prices once for several indicators
+        :return: Read-only indicator array
+        :rtype: ndarray
+        """
+        # Plain Python scalars: the spill file name comes from repr(key), np.int64(20) != 20 there
+        length = int(length)
+        cache_key = (key or fingerprint(prices), str(name), length)
+
+        if cache_key in self._items:
+            self.hits += 1
+            self._items.move_to_end(cache_key)
+            return self._items[cache_key]
+
+        if self.spill_dir is not None and self._spill_path(cache_key).exists():
+            self.spill_hits += 1
+            values = np.load(self._spill_path(cache_key))
+        else:
+            self.misses += 1
+            values = INDICATORS[name](np.asarray(prices, dtype=float), length)
+
+        self._insert(cache_key, values)
+        return values
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters and memory use
+        """
+        lookups = self.hits + self.spill_hits + self.misses
+        return {
+            "hits": self.hits,
+            "spill_hits": self.spill_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.spill_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "items": len(self._items),
+            "nbytes": self.nbytes,
+        }
+
+    def clear(self) -> None:
+        self._items.clear()
+        self.nbytes = 0
+
+
+_DEFAULT_CACHE = None
+
+def default_cache() -> IndicatorCache:
+    """
+    Process-wide cache shared by the notebooks helpers
+    """
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = IndicatorCache()
+    return _DEFAULT_CACHE
@@ -1,9 +1,11 @@
 import pandas as pd
 import numpy as np
 
-# Adding indicators to the stock prices table
+from trading_lab.profiling import timed
 
-def add_sma(df: pd.DataFrame, length: int) -> pd.DataFrame:
+# Adding indicators to the stock prices table (DataFrame or data.frame.PriceFrame)
+
+def add_sma(df: pd.DataFrame, length: int, cache=None) -> pd.DataFrame:
     """
     Docstring pour add_sma
     
@@ -11,14 +13,16 @@ def add_sma(df: pd.DataFrame, length: int) -> pd.DataFrame:
     :type df: pd.DataFrame
     :param length: Description
     :type length: int
+    :param cache: Optional IndicatorCache to reuse already computed values
     :return: Description
     :rtype: DataFrame
     """
-    df[f"sma_{length}"] = df["adj close"].rolling(window=length).mean()
+    prices = np.asarray(df["adj close"], dtype=float)
+    df[f"sma_{length}"] = cache.get(prices, "sma", length) if cache is not None else sma_array(prices, length)
     
     return df
 
-def add_rsi(df: pd.DataFrame, length: int) -> pd.DataFrame:
+def add_rsi(df: pd.DataFrame, length: int, cache=None) -> pd.DataFrame:
     """
     Docstring pour add_rsi
     WILDER VERSION
@@ -27,25 +31,59 @@ def add_rsi(df: pd.DataFrame, length: int) -> pd.DataFrame:
     :type df: pd.DataFrame
     :param length: Description
     :type length: int
+    :param cache: Optional IndicatorCache to reuse already computed values
     :return: Description
     :rtype: DataFrame
     """
-    delta_prices = df["adj close"].diff()
+    prices = np.asarray(df["adj close"], dtype=float)
+    df[f'RSI_{length}'] = cache.get(prices, "rsi", length) if cache is not None else rsi_array(prices, length)
+
+    return df
 
-    gains = delta_prices.where(delta_prices > 0, 0)
-    losses = (- delta_prices).where(delta_prices < 0, 0)
+# Same indicators on plain NumPy arrays (used by the backtest engine)
 
-    # Wilder's smoothing
-    avg_gain = gains.ewm(alpha=1/length, adjust=False).mean()
-    avg_loss = losses.ewm(alpha=1/length, adjust=False).mean()
+@timed("indicators.sma")
+def sma_array(prices: np.ndarray, length: int) -> np.ndarray:
+    """
+    Simple moving average of a price array, NaN during the warm-up
+
+    :param prices: 1-D price array
+    :param length: Window length
+    :return: Array of the same size as prices
+    :rtype: ndarray
+    """
+    return pd.Series(prices).rolling(window=length).mean().to_numpy()
 
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+@timed("indicators.rsi")
+def rsi_array(prices: np.ndarray, length: int) -> np.ndarray:
+    """
+    Wilder RSI of a price array, NaN for the first 'length' values
+
+    :param prices: 1-D price array
+    :param length: RSI length
+    :return: Array of the same size as prices
+    :rtype: ndarray
+    """
+    delta_prices = np.diff(prices, prepend=np.nan)
 
-    df[f'RSI_{length}'] = rsi
+    gains = np.where(delta_prices > 0, delta_prices, 0.0)
+    losses = np.where(delta_prices < 0, - delta_prices, 0.0)
+
+    # Wilder's smoothing
+    avg_gain = pd.Series(gains).ewm(alpha=1/length, adjust=False).mean().to_numpy()
+    avg_loss = pd.Series(losses).ewm(alpha=1/length, adjust=False).mean().to_numpy()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
 
     # Set first 'length' values to NaN (warmup period)
-    df.loc[df.index[:length], f'RSI_{length}'] = np.nan
+    rsi[:length] = np.nan
 
-    return df
+    return rsi
 
+# Indicators known by the engine, by name
+INDICATORS = {
+    "sma": sma_array,
+    "rsi": rsi_array,
+}
@@ -0,0 +1,188 @@
+import math
+
+import numpy as np
+
+# -------------------------------------------------
+# Stateful indicators updated one bar at a time in O(1).
+# They replay the exact floating point arithmetic of pandas
+# (Series.rolling().mean() and Series.ewm(adjust=False).mean())
+# so their output is identical to add_sma / add_rsi.
+# state() returns plain JSON-able dicts, from_state() resumes.
+
+class RollingSMA:
+    """
+    Streaming equivalent of add_sma, backed by a ring buffer
+
+    :param length: Window length
+    """
+    __slots__ = ("length", "buffer", "count", "nobs", "sum_x", "neg_ct",
+                 "comp_add", "comp_remove", "n_same", "prev_value", "value")
+
+    def __init__(self, length: int):
+        if length <= 0:
+            raise ValueError("⚠️ length must be positive")
+        self.length = length
+        self.buffer = [math.nan] * length
+        self.count = 0
+        self._reset()
+        self.value = math.nan
+
+    def _reset(self) -> None:
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.n_same = 0
+        self.prev_value = math.nan
+
+    def _add(self, val: float) -> None:
+        # Kahan summation, as pandas' add_mean
+        if val == val:
+            self.nobs += 1
+            y = val - self.comp_add
+            t = self.sum_x + y
+            self.comp_add = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct += 1
+            self.n_same = self.n_same + 1 if val == self.prev_value else 1
+            self.prev_value = val
+
+    def _remove(self, val: float) -> None:
+        # Kahan summation, as pandas' remove_mean
+        if val == val:
+            self.nobs -= 1
+            y = - val - self.comp_remove
+            t = self.sum_x + y
+            self.comp_remove = t - self.sum_x - y
+            self.sum_x = t
+            if math.copysign(1.0, val) < 0:
+                self.neg_ct -= 1
+
+    def update(self, price: float) -> float:
+        """
+        Add a bar and return the current SMA (NaN during the warm-up)
+        """
+        price = float(price)
+        slot = self.count % self.length
+
+        if self.count == 0 or self.length == 1:
+            self._reset()
+            self.prev_value = price
+        elif self.count >= self.length:
+            self._remove(self.buffer[slot])
+        self._add(price)
+
+        self.buffer[slot] = price
+        self.count += 1
+
+        if self.nobs >= self.length:
+            value = self.sum_x / self.nobs
+            if self.n_same >= self.nobs:
+                value = self.prev_value
+            elif self.neg_ct == 0 and value < 0:
+                value = 0.0
+            elif self.neg_ct == self.nobs and value > 0:
+                value = 0.0
+        else:
+            value = math.nan
+
+        self.value = value
+        return value
+
+    def update_many(self, prices) -> np.ndarray:
+        """
+        Add several bars, return the SMA after each of them
+        """
+        return np.array([self.update(price) for price in prices], dtype=float)
+
+    def state(self) -> dict:
+        return {"kind": "sma", **{name: getattr(self, name) for name in self.__slots__}}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RollingSMA":
+        sma = cls(state["length"])
+        for name in cls.__slots__:
+            setattr(sma, name, list(state[name]) if name == "buffer" else state[name])
+        return sma
+
+
+class WilderRSI:
+    """
+    Streaming equivalent of add_rsi, carries avg_gain / avg_loss
+
+    :param length: RSI length
+    """
+    __slots__ = ("length", "count", "prev_price", "avg_gain", "avg_loss", "value")
+
+    def __init__(self, length: int):
+        if length <= 0:
+            raise ValueError("⚠️ length must be positive")
+        self.length = length
+        self.count = 0
+        self.prev_price = math.nan
+        self.avg_gain = math.nan
+        self.avg_loss = math.nan
+        self.value = math.nan
+
+    def _smooth(self, weighted: float, cur: float) -> float:
+        # pandas' ewm(alpha=1/length, adjust=False), alpha goes through the center of mass
+        alpha = 1.0 / (1.0 + (1.0 - 1.0 / self.length) / (1.0 / self.length))
+        old_wt = 1.0 - alpha
+        if weighted != cur:
+            weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        return weighted
+
+    def update(self, price: float) -> float:
+        """
+        Add a bar and return the current RSI (NaN for the first 'length' bars)
+        """
+        price = float(price)
+        delta = price - self.prev_price
+
+        gain = delta if delta > 0 else 0.0
+        loss = - delta if delta < 0 else 0.0
+
+        if self.count == 0:
+            self.avg_gain, self.avg_loss = gain, loss
+        else:
+            self.avg_gain = self._smooth(self.avg_gain, gain)
+            self.avg_loss = self._smooth(self.avg_loss, loss)
+
+        self.prev_price = price
+        self.count += 1
+
+        if self.count <= self.length:
+            value = math.nan
+        elif self.avg_loss == 0:
+            value = 100.0 if self.avg_gain > 0 else math.nan
+        else:
+            value = 100 - (100 / (1 + self.avg_gain / self.avg_loss))
+
+        self.value = value
+        return value
+
+    def update_many(self, prices) -> np.ndarray:
+        """
+        Add several bars, return the RSI after each of them
+        """
+        return np.array([self.update(price) for price in prices], dtype=float)
+
+    def state(self) -> dict:
+        return {"kind": "rsi", **{name: getattr(self, name) for name in self.__slots__}}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "WilderRSI":
+        rsi = cls(state["length"])
+        for name in cls.__slots__:
+            setattr(rsi, name, state[name])
+        return rsi
+
+
+def indicator_from_state(state: dict) -> RollingSMA | WilderRSI:
+    """
+    Rebuild a streaming indicator from its state() dict
+    """
+    kinds = {"sma": RollingSMA, "rsi": WilderRSI}
+    return kinds[state["kind"]].from_state(state)
@@ -0,0 +1,166 @@
+import numpy as np
+
+from trading_lab._jit import jit_kernel
+
+# -------------------------------------------------
+# Single-pass state machines of the strategies and the portfolio
+# Each kernel is a plain loop compiled with Numba on its first
+# call (see _jit.jit_kernel), with a vectorized NumPy fallback
+# giving the same results. They run on NumPy arrays and are
+# shared by the DataFrame functions (sma_cross, rsi_cross,
+# signal_to_pos) and their array versions used by the engine.
+# Signals follow the 'signal' column convention: 1 buy, -1 sell, 0.
+
+# ------------ Crossovers ------------
+
+def _cross_signal_numpy(above):
+    signal = np.zeros(above.size, dtype=np.int8)
+    signal[1:][above[1:] & ~above[:-1]] = 1
+    signal[1:][~above[1:] & above[:-1]] = -1
+    return signal
+
+@jit_kernel(_cross_signal_numpy)
+def cross_signal(above):
+    """
+    Buy when a condition becomes true, sell when it becomes false
+
+    :param above: Boolean array, e.g. fast SMA > slow SMA
+    :return: Signal array (int8), 0 on the first bar
+    :rtype: ndarray
+    """
+    signal = np.zeros(above.size, dtype=np.int8)
+    for t in range(1, above.size):
+        if above[t] and not above[t - 1]:
+            signal[t] = 1
+        elif above[t - 1] and not above[t]:
+            signal[t] = -1
+    return signal
+
+# ------------ Thresholds ------------
+
+def _threshold_signal_numpy(values, lower, upper):
+    if upper < lower:
+        raise ValueError("⚠️ The upper strip must not be below the lower strip")
+    above = values > upper
+    below = values < lower
+
+    raw_signal = np.zeros(values.size, dtype=np.int8)
+    raw_signal[1:][above[1:] & ~above[:-1]] = 1
+    raw_signal[1:][below[1:] & ~below[:-1]] = -1
+
+    # Forward fill the last raw signal into a -1/0/1 position
+    last = np.where(raw_signal != 0, np.arange(values.size), 0)
+    np.maximum.accumulate(last, out=last)
+    position = raw_signal[last]
+
+    signal = np.zeros(values.size, dtype=np.int8)
+    signal[1:] = np.clip(np.diff(position), -1, 1)
+    return signal
+
+@jit_kernel(_threshold_signal_numpy)
+def threshold_signal(values, lower, upper):
+    """
+    Threshold strategy (rsi_cross): long from a cross above 'upper'
+    until a cross below 'lower'
+
+    :param values: Indicator array, e.g. an RSI
+    :param lower: Lower strip, crossing below it sells
+    :param upper: Upper strip, crossing above it buys, not below lower
+                  (a bar could cross both strips otherwise)
+    :return: Signal array (int8), 0 on the first bar
+    :rtype: ndarray
+    """
+    if upper < lower:
+        raise ValueError("⚠️ The upper strip must not be below the lower strip")
+    signal = np.zeros(values.size, dtype=np.int8)
+    position = 0
+    for t in range(1, values.size):
+        if values[t] > upper and not values[t - 1] > upper:
+            new_position = 1
+        elif values[t] < lower and not values[t - 1] < lower:
+            new_position = -1
+        else:
+            continue
+        if new_position != position:
+            signal[t] = new_position
+            position = new_position
+    return signal
+
+# ------------ Positions ------------
+
+def _signal_to_pos_numpy(signal):
+    # Last non zero signal at or before each bar, a would-be first sell gives a flat position anyway
+    last = np.where(signal != 0, np.arange(signal.size), 0)
+    np.maximum.accumulate(last, out=last)
+    pos = (signal[last] == 1).astype(np.float64)
+    if pos.size:
+        pos[-1] = 0.0
+    return pos
+
+@jit_kernel(_signal_to_pos_numpy)
+def signal_to_pos(signal):
+    """
+    Long only position of a signal: 1 from a buy until the bar before a sell
+
+    A leading sell is ignored and the last bar is flat (final sell).
+
+    :param signal: Signal array
+    :return: Position array (float64, 1 or 0)
+    :rtype: ndarray
+    """
+    pos = np.zeros(signal.size, dtype=np.float64)
+    held = 0.0
+    for t in range(signal.size):
+        if signal[t] == 1:
+            held = 1.0
+        elif signal[t] == -1:
+            held = 0.0
+        pos[t] = held
+    if signal.size:
+        pos[signal.size - 1] = 0.0
+    return pos
+
+def _signal_to_pos_columns_numpy(signal):
+    n_rows = signal.shape[0]
+    rows = np.arange(n_rows)[:, None]
+    valid = ~np.isnan(signal)
+    last_signal = np.where(valid & (signal != 0), rows, -1)
+    np.maximum.accumulate(last_signal, axis=0, out=last_signal)
+    held = np.take_along_axis(signal, np.maximum(last_signal, 0), axis=0) == 1
+    pos = np.where(np.logical_or.accumulate(valid, axis=0), (last_signal >= 0) & held, np.nan)
+
+    # Flat from the last row of each column on
+    last_row = n_rows - 1 - valid[::-1].argmax(axis=0)
+    pos[(rows >= last_row) & valid.any(axis=0)] = 0.0
+    return pos
+
+@jit_kernel(_signal_to_pos_columns_numpy)
+def signal_to_pos_columns(signal):
+    """
+    signal_to_pos of every column of a (bars x columns) signal, NaN marking bars without a row
+
+    A column behaves like signal_to_pos on its own rows: the position is carried
+    over the NaN bars, and is flat from the last row of the column on.
+
+    :param signal: Signal matrix (float), NaN where a column has no row
+    :return: Position matrix (float64, 1 or 0), NaN before the first row of a column
+    :rtype: ndarray
+    """
+    n_rows, n_cols = signal.shape
+    pos = np.full((n_rows, n_cols), np.nan)
+    for j in range(n_cols):
+        held = np.nan
+        last = -1
+        for t in range(n_rows):
+            s = signal[t, j]
+            if s == s:
+                if s == 1:
+                    held = 1.0
+                elif s == -1 or held != held:
+                    held = 0.0
+                last = t
+            pos[t, j] = held
+        if last >= 0:
+            for t in range(last, n_rows):
+                pos[t, j] = 0.0
+    return pos
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+# -------------------------------------------------
+# Walk-forward cross validation
+# Folds are pairs of slices over the rows of X (built once by
+# process_data), so X[train] / X[test] are NumPy views, not copies.
+# Training rows whose target looks into the test window are purged:
+# create_target uses the next 'horizon' bars, so 'purge=horizon'
+# rows are dropped before each test window, plus an optional embargo.
+
+def walk_forward_splits(n_samples: int, n_splits: int = 5, test_size: int | None = None,
+                        window: str = "expanding", train_size: int | None = None,
+                        purge: int = 0, embargo: int = 0) -> list:
+    """
+    Walk-forward (train, test) slices, test windows are contiguous and chronological
+
+    :param n_samples: Number of rows
+    :param n_splits: Number of folds
+    :param test_size: Rows per test window, n_samples // (n_splits + 1) by default
+    :param window: 'expanding' (train from row 0) or 'rolling' (last train_size rows)
+    :param train_size: Train rows of a rolling window, test_size * 2 by default
+    :param purge: Rows dropped before each test window, the create_target horizon
+    :param embargo: Extra rows dropped between train and test
+    :return: List of (train slice, test slice)
+    :rtype: list
+    """
+    if window not in ("expanding", "rolling"):
+        raise ValueError("⚠️ window must be 'expanding' or 'rolling'")
+    test_size = test_size or n_samples // (n_splits + 1)
+    train_size = train_size or 2 * test_size
+
+    splits = []
+    for k in range(n_splits):
+        test_start = n_samples - (n_splits - k) * test_size
+        train_end = test_start - purge - embargo
+        train_start = 0 if window == "expanding" else max(0, train_end - train_size)
+        if train_end <= train_start:
+            raise ValueError("⚠️ Not enough rows for the first training window")
+        splits.append((slice(train_start, train_end), slice(test_start, test_start + test_size)))
+    return splits
+
+def _fit_fold(X: np.ndarray, y: np.ndarray, train: slice, params: dict, n_jobs: int,
+              xgb_model: "xgb.Booster | None" = None) -> "xgb.XGBClassifier":
+    import xgboost as xgb
+
+    model = xgb.XGBClassifier(objective='multi:softmax',
+                              num_class=3,
+                              random_state=42,
+                              n_jobs=n_jobs,
+                              **params)
+    model.fit(X[train], y[train], xgb_model=xgb_model)
+    return model
+
+def walk_forward_cv(X: pd.DataFrame, y: pd.Series, params: dict, splits: list,
+                    n_workers: int | None = None, warm_start: bool = False,
+                    warm_rounds: int | None = None) -> tuple:
+    """
+    Train and score one XGBoost config on every fold
+
+    :param X: Features, as returned by process_data
+    :param y: Target (-1, 0, 1)
+    :param params: XGBoost parameters, as for train_xgboost
+    :param splits: Folds from walk_forward_splits
+    :param n_workers: Folds trained at once on threads sharing X, os.cpu_count() by default
+    :param warm_start: Continue each fold from the previous fold's booster (sequential)
+    :param warm_rounds: Trees added per warm started fold, n_estimators // 4 by default
+    :return: (scores, models): one row per fold with its bounds and accuracy, and the fold models
+    :rtype: tuple
+    """
+    X_arr = X.to_numpy(dtype=float)
+    y_arr = y.to_numpy().astype(int) + 1            # -1, 0, 1 -> 0, 1, 2
+    n_workers = n_workers or os.cpu_count()
+
+    if warm_start:
+        warm_rounds = warm_rounds or max(1, params.get('n_estimators', 100) // 4)
+        models = []
+        for k, (train, _) in enumerate(splits):
+            fold_params = params if k == 0 else {**params, 'n_estimators': warm_rounds}
+            booster = models[-1].get_booster() if models else None
+            models.append(_fit_fold(X_arr, y_arr, train, fold_params, os.cpu_count(), xgb_model=booster))
+    else:
+        n_jobs = max(1, os.cpu_count() // n_workers)
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            models = list(pool.map(lambda train: _fit_fold(X_arr, y_arr, train, params, n_jobs),
+                                   [train for train, _ in splits]))
+
+    rows = []
+    for k, ((train, test), model) in enumerate(zip(splits, models)):
+        preds = model.predict(X_arr[test])
+        rows.append({
+            "fold": k,
+            "train_start": X.index[train.start],
+            "train_end": X.index[train.stop - 1],
+            "test_start": X.index[test.start],
+            "test_end": X.index[test.stop - 1],
+            "n_train": train.stop - train.start,
+            "accuracy": float((preds == y_arr[test]).mean()),
+        })
+
+    return pd.DataFrame(rows).set_index("fold"), models
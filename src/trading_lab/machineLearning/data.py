@@ -1,25 +1,34 @@
 import pandas as pd
 import numpy as np
+from trading_lab.data.frame import PriceFrame
 from trading_lab.indicators.indicators import add_sma, add_rsi
+from trading_lab.profiling import timed
 
-def create_features(df: pd.DataFrame) -> pd.DataFrame:
+@timed("ml.create_features")
+def create_features(df: pd.DataFrame | PriceFrame, cache=None) -> pd.DataFrame | PriceFrame:
     """
     Docstring pour create_features
     
     :param df: Description
+    :param cache: Optional IndicatorCache passed to add_sma / add_rsi
+    :return: Features, a PriceFrame of the same dtype when df is a PriceFrame
     """
-    df_features = df.copy()
+    if isinstance(df, PriceFrame):
+        features = create_features(df.to_frame(), cache=cache)
+        return PriceFrame.from_frame(features, dtype=df.dtype, name=df.name)
+
+    # rename returns a new table, the columns added below never reach df
     df_features = df.rename(columns={'Adj Close':'adj close'})
 
-    df_features = add_sma(df_features, 20)
-    df_features = add_sma(df_features, 50)
-    df_features = add_sma(df_features, 200)
+    df_features = add_sma(df_features, 20, cache=cache)
+    df_features = add_sma(df_features, 50, cache=cache)
+    df_features = add_sma(df_features, 200, cache=cache)
 
     df_features['price_to_sma_20'] = df_features['adj close'] / df_features['sma_20'] - 1
     df_features['price_to_sma_50'] = df_features['adj close'] / df_features['sma_50'] - 1
 
-    df_features = add_rsi(df_features, 14)
-    df_features = add_rsi(df_features, 28)
+    df_features = add_rsi(df_features, 14, cache=cache)
+    df_features = add_rsi(df_features, 28, cache=cache)
 
     df_features['rets_1d'] = df_features['adj close'].pct_change()
     df_features['rets_5d'] = df_features['adj close'].pct_change(5)
@@ -33,6 +42,7 @@ def create_features(df: pd.DataFrame) -> pd.DataFrame:
 
     return df_features
 
+@timed("ml.create_target")
 def create_target(df: pd.DataFrame, horizon: int=5, buy_trsh: float=.02, sell_trsh:float=-.02) -> pd.Series:
     """
     Docstring pour create_target
@@ -0,0 +1,150 @@
+import hashlib
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.machineLearning.models import LABELS
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+# -------------------------------------------------
+# Inference service for trained XGBoost classifiers
+#   - the booster is loaded once, predictions skip the sklearn wrapper
+#   - batch scoring: the rows of many tickers go through one call,
+#     their DMatrix is kept in a small LRU (re-scoring the same
+#     matrix, or labels then probabilities, builds it once)
+#   - single-row path for streaming: inplace_predict on a
+#     preallocated (1, n_features) buffer, no DMatrix at all
+#   - class index -> label is an array lookup, LABELS[preds]
+#   - every call is timed, latency() gives p50 / p99 per path
+
+class InferenceSession:
+    """
+    Loaded model ready to score
+
+    :param model: XGBClassifier, Booster, or path to a saved model (.ubj / .json)
+    :param n_threads: Threads used by XGBoost, all cores by default
+    :param dmatrix_cache: Number of batch DMatrix kept
+    :param latency_window: Number of recent calls kept per path for the latency stats
+    """
+    def __init__(self, model, n_threads: int | None = None, dmatrix_cache: int = 8,
+                 latency_window: int = 10_000):
+        import xgboost as xgb
+
+        if isinstance(model, (str, Path)):
+            booster = xgb.Booster()
+            booster.load_model(str(model))
+        elif isinstance(model, xgb.Booster):
+            booster = model
+        else:
+            booster = model.get_booster()
+        if n_threads is not None:
+            booster = booster.copy()        # The caller's model keeps its own nthread
+            booster.set_param({"nthread": n_threads})
+
+        self.booster = booster
+        self.feature_names = booster.feature_names
+        self.n_features = booster.num_features()
+        self.dmatrix_cache = dmatrix_cache
+        self._dmatrices = OrderedDict()
+        self._row = np.empty((1, self.n_features), dtype=np.float32)
+        self._latency = {name: deque(maxlen=latency_window) for name in ("batch", "one")}
+
+    # ------------ Inputs ------------
+
+    def _array(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names is not None and list(X.columns) != self.feature_names:
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"⚠️ Expected {self.n_features} features, got shape {X.shape}")
+        return X
+
+    def _dmatrix(self, X: np.ndarray) -> "xgb.DMatrix":
+        """
+        DMatrix of a batch, reused while the same values are scored
+        """
+        import xgboost as xgb
+
+        key = hashlib.blake2b(X.tobytes(), digest_size=16).digest() + bytes(str(X.shape), "ascii")
+        if key in self._dmatrices:
+            self._dmatrices.move_to_end(key)
+            return self._dmatrices[key]
+        dmatrix = xgb.DMatrix(X, feature_names=self.feature_names)
+        self._dmatrices[key] = dmatrix
+        if len(self._dmatrices) > self.dmatrix_cache:
+            self._dmatrices.popitem(last=False)
+        return dmatrix
+
+    # ------------ Scoring ------------
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Labels (-1, 0, 1) of a batch of rows
+        """
+        start = time.perf_counter()
+        preds = self.booster.predict(self._dmatrix(self._array(X)))
+        labels = LABELS[preds.astype(np.intp)]
+        self._latency["batch"].append(time.perf_counter() - start)
+        return labels
+
+    def predict_proba(self, X) -> np.ndarray:
+        """
+        Class probabilities (SELL, HOLD, BUY) of a batch of rows, softmax of the margins
+        """
+        margins = self.booster.predict(self._dmatrix(self._array(X)), output_margin=True)
+        margins = margins - margins.max(axis=1, keepdims=True)
+        probas = np.exp(margins)
+        return probas / probas.sum(axis=1, keepdims=True)
+
+    def predict_batch(self, features: dict) -> dict:
+        """
+        Score the rows of many tickers in a single call
+
+        :param features: {ticker: features (DataFrame or 2-D array)}, e.g. the last rows of each ticker
+        :return: {ticker: labels}, a Series when the input was a DataFrame
+        :rtype: dict
+        """
+        tickers = list(features)
+        arrays = [self._array(features[ticker]) for ticker in tickers]
+        labels = self.predict(np.concatenate(arrays)) if arrays else np.empty(0, dtype=LABELS.dtype)
+
+        out = {}
+        bounds = np.cumsum([0] + [array.shape[0] for array in arrays])
+        for ticker, lo, hi in zip(tickers, bounds[:-1], bounds[1:]):
+            values = features[ticker]
+            out[ticker] = pd.Series(labels[lo:hi], index=values.index) if isinstance(values, pd.DataFrame) else labels[lo:hi]
+        return out
+
+    def predict_one(self, row) -> int:
+        """
+        Label of a single row (1-D, in feature order), the streaming fast path
+        """
+        start = time.perf_counter()
+        self._row[0] = row
+        pred = self.booster.inplace_predict(self._row)
+        label = int(LABELS[int(pred[0])])
+        self._latency["one"].append(time.perf_counter() - start)
+        return label
+
+    # ------------ Latency ------------
+
+    def latency(self) -> pd.DataFrame:
+        """
+        Count, mean, p50 and p99 latency (ms) of the recent calls of each path
+        """
+        rows = {}
+        for name, times in self._latency.items():
+            times = np.asarray(times) * 1e3
+            rows[name] = {"count": times.size,
+                          "mean_ms": times.mean() if times.size else np.nan,
+                          "p50_ms": np.percentile(times, 50) if times.size else np.nan,
+                          "p99_ms": np.percentile(times, 99) if times.size else np.nan}
+        return pd.DataFrame(rows).T
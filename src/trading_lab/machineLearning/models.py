@@ -1,9 +1,15 @@
 import pandas as pd
-import xgboost as xgb
-from sklearn.metrics import accuracy_score, classification_report
 import itertools
 import numpy as np
 
+from trading_lab import profiling
+
+# xgboost and sklearn are imported on first use (slow imports, not needed by every worker)
+
+# Class index of the model -> label: 0 -> -1 (sell), 1 -> 0 (hold), 2 -> 1 (buy)
+LABELS = np.array([-1, 0, 1])
+
+@profiling.timed("ml.train")
 def train_xgboost(X_train: pd.DataFrame, y_train: pd.Series, params):
     """
     Docstring pour train_xgboost classifier
@@ -14,6 +20,8 @@ def train_xgboost(X_train: pd.DataFrame, y_train: pd.Series, params):
     :type y_train: pd.Series
     :param params: Description
     """
+    import xgboost as xgb
+
     # Map target : target Series need to be non-negative
     y_train_map = y_train.map({-1: 0, 0: 1, 1: 2})
 
@@ -46,6 +54,7 @@ def create_param_grid() -> dict:
 }
     return param_grid
 
+@profiling.timed("ml.predict")
 def predict(model, X):
     """
     Predict and map back to original labels
@@ -57,8 +66,7 @@ def predict(model, X):
     preds_mapped = model.predict(X)
     
     # Map back: 0→-1, 1→0, 2→1
-    reverse_map = {0: -1, 1: 0, 2: 1}
-    preds = pd.Series([reverse_map[p] for p in preds_mapped], index=X.index)
+    preds = pd.Series(LABELS[np.asarray(preds_mapped, dtype=np.intp)], index=X.index)
     
     return preds
 
@@ -72,6 +80,8 @@ def evaluate(model, X, y, set_name='Validation'):
     :param y: True labels
     :param set_name: Name for printing
     """
+    from sklearn.metrics import accuracy_score, classification_report
+
     preds = predict(model, X)
     acc = accuracy_score(y, preds)
     
@@ -82,7 +92,7 @@ def evaluate(model, X, y, set_name='Validation'):
 
 def grid_search(X_train: pd.DataFrame, y_train: pd.Series,
                 X_val: pd.DataFrame, y_val: pd.Series,
-                param_grid: dict, max_combinations: int=50) -> tuple:
+                param_grid: dict, max_combinations: int=50, registry=None, profile: bool = False) -> tuple:
     """
     Docstring pour grid_search
     
@@ -98,28 +108,37 @@ def grid_search(X_train: pd.DataFrame, y_train: pd.Series,
     :type param_grid: dict
     :param max_combinations: Description
     :type max_combinations: int
-    :return: Description
+    :param registry: Optional ModelRegistry, every model is saved and a rerun loads instead of training
+    :param profile: Also return the time spent in each stage (training, prediction, ...)
+    :return: Description, plus the stage breakdown if profile
     :rtype: tuple
     """
+    if profile:
+        with profiling.profiling() as profiler:
+            res = grid_search(X_train, y_train, X_val, y_val, param_grid,
+                              max_combinations=max_combinations, registry=registry)
+        return *res, profiler.summary()
+
     print("\n" + "=" * 60)
     print("STARTING GRID SEARCH")
     print("=" * 60)
 
-    # Generate all combinations
+    from sklearn.metrics import accuracy_score
+
+    # Combinations are decoded from their index, the full product is never built
+    from trading_lab.machineLearning.search import decode_combination, grid_size
     keys = param_grid.keys()
-    values = param_grid.values()
-    all_combos = list(itertools.product(*values))
+    total = grid_size(param_grid)
 
     # Limit if too many
-    if len(all_combos) > max_combinations:
-        print(f"Total combinations: {len(all_combos)}")
+    if total > max_combinations:
+        print(f"Total combinations: {total}")
         print(f"Sampling {max_combinations} random combinations...")
-        import numpy as np
         np.random.seed(42)
-        indices = np.random.choice(len(all_combos), max_combinations, replace=False)
-        combos = [all_combos[i] for i in indices]
+        indices = np.random.choice(total, max_combinations, replace=False)
+        combos = [tuple(decode_combination(param_grid, i).values()) for i in indices]
     else:
-        combos = all_combos
+        combos = list(itertools.product(*param_grid.values()))
     
     print(f"Testing {len(combos)} combinations...\n")
 
@@ -128,17 +147,28 @@ def grid_search(X_train: pd.DataFrame, y_train: pd.Series,
     best_params = None
     best_model = None
 
+    # Same training set for every combination, hashed once for the registry keys
+    if registry is not None:
+        from trading_lab.machineLearning.registry import data_fingerprint
+        with profiling.stage("ml.registry"):
+            data_hash = data_fingerprint(X_train, y_train)
+
     for idx, combo in enumerate(combos, 1):
         # Create param dict
         params = dict(zip(keys, combo))
         # Train model
-        model = train_xgboost(X_train=X_train,
-                              y_train=y_train,
-                              params=params)
+        if registry is not None:
+            with profiling.stage("ml.registry"):
+                model = registry.get_or_train(params, X_train, y_train, data_hash=data_hash)
+        else:
+            model = train_xgboost(X_train=X_train,
+                                  y_train=y_train,
+                                  params=params)
         
         # Evaluate on validation set
         preds = predict(model, X_val)
-        acc = accuracy_score(y_val, preds)
+        with profiling.stage("ml.score"):
+            acc = accuracy_score(y_val, preds)
 
         # Store results
         result = params.copy()
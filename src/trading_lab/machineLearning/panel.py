@@ -0,0 +1,170 @@
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.profiling import timed
+
+# -------------------------------------------------
+# Panel features: create_features for a whole universe at once.
+# Inputs are (dates x tickers) tables with NaN before listing /
+# after delisting. Every feature is computed with 2-D operations
+# on blocks of tickers, optionally on a thread pool (the pandas
+# rolling / ewm kernels release the GIL). A column gives the same
+# values as create_features on that ticker's own listed history,
+# missing prices in the middle of it included.
+# Cross-sectional features (ranks and z-scores across tickers of
+# the same date) are added on top.
+
+# Same names and order as create_features
+FEATURES = ["sma_20", "sma_50", "sma_200", "price_to_sma_20", "price_to_sma_50", "RSI_14", "RSI_28",
+            "rets_1d", "rets_5d", "rets_10d", "vol_20d", "volume_ratio_20"]
+
+CROSS_SECTIONAL = ["rets_5d", "rets_10d", "RSI_14", "vol_20d"]
+
+def _rsi_panel(prices: pd.DataFrame, length: int, listed_bars: np.ndarray) -> np.ndarray:
+    """
+    rsi_array on every column, each one starting at its first price
+    """
+    delta = prices.diff()
+    # rsi_array counts a bar without a change (first bar, price gaps and
+    # the bar after them) as a 0 gain and a 0 loss. Zeros before the
+    # listing keep both averages at 0, as rsi_array starts them
+    gains = delta.clip(lower=0).fillna(0.0)
+    losses = (-delta).clip(lower=0).fillna(0.0)
+
+    avg_gain = gains.ewm(alpha=1/length, adjust=False).mean().to_numpy()
+    avg_loss = losses.ewm(alpha=1/length, adjust=False).mean().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    rsi[listed_bars <= length] = np.nan
+    return rsi
+
+def _block_features(prices: np.ndarray, volume: np.ndarray) -> list:
+    """
+    FEATURES of a block of tickers, list of (dates x block) arrays
+    """
+    prices = pd.DataFrame(prices)
+    volume = pd.DataFrame(volume)
+    listed_bars = np.cumsum(prices.notna().to_numpy(), axis=0)
+
+    sma_20 = prices.rolling(20).mean()
+    sma_50 = prices.rolling(50).mean()
+    sma_200 = prices.rolling(200).mean()
+    rets_1d = prices.pct_change(fill_method=None)
+
+    features = [
+        sma_20, sma_50, sma_200,
+        prices / sma_20 - 1,
+        prices / sma_50 - 1,
+        _rsi_panel(prices, 14, listed_bars),
+        _rsi_panel(prices, 28, listed_bars),
+        rets_1d,
+        prices.pct_change(5, fill_method=None),
+        prices.pct_change(10, fill_method=None),
+        rets_1d.rolling(20).std(),
+        volume / volume.rolling(20).mean(),
+    ]
+    return [np.asarray(feature) for feature in features]
+
+def _cross_sectional(values: np.ndarray) -> tuple:
+    """
+    Percentile rank and z-score of each row across tickers, NaN ignored
+    """
+    ranks = pd.DataFrame(values).rank(axis=1, pct=True).to_numpy()
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)              # Dates without any price
+        mean = np.nanmean(values, axis=1, keepdims=True)
+        std = np.nanstd(values, axis=1, keepdims=True)
+        zscores = (values - mean) / std
+    return ranks, zscores
+
+@timed("ml.panel_features")
+def panel_features(prices: pd.DataFrame, volume: pd.DataFrame, cross_sectional: list | None = CROSS_SECTIONAL,
+                   n_workers: int | None = 1, block_size: int = 256, dtype=np.float32) -> tuple:
+    """
+    create_features for every ticker of a (dates x tickers) panel
+
+    :param prices: Adjusted close prices, (dates x tickers)
+    :param volume: Volumes, same shape
+    :param cross_sectional: Features also given as '<name>_rank' and '<name>_z' across tickers
+    :param n_workers: Threads over blocks of tickers, os.cpu_count() if None
+    :param block_size: Tickers per block
+    :param dtype: Output dtype
+    :return: (features, names): array of shape (dates, tickers, n_features) and the feature names
+    :rtype: tuple
+    """
+    if prices.shape != volume.shape:
+        raise ValueError("⚠️ prices and volume must have the same (dates x tickers) shape")
+    cross_sectional = list(cross_sectional or [])
+    names = FEATURES + [f"{name}_{kind}" for name in cross_sectional for kind in ("rank", "z")]
+
+    price_values = prices.to_numpy(dtype=float)
+    volume_values = volume.to_numpy(dtype=float)
+    n_dates, n_tickers = price_values.shape
+    out = np.empty((n_dates, n_tickers, len(names)), dtype=dtype)
+
+    def run_block(start: int) -> None:
+        block = slice(start, start + block_size)
+        for j, values in enumerate(_block_features(price_values[:, block], volume_values[:, block])):
+            out[:, block, j] = values
+
+    starts = range(0, n_tickers, block_size)
+    n_workers = n_workers or os.cpu_count()
+    if n_workers == 1:
+        for start in starts:
+            run_block(start)
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            list(pool.map(run_block, starts))
+
+    for k, name in enumerate(cross_sectional):
+        ranks, zscores = _cross_sectional(out[:, :, FEATURES.index(name)].astype(float))
+        out[:, :, len(FEATURES) + 2 * k] = ranks
+        out[:, :, len(FEATURES) + 2 * k + 1] = zscores
+
+    return out, names
+
+def panel_target(prices: pd.DataFrame, horizon: int = 5, buy_trsh: float = .02,
+                 sell_trsh: float = -.02) -> np.ndarray:
+    """
+    create_target for every ticker, NaN where there is no price
+
+    :return: Array (dates x tickers) of -1, 0, 1 or NaN
+    :rtype: ndarray
+    """
+    future_rets = prices.pct_change(horizon, fill_method=None).shift(-horizon).to_numpy()
+    target = np.where(future_rets > buy_trsh, 1.0, np.where(future_rets < sell_trsh, -1.0, 0.0))
+    target[prices.isna().to_numpy()] = np.nan
+    return target
+
+def panel_to_long(features: np.ndarray, names: list, dates: pd.Index, tickers: list,
+                  target: np.ndarray | None = None) -> tuple:
+    """
+    Long (date, ticker) format ready for XGBoost, rows with a NaN feature or target dropped
+
+    :param features: Array from panel_features
+    :param names: Feature names from panel_features
+    :param dates: Dates of the panel
+    :param tickers: Tickers of the panel
+    :param target: Optional array from panel_target
+    :return: (X, y), y is None without target
+    :rtype: tuple
+    """
+    n_dates, n_tickers, n_features = features.shape
+    flat = features.reshape(n_dates * n_tickers, n_features)        # View, dates major
+
+    keep = ~np.isnan(flat).any(axis=1)
+    if target is not None:
+        keep &= ~np.isnan(target.reshape(-1))
+
+    rows = np.flatnonzero(keep)
+    index = pd.MultiIndex.from_arrays([pd.Index(dates)[rows // n_tickers], pd.Index(tickers)[rows % n_tickers]],
+                                      names=["date", "ticker"])
+    X = pd.DataFrame(flat[rows], index=index, columns=names)
+    y = pd.Series(target.reshape(-1)[rows].astype(int), index=index, name="target") if target is not None else None
+
+    return X, y
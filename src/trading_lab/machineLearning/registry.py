@@ -0,0 +1,189 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.config import MODEL_REGISTRY_BYTES, MODEL_REGISTRY_DIR
+from trading_lab.indicators.cache import fingerprint
+from trading_lab.machineLearning.models import train_xgboost
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+# -------------------------------------------------
+# Local model registry
+# One directory per trained model under <root>/<config hash>/:
+#   model.ubj     the booster, XGBoost native binary format
+#   meta.json     params, feature order, training date range,
+#                 data fingerprint, xgboost version, last use
+# The config hash covers the params, the feature columns and the
+# training data, so an identical training request is a lookup.
+# Least recently used models are deleted above the disk budget.
+
+def data_fingerprint(X: pd.DataFrame, y: pd.Series) -> str:
+    """
+    Content hash of a training set (values, columns and dates)
+    """
+    index = X.index.get_level_values(-1) if isinstance(X.index, pd.MultiIndex) else X.index
+    dates = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(index))
+    parts = [fingerprint(X.to_numpy(dtype=float)), fingerprint(y.to_numpy(dtype=float)), fingerprint(dates)]
+    return fingerprint(np.frombuffer("|".join(parts + list(X.columns)).encode(), dtype=np.uint8))
+
+def config_hash(params: dict, X: pd.DataFrame, y: pd.Series, data_hash: str | None = None) -> str:
+    """
+    Key of a training request: params + features + data
+
+    :param data_hash: data_fingerprint(X, y) when already known, skips hashing the data
+    """
+    import xgboost as xgb
+
+    data_hash = data_hash or data_fingerprint(X, y)
+    config = json.dumps({"params": params, "features": list(X.columns), "data": data_hash,
+                         "xgboost": xgb.__version__}, sort_keys=True, default=str)
+    return fingerprint(np.frombuffer(config.encode(), dtype=np.uint8))
+
+
+class ModelRegistry:
+    """
+    Trained XGBoost classifiers saved on disk, looked up by config hash
+
+    :param root: Registry directory, config.MODEL_REGISTRY_DIR by default
+    :param max_bytes: Disk budget, least recently used models are deleted above it
+    """
+    def __init__(self, root: Path | str | None = None, max_bytes: int = MODEL_REGISTRY_BYTES):
+        self.root = Path(root or MODEL_REGISTRY_DIR)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / key / "meta.json"
+
+    def _write_meta(self, key: str, meta: dict) -> None:
+        tmp = self.root / key / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta, indent=1, default=str))
+        os.replace(tmp, self._meta_path(key))
+
+    # ------------ Save / load ------------
+
+    def save(self, model: "xgb.XGBClassifier", params: dict, X_train: pd.DataFrame, y_train: pd.Series,
+             data_hash: str | None = None) -> str:
+        """
+        Save a trained model with everything needed to reproduce it
+
+        :param data_hash: data_fingerprint(X_train, y_train) when already known
+        :return: Its config hash
+        :rtype: str
+        """
+        import xgboost as xgb
+
+        data_hash = data_hash or data_fingerprint(X_train, y_train)
+        key = config_hash(params, X_train, y_train, data_hash=data_hash)
+        (self.root / key).mkdir(parents=True, exist_ok=True)
+        model.save_model(self.root / key / "model.ubj")
+
+        dates = X_train.index.get_level_values(-1) if isinstance(X_train.index, pd.MultiIndex) else X_train.index
+        now = time.time()
+        self._write_meta(key, {
+            "key": key,
+            "params": params,
+            "features": list(X_train.columns),
+            "train_start": str(dates.min()) if len(dates) else None,
+            "train_end": str(dates.max()) if len(dates) else None,
+            "n_rows": len(X_train),
+            "data_fingerprint": data_hash,
+            "xgboost": xgb.__version__,
+            "created": now,
+            "last_used": now,
+        })
+        self.evict(keep=key)
+        return key
+
+    def load(self, key: str) -> "xgb.XGBClassifier":
+        """
+        Model saved under a config hash
+        """
+        import xgboost as xgb
+
+        meta = self.meta(key)
+        if meta is None:
+            raise ValueError(f"⚠️ No model {key} in the registry")
+        model = xgb.XGBClassifier()
+        model.load_model(self.root / key / "model.ubj")
+
+        meta["last_used"] = time.time()
+        self._write_meta(key, meta)
+        return model
+
+    def meta(self, key: str) -> dict | None:
+        path = self._meta_path(key)
+        if not path.exists() or not (self.root / key / "model.ubj").exists():
+            return None
+        return json.loads(path.read_text())
+
+    def get(self, params: dict, X_train: pd.DataFrame, y_train: pd.Series,
+            data_hash: str | None = None) -> "xgb.XGBClassifier | None":
+        """
+        Model of an identical training request, None if it was never trained
+        """
+        key = config_hash(params, X_train, y_train, data_hash=data_hash)
+        return self.load(key) if self.meta(key) is not None else None
+
+    def get_or_train(self, params: dict, X_train: pd.DataFrame, y_train: pd.Series,
+                     train=train_xgboost, data_hash: str | None = None) -> "xgb.XGBClassifier":
+        """
+        Load the model of an identical request, or train and save it
+
+        :param train: (X_train, y_train, params) -> model, train_xgboost by default
+        :param data_hash: data_fingerprint(X_train, y_train), computed once by callers looping over params
+        """
+        data_hash = data_hash or data_fingerprint(X_train, y_train)
+        model = self.get(params, X_train, y_train, data_hash=data_hash)
+        if model is None:
+            model = train(X_train=X_train, y_train=y_train, params=params)
+            self.save(model, params, X_train, y_train, data_hash=data_hash)
+        return model
+
+    # ------------ Listing and eviction ------------
+
+    def list(self) -> pd.DataFrame:
+        """
+        One row per saved model, most recently used first
+        """
+        metas = [meta for key in os.listdir(self.root) if (meta := self.meta(key)) is not None]
+        for meta in metas:
+            meta["nbytes"] = self._nbytes(meta["key"])
+        if not metas:
+            return pd.DataFrame(columns=["key", "params", "features", "train_start", "train_end", "nbytes"])
+        return pd.DataFrame(metas).sort_values("last_used", ascending=False).reset_index(drop=True)
+
+    def _nbytes(self, key: str) -> int:
+        return sum(path.stat().st_size for path in (self.root / key).iterdir())
+
+    def delete(self, key: str) -> None:
+        shutil.rmtree(self.root / key, ignore_errors=True)
+
+    def evict(self, keep: str | None = None) -> list:
+        """
+        Delete least recently used models until the registry fits in max_bytes
+
+        :param keep: Key never deleted (the model just saved)
+        :return: Deleted keys
+        :rtype: list
+        """
+        models = self.list()
+        total = int(models["nbytes"].sum()) if len(models) else 0
+        deleted = []
+        for key, nbytes in zip(models["key"][::-1], models["nbytes"][::-1]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.delete(key)
+            total -= nbytes
+            deleted.append(key)
+        return deleted
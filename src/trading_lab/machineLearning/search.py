@@ -0,0 +1,212 @@
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from trading_lab.machineLearning.models import predict
+
+# -------------------------------------------------
+# Hyperparameter search
+#   - combinations are decoded from an integer index,
+#     the itertools.product of the grid is never built
+#   - successive halving on n_estimators: every sampled config
+#     gets a small budget, the best 1/eta are continued
+#     (xgb_model warm start) with eta times more trees
+#   - trials run on a process pool, each result is appended
+#     to a JSONL checkpoint so that a search can resume
+#   - xgboost / sklearn are imported inside the functions, so
+#     pool workers do not pay for them before their first trial
+
+# ------------ Lazy combinations ------------
+
+def grid_size(param_grid: dict) -> int:
+    """
+    Number of combinations of a parameter grid
+    """
+    return math.prod(len(values) for values in param_grid.values())
+
+def decode_combination(param_grid: dict, index: int) -> dict:
+    """
+    index-th combination of the grid, in itertools.product order
+
+    :param param_grid: {param: list of values}
+    :param index: Integer in [0, grid_size)
+    :return: Parameter dict
+    :rtype: dict
+    """
+    params = {}
+    for key, values in reversed(list(param_grid.items())):
+        index, position = divmod(index, len(values))
+        params[key] = values[position]
+    return dict(reversed(list(params.items())))
+
+def sample_combinations(param_grid: dict, n: int, seed: int = 42) -> list:
+    """
+    n distinct random combinations, without materializing the grid
+
+    :param param_grid: {param: list of values}
+    :param n: Number of combinations, all of them if the grid is smaller
+    :param seed: Random seed
+    :return: List of parameter dicts
+    :rtype: list
+    """
+    total = grid_size(param_grid)
+    if n >= total:
+        indices = range(total)
+    else:
+        indices = random.Random(seed).sample(range(total), n)
+    return [decode_combination(param_grid, int(index)) for index in indices]
+
+# ------------ Trials ------------
+
+_DATA = {}
+
+def _init_worker(X_train, y_train, X_val, y_val) -> None:
+    _DATA.update(X_train=X_train, y_train=y_train.map({-1: 0, 0: 1, 1: 2}), X_val=X_val, y_val=y_val)
+
+def _run_trial(trial: int, rung: int, params: dict, n_rounds: int, prev_model: bytes | None, n_jobs: int) -> dict:
+    """
+    Train n_rounds more trees for one config and score it on the validation set
+    """
+    import xgboost as xgb
+    from sklearn.metrics import accuracy_score
+
+    booster = None
+    if prev_model is not None:
+        booster = xgb.Booster()
+        booster.load_model(bytearray(prev_model))
+
+    model = xgb.XGBClassifier(objective='multi:softmax',
+                              num_class=3,
+                              random_state=42,
+                              n_jobs=n_jobs,
+                              **{**params, 'n_estimators': n_rounds})
+    model.fit(_DATA["X_train"], _DATA["y_train"], xgb_model=booster)
+
+    acc = accuracy_score(_DATA["y_val"], predict(model, _DATA["X_val"]))
+    return {"trial": trial, "rung": rung, "val_accuracy": float(acc),
+            "model": bytes(model.get_booster().save_raw("ubj"))}
+
+def _load_checkpoint(checkpoint_dir: Path | None) -> dict:
+    done = {}
+    if checkpoint_dir is None or not (checkpoint_dir / "trials.jsonl").exists():
+        return done
+    for line in (checkpoint_dir / "trials.jsonl").read_text().splitlines():
+        record = json.loads(line)
+        model_path = checkpoint_dir / "models" / f"{record['trial']}_{record['rung']}.ubj"
+        if model_path.exists():
+            record["model"] = model_path.read_bytes()
+            done[(record["trial"], record["rung"])] = record
+    return done
+
+def _save_checkpoint(checkpoint_dir: Path | None, record: dict, params: dict, budget: int) -> None:
+    if checkpoint_dir is None:
+        return
+    (checkpoint_dir / "models").mkdir(parents=True, exist_ok=True)
+    (checkpoint_dir / "models" / f"{record['trial']}_{record['rung']}.ubj").write_bytes(record["model"])
+    line = {"trial": record["trial"], "rung": record["rung"], "n_estimators": budget,
+            "params": params, "val_accuracy": record["val_accuracy"]}
+    with open(checkpoint_dir / "trials.jsonl", "a") as f:
+        f.write(json.dumps(line) + "\n")
+
+# ------------ Successive halving ------------
+
+def budget_rungs(min_budget: int, max_budget: int, eta: int = 3) -> list:
+    """
+    n_estimators of each rung: min_budget * eta^k, the last one capped to max_budget
+    """
+    rungs = [min_budget]
+    while rungs[-1] < max_budget:
+        rungs.append(min(rungs[-1] * eta, max_budget))
+    return rungs
+
+def halving_search(X_train: pd.DataFrame, y_train: pd.Series,
+                   X_val: pd.DataFrame, y_val: pd.Series,
+                   param_grid: dict, n_trials: int = 200, eta: int = 3,
+                   min_estimators: int | None = None, n_workers: int | None = None,
+                   checkpoint_dir: Path | str | None = None, seed: int = 42) -> tuple:
+    """
+    Parallel successive halving search on n_estimators
+
+    :param X_train: Training features
+    :param y_train: Training target (-1, 0, 1)
+    :param X_val: Validation features
+    :param y_val: Validation target
+    :param param_grid: Grid as in create_param_grid, its 'n_estimators' values give the budget range
+    :param n_trials: Number of configs sampled for the first rung
+    :param eta: Only the best 1/eta configs go to the next rung, with eta times more trees
+    :param min_estimators: Budget of the first rung, min of the grid's n_estimators by default
+    :param n_workers: Worker processes, os.cpu_count() by default, 1 runs in process
+    :param checkpoint_dir: Directory where finished trials are saved, a search resumes from it
+    :param seed: Sampling seed
+    :return: (best_params, best_model, results_df) like grid_search
+    :rtype: tuple
+    """
+    import xgboost as xgb
+
+    grid = {key: values for key, values in param_grid.items() if key != 'n_estimators'}
+    n_estimators = param_grid.get('n_estimators', [100])
+    rungs = budget_rungs(min_estimators or min(n_estimators), max(n_estimators), eta=eta)
+
+    n_workers = n_workers or os.cpu_count()
+    n_jobs = max(1, os.cpu_count() // n_workers)
+    checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir is not None else None
+    done = _load_checkpoint(checkpoint_dir)
+
+    configs = sample_combinations(grid, n_trials, seed=seed)
+    survivors = list(range(len(configs)))
+    records = {}
+
+    print(f"Successive halving: {len(configs)} configs, n_estimators rungs {rungs}")
+
+    initargs = (X_train, y_train, X_val, y_val)
+    if n_workers == 1:
+        _init_worker(*initargs)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=initargs)
+
+    try:
+        for rung, budget in enumerate(rungs):
+            n_rounds = budget - (rungs[rung - 1] if rung else 0)
+            tasks = []
+            for trial in survivors:
+                if done.get((trial, rung), {}).get("params") == configs[trial]:
+                    records[(trial, rung)] = done[(trial, rung)]
+                    continue
+                prev_model = records[(trial, rung - 1)]["model"] if rung else None
+                tasks.append((trial, rung, configs[trial], n_rounds, prev_model, n_jobs))
+
+            if pool is None:
+                finished = (_run_trial(*task) for task in tasks)
+            else:
+                finished = (future.result() for future in as_completed([pool.submit(_run_trial, *task) for task in tasks]))
+            for record in finished:
+                records[(record["trial"], rung)] = record
+                _save_checkpoint(checkpoint_dir, record, configs[record["trial"]], budget)
+
+            scores = sorted(survivors, key=lambda trial: records[(trial, rung)]["val_accuracy"], reverse=True)
+            best_acc = records[(scores[0], rung)]["val_accuracy"]
+            print(f"Rung {rung} | n_estimators={budget} | {len(survivors)} configs | Best: {best_acc:.4f}")
+
+            if rung < len(rungs) - 1:
+                survivors = scores[:max(1, math.ceil(len(survivors) / eta))]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _DATA.clear()
+
+    best_trial = scores[0]
+    best_params = {**configs[best_trial], 'n_estimators': rungs[-1]}
+    best_model = xgb.XGBClassifier()
+    best_model.load_model(bytearray(records[(best_trial, len(rungs) - 1)]["model"]))
+
+    results = [{**configs[trial], 'n_estimators': rungs[rung], 'rung': rung, 'val_accuracy': record["val_accuracy"]}
+               for (trial, rung), record in records.items()]
+    results_df = pd.DataFrame(results).sort_values(['rung', 'val_accuracy'], ascending=False)
+
+    return best_params, best_model, results_df
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.config import FEATURE_STORE_DIR
+from trading_lab.machineLearning.data import create_features, create_target
+
+# -------------------------------------------------
+# On-disk feature store
+# The output of create_features / create_target (the rows kept by
+# process_data) is written per ticker as raw column files:
+#   <root>/<TICKER>/meta.json       schema hash, columns, row count
+#   <root>/<TICKER>/dates.i8        int64 dates
+#   <root>/<TICKER>/<column>.bin    one file per feature + 'target'
+# Files are memory-mapped when read, and only new dates are
+# appended on later runs. The last 'horizon' rows have a target
+# looking past the end of the prices ("pending"), they are
+# recomputed on the next update.
+
+# Bump when create_features / create_target change, every store is rebuilt
+FEATURE_VERSION = 1
+
+# Bars recomputed before the new dates (SMA 200 warm-up, RSI smoothing)
+LOOKBACK = 1000
+
+class FeatureStore:
+    """
+    Memory-mapped features and target of process_data, per ticker
+
+    :param root: Store directory, config.FEATURE_STORE_DIR by default
+    :param horizon: create_target horizon
+    :param buy_trsh: create_target buy threshold
+    :param sell_trsh: create_target sell threshold
+    :param dtype: Storage dtype of the features, float32 halves the size
+    """
+    def __init__(self, root: Path | str | None = None, horizon: int = 5, buy_trsh: float = .02,
+                 sell_trsh: float = -.02, dtype=np.float32):
+        self.root = Path(root or FEATURE_STORE_DIR)
+        self.horizon = horizon
+        self.buy_trsh = buy_trsh
+        self.sell_trsh = sell_trsh
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def schema_hash(self) -> str:
+        schema = {"version": FEATURE_VERSION, "horizon": self.horizon, "buy_trsh": self.buy_trsh,
+                  "sell_trsh": self.sell_trsh, "dtype": self.dtype.str}
+        return hashlib.blake2b(json.dumps(schema, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+    # ------------ Files ------------
+
+    def _dir(self, ticker: str) -> Path:
+        return self.root / ticker.upper()
+
+    def meta(self, ticker: str) -> dict | None:
+        """
+        meta.json of a ticker, None if it is missing or built with another schema
+        """
+        path = self._dir(ticker) / "meta.json"
+        if not path.exists():
+            return None
+        meta = json.loads(path.read_text())
+        return meta if meta["schema"] == self.schema_hash else None
+
+    def _files(self, ticker: str, columns: list) -> dict:
+        files = {"dates": (self._dir(ticker) / "dates.i8", np.dtype(np.int64))}
+        for column in columns:
+            files[column] = (self._dir(ticker) / f"{column}.bin", self.dtype)
+        return files
+
+    def columns(self, ticker: str) -> dict:
+        """
+        Read-only memmaps of every column of a ticker, plus 'dates' (int64)
+        """
+        meta = self.meta(ticker)
+        if meta is None:
+            raise ValueError(f"⚠️ No features stored for {ticker} - run update first")
+        if meta["n_rows"] == 0:
+            return {name: np.empty(0, dtype) for name, (_, dtype) in self._files(ticker, meta["columns"]).items()}
+        return {name: np.memmap(path, dtype=dtype, mode="r", shape=(meta["n_rows"],))
+                for name, (path, dtype) in self._files(ticker, meta["columns"]).items()}
+
+    # ------------ Updates ------------
+
+    def update(self, ticker: str, df: pd.DataFrame) -> int:
+        """
+        Append the rows of the new dates of df, recomputing the pending ones
+
+        :param ticker: Ticker name
+        :param df: Raw prices as given to process_data, reaching at least LOOKBACK bars before the new dates
+                   (or the first bar of the stored history), the store is left untouched otherwise
+        :return: Number of rows written
+        :rtype: int
+        """
+        meta = self.meta(ticker)
+        if meta is None:
+            shutil.rmtree(self._dir(ticker), ignore_errors=True)
+            keep, last_date, tail, pending_dates = 0, None, df, None
+            first_date = str(df.index[0].date()) if len(df) else None
+        else:
+            keep = meta["n_rows"] - meta["pending"]
+            dates = self.columns(ticker)["dates"]
+            pending_dates = np.asarray(dates[keep:meta["n_rows"]])
+            last_date = pd.Timestamp(int(dates[keep - 1])) if keep else None
+            first_new = df.index.searchsorted(last_date, side="right") if keep else 0
+            if first_new >= len(df):
+                return 0
+            # Nothing is written if df misses the warm-up of the new dates (unless it is the whole history)
+            first_date = meta.get("first_date")
+            starts_later = first_date is None or df.index[0] > pd.Timestamp(first_date)
+            if keep and first_new < LOOKBACK and starts_later:
+                raise ValueError(f"⚠️ df must reach {LOOKBACK} bars before the new dates of {ticker}, "
+                                 f"it has {first_new}")
+            tail = df.iloc[max(0, first_new - LOOKBACK):]
+
+        features = create_features(tail)
+        features["target"] = create_target(tail, horizon=self.horizon, buy_trsh=self.buy_trsh,
+                                           sell_trsh=self.sell_trsh)
+        rows = features.dropna()
+        if last_date is not None:
+            rows = rows[rows.index > last_date]
+        columns = list(rows.columns)
+        if meta is not None and columns != meta["columns"]:
+            raise ValueError("⚠️ Feature columns changed - bump FEATURE_VERSION")
+        if pending_dates is not None and not np.isin(pending_dates, rows.index.as_unit("ns").asi8).all():
+            raise ValueError(f"⚠️ df does not recompute the pending rows of {ticker}")
+
+        # Drop the pending rows, then append
+        self._dir(ticker).mkdir(parents=True, exist_ok=True)
+        for name, (path, dtype) in self._files(ticker, columns).items():
+            with open(path, "ab") as f:
+                f.truncate(keep * dtype.itemsize)
+                values = rows.index.as_unit("ns").asi8 if name == "dates" else rows[name].to_numpy()
+                f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+        pending = int((rows.index >= df.index[-self.horizon]).sum()) if len(df) >= self.horizon else len(rows)
+        new_meta = {"schema": self.schema_hash, "version": FEATURE_VERSION, "columns": columns,
+                    "n_rows": keep + len(rows), "pending": pending, "first_date": first_date,
+                    "last_date": str(df.index[-1].date()) if len(df) else None}
+        tmp = self._dir(ticker) / "meta.json.tmp"
+        tmp.write_text(json.dumps(new_meta, indent=1))
+        os.replace(tmp, self._dir(ticker) / "meta.json")
+        return len(rows)
+
+    # ------------ Training sets ------------
+
+    def training_set(self, tickers: list | str, start: str | None = None, end: str | None = None,
+                     include_pending: bool = False) -> tuple[pd.DataFrame, pd.Series]:
+        """
+        (X, y) like process_data, concatenated from memmapped slices
+
+        :param tickers: One ticker or a list of tickers
+        :param start: First date (inclusive)
+        :param end: Last date (inclusive)
+        :param include_pending: Keep the last 'horizon' rows, whose target is 0 by default like in process_data
+        :return: (X, y), indexed by date for one ticker, by (ticker, date) otherwise
+        :rtype: tuple
+        """
+        single = isinstance(tickers, str)
+        tickers = [tickers] if single else list(tickers)
+        if not tickers:
+            raise ValueError("⚠️ No tickers given")
+
+        slices, keys = [], []
+        for ticker in tickers:
+            cols = self.columns(ticker)        # Raises for a ticker not in the store
+            meta = self.meta(ticker)
+            stop = meta["n_rows"] if include_pending else meta["n_rows"] - meta["pending"]
+            lo = np.searchsorted(cols["dates"][:stop], pd.Timestamp(start).value) if start else 0
+            hi = np.searchsorted(cols["dates"][:stop], pd.Timestamp(end).value, side="right") if end else stop
+            slices.append({name: values[lo:hi] for name, values in cols.items()})
+            keys.append(ticker)
+            columns = meta["columns"]
+
+        features = [column for column in columns if column != "target"]
+        X = np.empty((sum(s["dates"].size for s in slices), len(features)), dtype=self.dtype)
+        row = 0
+        for s in slices:
+            for j, column in enumerate(features):
+                X[row:row + s["dates"].size, j] = s[column]
+            row += s["dates"].size
+        y = np.concatenate([s["target"] for s in slices]).astype(int)
+
+        dates = pd.DatetimeIndex(np.concatenate([s["dates"] for s in slices]).view("datetime64[ns]"))
+        if single:
+            index = dates
+        else:
+            names = np.repeat(keys, [s["dates"].size for s in slices])
+            index = pd.MultiIndex.from_arrays([names, dates], names=["ticker", "date"])
+
+        return pd.DataFrame(X, index=index, columns=features), pd.Series(y, index=index, name="target")
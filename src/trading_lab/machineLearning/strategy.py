@@ -0,0 +1,240 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from trading_lab import kernels
+from trading_lab.backtest.book import BookResult, run_book
+from trading_lab.backtest.engine import run_backtest
+from trading_lab.backtest.metrics import EXTRA_METRICS, METRICS, summary_stats_matrix
+from trading_lab.backtest.portfolio import equity_curve_array, strat_rets_array
+from trading_lab.machineLearning.cv import walk_forward_splits
+from trading_lab.machineLearning.inference import InferenceSession
+from trading_lab.machineLearning.models import train_xgboost
+from trading_lab.machineLearning.panel import panel_features, panel_target, panel_to_long
+from trading_lab.strategies.protocol import ArrayStrategy
+
+# -------------------------------------------------
+# Model predictions as a strategy
+# A prediction made with the features of date t (close of t) is
+# traded at the close of t, like the 'signal' column:
+#   1 (BUY) -> buy, -1 (SELL) -> sell, 0 (HOLD) -> keep the position
+# so predictions go through the usual engine
+# (signal_to_pos -> strat_rets -> equity curve).
+# The walk-forward pipeline trains one model per fold on the whole
+# universe, scores every ticker of the test window in one batch,
+# then backtests every ticker at once on the (dates x tickers)
+# matrix of its out-of-sample predictions.
+
+def predictions_to_signal(preds) -> np.ndarray:
+    """
+    -1 / 0 / 1 predictions as a signal array, missing predictions are holds
+    """
+    preds = np.nan_to_num(np.asarray(preds, dtype=float), nan=0.0)
+    if not np.isin(preds, (-1, 0, 1)).all():
+        raise ValueError("⚠️ Predictions must be -1, 0 or 1")
+    return preds
+
+def ml_indicators(params: dict) -> dict:
+    return {}
+
+def ml_signal(prices: np.ndarray, indicators: dict, params: dict) -> np.ndarray:
+    signal = predictions_to_signal(params["predictions"])
+    if signal.size != prices.size:
+        raise ValueError("⚠️ One prediction per price is needed")
+    return signal
+
+ML_PREDICTIONS = ArrayStrategy(name="ml_predictions", indicators=ml_indicators, signal=ml_signal,
+                               params={"predictions": None})
+
+def backtest_predictions(prices: pd.Series | pd.DataFrame, preds: pd.Series, init_wealth: float = 1000) -> pd.DataFrame:
+    """
+    Backtest the predictions of one ticker with the engine
+
+    :param prices: Adjusted close prices (Series or table with 'adj close')
+    :param preds: Predictions (-1, 0, 1) indexed by date, e.g. from models.predict
+    :param init_wealth: Initial wealth
+    :return: Table with 'pred', 'pos', 'rets' and 'eq_curve' on the predicted dates
+    :rtype: DataFrame
+    """
+    if isinstance(prices, pd.DataFrame):
+        prices = prices["adj close"]
+    prices = prices.reindex(preds.index)
+    valid = prices.notna().to_numpy()
+    prices, preds = prices[valid], preds[valid]
+
+    if not np.any(predictions_to_signal(preds)):
+        # Only holds: never invested
+        res = pd.DataFrame({"pos": 0.0, "rets": 0.0, "eq_curve": float(init_wealth)}, index=prices.index)
+    else:
+        res = run_backtest(ML_PREDICTIONS, prices, {"predictions": preds.to_numpy()}, init_wealth=init_wealth)
+    res.insert(0, "pred", preds.to_numpy())
+    return res
+
+def backtest_prediction_matrix(prices: np.ndarray, preds: np.ndarray, init_wealth: float = 1000) -> dict:
+    """
+    backtest_predictions of every column of a (dates x tickers) matrix at once
+
+    Each column only trades on its own rows (prediction and price present),
+    a missing row in the middle is skipped like in the single-ticker backtest.
+
+    :param prices: Adjusted close prices, (dates x tickers)
+    :param preds: Predictions (-1, 0, 1), same shape, NaN where a ticker has no row
+    :param init_wealth: Initial wealth of each ticker
+    :return: {'pos', 'rets', 'eq_curve'} matrices, NaN outside the rows of each ticker
+    :rtype: dict
+    """
+    prices = np.asarray(prices, dtype=float)
+    preds = np.asarray(preds, dtype=float)
+    valid = ~np.isnan(preds) & ~np.isnan(prices)
+    predictions_to_signal(preds[valid])
+
+    pos = kernels.signal_to_pos_columns(np.where(valid, preds, np.nan))
+    # Last price of each ticker carried over its missing rows
+    last_row = np.where(valid, np.arange(len(prices))[:, None], 0)
+    np.maximum.accumulate(last_row, axis=0, out=last_row)
+    held_prices = np.where(np.logical_or.accumulate(valid, axis=0),
+                           np.take_along_axis(np.where(valid, prices, np.nan), last_row, axis=0), np.nan)
+
+    with np.errstate(invalid="ignore"):
+        rets = np.nan_to_num(strat_rets_array(held_prices, pos), nan=0.0)
+    rets[np.abs(rets) <= 1e-12] = 0.0
+    eq_curve = equity_curve_array(rets, init_wealth=init_wealth)
+
+    return {name: np.where(valid, values, np.nan)
+            for name, values in (("pos", pos), ("rets", rets), ("eq_curve", eq_curve))}
+
+# ------------ Walk-forward universe evaluation ------------
+
+def _span_stats(rets: np.ndarray, pos: np.ndarray, rf: float, periods_per_year: int) -> pd.DataFrame:
+    """
+    Extended summary_stats of each column over its own predicted rows
+
+    A ticker listed after the first test date (or without a row at the
+    end) has NaN rows around its backtest, they would count in the
+    annualization and the exposure. Columns sharing the same first and
+    last predicted row go through summary_stats_matrix together.
+    """
+    valid = ~np.isnan(rets)
+    has_rows = valid.any(axis=0)
+    first = np.where(has_rows, valid.argmax(axis=0), 0)
+    stop = np.where(has_rows, len(rets) - valid[::-1].argmax(axis=0), 0)
+
+    stats = pd.DataFrame(np.nan, index=range(rets.shape[1]), columns=METRICS + EXTRA_METRICS)
+    for lo, hi in sorted(set(zip(first[has_rows], stop[has_rows]))):
+        cols = np.flatnonzero(has_rows & (first == lo) & (stop == hi))
+        block = summary_stats_matrix(rets[lo:hi, cols], rf=rf, periods_per_year=periods_per_year,
+                                     pos=np.nan_to_num(pos[lo:hi, cols]), extended=True)
+        stats.iloc[cols] = block.to_numpy()
+    return stats
+
+
+@dataclass
+class MLBacktest:
+    """
+    Output of walk_forward_backtest, tables are (test dates x tickers)
+
+    :param predictions: Out-of-sample predictions, NaN where a ticker has no row
+    :param pos: Positions
+    :param rets: Strategy returns
+    :param eq_curve: Equity curves
+    :param stats: summary_stats (extended) per ticker, over its own predicted dates
+    :param folds: Train / test bounds and test accuracy of each fold
+    :param prices: Prices of the test dates
+    """
+    predictions: pd.DataFrame
+    pos: pd.DataFrame
+    rets: pd.DataFrame
+    eq_curve: pd.DataFrame
+    stats: pd.DataFrame
+    folds: pd.DataFrame
+    prices: pd.DataFrame
+
+    def book(self, **kwargs) -> BookResult:
+        """
+        All tickers traded as one book, see backtest.book.run_book for the arguments
+        """
+        return run_book(self.prices, self.pos.fillna(0.0), **kwargs)
+
+
+def walk_forward_backtest(prices: pd.DataFrame, volume: pd.DataFrame, params: dict, n_splits: int = 5,
+                          test_size: int | None = None, window: str = "expanding", train_size: int | None = None,
+                          horizon: int = 5, buy_trsh: float = .02, sell_trsh: float = -.02, embargo: int = 0,
+                          cross_sectional: list | None = None, registry=None, init_wealth: float = 1000,
+                          rf: float = 0.00, periods_per_year: int = 252) -> MLBacktest:
+    """
+    Train, score and backtest a universe model over walk-forward test windows
+
+    :param prices: Adjusted close prices, (dates x tickers), e.g. from data.store.load_panel
+    :param volume: Volumes, same shape
+    :param params: XGBoost parameters, as for train_xgboost
+    :param n_splits: Number of folds
+    :param test_size: Dates per test window
+    :param window: 'expanding' or 'rolling' training window
+    :param train_size: Dates of a rolling training window
+    :param horizon: create_target horizon, also the purge between train and test
+    :param buy_trsh: create_target buy threshold
+    :param sell_trsh: create_target sell threshold
+    :param embargo: Extra dates dropped between train and test
+    :param cross_sectional: Cross-sectional features, see panel_features
+    :param registry: Optional ModelRegistry, already trained folds are loaded
+    :param init_wealth: Initial wealth of each ticker
+    :param rf: Annual risk free rate
+    :param periods_per_year: Number of periods per year
+    :return: Predictions, positions, returns, equity curves and stats of every ticker
+    :rtype: MLBacktest
+    """
+    features, names = panel_features(prices, volume, cross_sectional=cross_sectional, dtype=np.float32)
+    target = panel_target(prices, horizon=horizon, buy_trsh=buy_trsh, sell_trsh=sell_trsh)
+    X, y = panel_to_long(features, names, prices.index, list(prices.columns), target)
+    del features
+
+    # Folds on dates, rows of X are sorted by date so every window is a slice
+    dates = X.index.get_level_values("date")
+    unique_dates = dates.unique()
+    splits = walk_forward_splits(len(unique_dates), n_splits=n_splits, test_size=test_size, window=window,
+                                 train_size=train_size, purge=horizon, embargo=embargo)
+
+    def rows(days: slice) -> slice:
+        return slice(dates.searchsorted(unique_dates[days.start]),
+                     dates.searchsorted(unique_dates[days.stop - 1], side="right"))
+
+    test_dates = unique_dates[splits[0][1].start:splits[-1][1].stop]
+    pred_values = np.full((len(test_dates), prices.shape[1]), np.nan)
+    fold_rows = []
+    for k, (train_days, test_days) in enumerate(splits):
+        train, test = rows(train_days), rows(test_days)
+        X_train, y_train = X.iloc[train], y.iloc[train]
+        if registry is not None:
+            model = registry.get_or_train(params, X_train, y_train)
+        else:
+            model = train_xgboost(X_train=X_train, y_train=y_train, params=params)
+
+        # Every ticker of the test window in one call
+        labels = InferenceSession(model).predict(X.iloc[test])
+        test_index = X.index[test]
+        pred_values[test_dates.get_indexer(test_index.get_level_values("date")),
+                    prices.columns.get_indexer(test_index.get_level_values("ticker"))] = labels
+
+        fold_rows.append({"fold": k,
+                          "train_start": unique_dates[train_days.start],
+                          "train_end": unique_dates[train_days.stop - 1],
+                          "test_start": unique_dates[test_days.start],
+                          "test_end": unique_dates[test_days.stop - 1],
+                          "n_train": train.stop - train.start,
+                          "accuracy": float((labels == y.iloc[test].to_numpy()).mean())})
+
+    # Every ticker backtested at once on its out-of-sample predictions
+    predictions = pd.DataFrame(pred_values, index=test_dates, columns=prices.columns)
+    test_prices = prices.loc[test_dates]
+    tables = backtest_prediction_matrix(test_prices.to_numpy(dtype=float), pred_values, init_wealth=init_wealth)
+
+    stats = _span_stats(tables["rets"], tables["pos"], rf=rf, periods_per_year=periods_per_year)
+    stats.index = prices.columns
+
+    def frame(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=test_dates, columns=prices.columns)
+
+    return MLBacktest(predictions=predictions, pos=frame(tables["pos"]), rets=frame(tables["rets"]),
+                      eq_curve=frame(tables["eq_curve"]), stats=stats,
+                      folds=pd.DataFrame(fold_rows).set_index("fold"), prices=test_prices)
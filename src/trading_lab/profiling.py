@@ -0,0 +1,296 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+from trading_lab.config import PROFILE
+
+# -------------------------------------------------
+# Lightweight instrumentation of the pipeline stages
+#   - stage("name") context manager and @timed decorator,
+#     a single global check when profiling is off
+#   - per stage: count, total / min / max time, a log2 histogram
+#     of durations (mergeable across worker processes) and,
+#     with memory=True, net and peak traced allocations
+#   - optional event list exported in Chrome trace format
+#     (chrome://tracing, https://ui.perfetto.dev)
+# Stage names are '<module>.<function>', e.g. 'indicators.rsi'.
+# Stages nest (engine.indicators contains indicators.rsi), each
+# call also records its self time (minus the nested stages), also
+# across nested profiling() blocks. Summed self times never count
+# a nested stage twice, the 'share' of the summary is relative to
+# them, so merged profiles still add up to the time spent in stages.
+# TRADING_LAB_PROFILE=1 records from import time on (see config).
+
+# Histogram buckets: bucket k counts durations in [2^(k-1), 2^k) microseconds
+N_BUCKETS = 40
+
+_ACTIVE = None
+
+# Innermost open stage of each thread, whatever profiler it records to
+_OPEN = threading.local()
+
+class Profiler:
+    """
+    Collected stage timings
+
+    :param trace: Keep every stage call as an event for the Chrome trace export
+    :param memory: Count allocations with tracemalloc (slower, single thread)
+    :param max_events: Cap on the number of trace events kept
+    """
+    __slots__ = ("stages", "events", "trace", "memory", "max_events", "_stack", "_t0")
+
+    def __init__(self, trace: bool = False, memory: bool = False, max_events: int = 1_000_000):
+        self.stages = {}
+        self.events = []
+        self.trace = trace
+        self.memory = memory
+        self.max_events = max_events
+        self._stack = []
+        self._t0 = time.perf_counter_ns()
+
+    # ------------ Recording ------------
+
+    def record(self, name: str, start_ns: int, duration_ns: int, alloc: int = 0, peak: int = 0,
+               self_ns: int | None = None) -> None:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = {"count": 0, "total_ns": 0, "self_ns": 0, "min_ns": duration_ns, "max_ns": 0,
+                                         "alloc_bytes": 0, "peak_bytes": 0, "hist": [0] * N_BUCKETS}
+        stats["count"] += 1
+        stats["total_ns"] += duration_ns
+        stats["self_ns"] += duration_ns if self_ns is None else self_ns
+        stats["min_ns"] = min(stats["min_ns"], duration_ns)
+        stats["max_ns"] = max(stats["max_ns"], duration_ns)
+        stats["alloc_bytes"] += alloc
+        stats["peak_bytes"] = max(stats["peak_bytes"], peak)
+        stats["hist"][min(N_BUCKETS - 1, (duration_ns // 1000).bit_length())] += 1
+
+        if self.trace and len(self.events) < self.max_events:
+            self.events.append((name, (start_ns - self._t0) / 1e3, duration_ns / 1e3,
+                                os.getpid(), threading.get_ident()))
+
+    def _memory_enter(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._stack.append([current, 0])
+
+    def _memory_exit(self) -> tuple:
+        current, peak = tracemalloc.get_traced_memory()
+        start, child_peak = self._stack.pop()
+        peak = max(peak, child_peak)
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        return current - start, peak - start
+
+    # ------------ Merging and export ------------
+
+    def merge(self, other: "Profiler | dict") -> "Profiler":
+        """
+        Add the stages (and events) of another profiler, e.g. one per worker process
+        """
+        other = Profiler.from_dict(other) if isinstance(other, dict) else other
+        for name, theirs in other.stages.items():
+            mine = self.stages.get(name)
+            if mine is None:
+                self.stages[name] = {**theirs, "hist": list(theirs["hist"])}
+                continue
+            for key in ("count", "total_ns", "self_ns", "alloc_bytes"):
+                mine[key] += theirs[key]
+            mine["min_ns"] = min(mine["min_ns"], theirs["min_ns"])
+            mine["max_ns"] = max(mine["max_ns"], theirs["max_ns"])
+            mine["peak_bytes"] = max(mine["peak_bytes"], theirs["peak_bytes"])
+            mine["hist"] = [a + b for a, b in zip(mine["hist"], theirs["hist"])]
+        offset = (other._t0 - self._t0) / 1e3
+        self.events.extend((name, ts + offset, dur, pid, tid) for name, ts, dur, pid, tid in other.events)
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Plain, picklable / JSON-able state
+        """
+        return {"stages": self.stages, "events": self.events, "t0": self._t0}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "Profiler":
+        profiler = cls(trace=bool(state["events"]))
+        profiler.stages = {name: dict(stats) for name, stats in state["stages"].items()}
+        profiler.events = [tuple(event) for event in state["events"]]
+        profiler._t0 = state["t0"]
+        return profiler
+
+    def summary(self):
+        """
+        One row per stage: count, total and self time, mean, p50 / p99 (from the histogram), max,
+        share of the time spent in stages, net and peak allocations - sorted by total time
+
+        :rtype: DataFrame
+        """
+        import pandas as pd
+
+        rows = {}
+        grand_total = sum(stats["self_ns"] for stats in self.stages.values()) or 1
+        for name, stats in self.stages.items():
+            rows[name] = {
+                "count": stats["count"],
+                "total_s": stats["total_ns"] / 1e9,
+                "self_s": stats["self_ns"] / 1e9,
+                "mean_ms": stats["total_ns"] / stats["count"] / 1e6,
+                "p50_ms": _hist_quantile(stats["hist"], 0.50),
+                "p99_ms": _hist_quantile(stats["hist"], 0.99),
+                "max_ms": stats["max_ns"] / 1e6,
+                "share": stats["total_ns"] / grand_total,
+                "alloc_mb": stats["alloc_bytes"] / 2**20,
+                "peak_mb": stats["peak_bytes"] / 2**20,
+            }
+        columns = ["count", "total_s", "self_s", "mean_ms", "p50_ms", "p99_ms", "max_ms", "share",
+                   "alloc_mb", "peak_mb"]
+        res = pd.DataFrame.from_dict(rows, orient="index", columns=columns)
+        return res.sort_values("total_s", ascending=False)
+
+    def to_json(self, path: str | Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict()))
+
+    def to_chrome_trace(self, path: str | Path) -> None:
+        """
+        Events as a Chrome trace ('X' complete events), needs trace=True
+        """
+        events = [{"name": name, "cat": name.split(".")[0], "ph": "X", "ts": ts, "dur": dur, "pid": pid, "tid": tid}
+                  for name, ts, dur, pid, tid in self.events]
+        Path(path).write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}))
+
+
+def _hist_quantile(hist: list, q: float) -> float:
+    """
+    Quantile (ms) estimated as the upper bound of the histogram bucket reaching q
+    """
+    total = sum(hist)
+    if not total:
+        return math.nan
+    seen = 0
+    for k, count in enumerate(hist):
+        seen += count
+        if seen >= q * total:
+            return (2 ** k) / 1e3
+    return (2 ** (N_BUCKETS - 1)) / 1e3
+
+# ------------ Switching on / off ------------
+
+def active() -> Profiler | None:
+    return _ACTIVE
+
+def enable(profiler: Profiler | None = None, trace: bool = False, memory: bool = False) -> Profiler:
+    """
+    Start recording into a profiler (a new one by default) and return it
+    """
+    global _ACTIVE
+    _ACTIVE = profiler or Profiler(trace=trace, memory=memory)
+    if _ACTIVE.memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return _ACTIVE
+
+def disable() -> Profiler | None:
+    """
+    Stop recording, return the profiler that was active
+    """
+    global _ACTIVE
+    profiler, _ACTIVE = _ACTIVE, None
+    if profiler is not None and profiler.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return profiler
+
+@contextmanager
+def profiling(trace: bool = False, memory: bool = False):
+    """
+    Record the stages run inside the block, the stages also go to an enclosing profiler
+
+        with profiling() as prof:
+            run_backtest(SMA_CROSS, prices)
+        prof.summary()
+    """
+    global _ACTIVE
+    outer = _ACTIVE
+    profiler = Profiler(trace=trace or (outer is not None and outer.trace), memory=memory)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    _ACTIVE = profiler
+    try:
+        yield profiler
+    finally:
+        _ACTIVE = outer
+        if started_tracing:
+            tracemalloc.stop()
+        if outer is not None:
+            outer.merge(profiler)
+
+# ------------ Stages ------------
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start", "parent", "child_ns")
+
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.parent = getattr(_OPEN, "stage", None)
+        self.child_ns = 0
+        _OPEN.stage = self
+        if self.profiler.memory:
+            self.profiler._memory_enter()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter_ns() - self.start
+        alloc, peak = self.profiler._memory_exit() if self.profiler.memory else (0, 0)
+        _OPEN.stage = self.parent
+        if self.parent is not None:
+            self.parent.child_ns += duration
+        self.profiler.record(self.name, self.start, duration, alloc, peak, duration - self.child_ns)
+        return False
+
+def stage(name: str):
+    """
+    Context manager timing a block as one call of a stage, a shared no-op when profiling is off
+    """
+    if _ACTIVE is None:
+        return _NULL_STAGE
+    return _Stage(_ACTIVE, name)
+
+def timed(name: str):
+    """
+    Decorator timing every call of a function as a stage
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _ACTIVE is None:
+                return function(*args, **kwargs)
+            with _Stage(_ACTIVE, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+if PROFILE:
+    enable()
@@ -0,0 +1,36 @@
+from dataclasses import dataclass, field
+from typing import Callable, Protocol
+
+import numpy as np
+
+# -------------------------------------------------
+# A strategy, as seen by the generic backtest engine:
+#   - the indicators it needs, {column name: (indicator, length)}
+#     with indicator a key of indicators.INDICATORS
+#   - a signal function on NumPy arrays returning 1 (buy),
+#     -1 (sell) or 0, same convention as the 'signal' column
+#   - its default parameters
+
+class Strategy(Protocol):
+    name: str
+    params: dict
+
+    def indicators(self, params: dict) -> dict: ...
+
+    def signal(self, prices: np.ndarray, indicators: dict, params: dict) -> np.ndarray: ...
+
+
+@dataclass(frozen=True)
+class ArrayStrategy:
+    """
+    Strategy built from two plain functions, picklable when they are module-level
+
+    :param name: Strategy name
+    :param indicators: params -> {column name: (indicator, length)}
+    :param signal: (prices, indicators, params) -> signal array
+    :param params: Default parameters
+    """
+    name: str
+    indicators: Callable[[dict], dict]
+    signal: Callable[[np.ndarray, dict, dict], np.ndarray]
+    params: dict = field(default_factory=dict)
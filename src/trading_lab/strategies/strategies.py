@@ -1,7 +1,10 @@
 import pandas as pd
 import numpy as np
 
+from trading_lab import kernels
 from trading_lab.indicators.indicators import add_sma, add_rsi
+from trading_lab.profiling import timed
+from trading_lab.strategies.protocol import ArrayStrategy
 
 # -------------------------------------------------
 # Strategies create a column 'signal' stacked to the 
@@ -11,7 +14,8 @@ from trading_lab.indicators.indicators import add_sma, add_rsi
 ### -------------- MOVING AVERAGES ------------ ###
 ###################################################
 
-def sma_cross(df: pd.DataFrame, fast_ma: int, slow_ma: int) -> pd.DataFrame:
+@timed("strategies.sma_cross")
+def sma_cross(df: pd.DataFrame, fast_ma: int, slow_ma: int, cache=None) -> pd.DataFrame:
     """
     Docstring pour sma_cross
     
@@ -21,14 +25,15 @@ def sma_cross(df: pd.DataFrame, fast_ma: int, slow_ma: int) -> pd.DataFrame:
     :type fast_ma: int
     :param slow_ma: Description
     :type slow_ma: int
+    :param cache: Optional IndicatorCache passed to add_sma
     :return: Description
     :rtype: DataFrame
     """
     if fast_ma >= slow_ma:
         raise ValueError("⚠️ fast must be < than slow")
 
-    df = add_sma(df, fast_ma) # Add fast ma
-    df = add_sma(df, slow_ma) # Add slow ma
+    df = add_sma(df, fast_ma, cache=cache) # Add fast ma
+    df = add_sma(df, slow_ma, cache=cache) # Add slow ma
     df.dropna(inplace=True)
 
     # Rename columns for convenience
@@ -36,17 +41,10 @@ def sma_cross(df: pd.DataFrame, fast_ma: int, slow_ma: int) -> pd.DataFrame:
     sma_slow = f'sma_{slow_ma}'
 
     # Relative positions of smas
-    fast_above = df[sma_fast] > df[sma_slow]
-    prev_fast_above = fast_above.shift(1)
+    fast_above = (df[sma_fast] > df[sma_slow]).to_numpy()
 
-    # Cross events
-    bullish_cross = fast_above & (prev_fast_above == False)
-    bearish_cross = (fast_above == False) & prev_fast_above
-
-    # Write signals
-    df["signal"] = 0
-    df.loc[bullish_cross, "signal"] = 1
-    df.loc[bearish_cross, "signal"] = -1
+    # Cross events, written as signals in a single pass
+    df["signal"] = kernels.cross_signal(fast_above).astype(np.int64)
 
     return df   
 
@@ -54,7 +52,8 @@ def sma_cross(df: pd.DataFrame, fast_ma: int, slow_ma: int) -> pd.DataFrame:
 ### ------------------ MOMENTUM --------------- ###
 ###################################################
 
-def rsi_cross(df: pd.DataFrame, length: int, strips: list = [30, 70]) -> pd.DataFrame:
+@timed("strategies.rsi_cross")
+def rsi_cross(df: pd.DataFrame, length: int, strips: list = [30, 70], cache=None) -> pd.DataFrame:
     
     ### VERIFIER LA LOGIQUE DE LA STRATEGIE
     ### WHEN TO BUY AND WHEN TO SELL
@@ -66,36 +65,83 @@ def rsi_cross(df: pd.DataFrame, length: int, strips: list = [30, 70]) -> pd.Data
     :type df: pd.DataFrame
     :param length: Description
     :type length: int
+    :param cache: Optional IndicatorCache passed to add_rsi
     :return: Description
     :rtype: DataFrame
     """
     if length <= 0:
         raise ValueError("⚠️ length must be positive")
-    df = add_rsi(df=df, length=length)
+    df = add_rsi(df=df, length=length, cache=cache)
     df.dropna(inplace=True)
 
     lower_strip, upper_strip = strips
 
-    rsi_above = df[f'RSI_{length}'] > upper_strip
-    prev_rsi_above = rsi_above.shift(1)
-    rsi_below = df[f'RSI_{length}'] < lower_strip
-    prev_rsi_below = rsi_below.shift(1)
+    # Buy on a cross above the upper strip, sell on a cross below the lower one
+    rsi = df[f'RSI_{length}'].to_numpy(dtype=float)
+    df["signal"] = kernels.threshold_signal(rsi, float(lower_strip), float(upper_strip)).astype(np.int64)
 
-    bullish_cross = rsi_above & (prev_rsi_above == False)
-    bearish_cross = rsi_below & (prev_rsi_below == False)
+    df.attrs["RSI_strips"] = strips
 
-    df["raw_signal"] = 0
-    df.loc[bullish_cross, "raw_signal"] = 1
-    df.loc[bearish_cross, "raw_signal"] = -1
+    return df
 
-    df["position"] = df["raw_signal"].replace(0, np.nan).ffill().fillna(0).astype(int)
+###################################################
+### ---------- ARRAY VERSIONS (ENGINE) -------- ###
+###################################################
 
-    df["signal"] = df["position"].diff().fillna(0).astype(int)
+# Same logic as above on NumPy arrays already cleaned
+# from their warm-up NaN, used through run_backtest
 
-    df["signal"] = df["signal"].clip(-1, 1)
+def sma_cross_indicators(params: dict) -> dict:
+    fast_ma, slow_ma = params["fast_ma"], params["slow_ma"]
+    if fast_ma >= slow_ma:
+        raise ValueError("⚠️ fast must be < than slow")
+    return {f"sma_{fast_ma}": ("sma", fast_ma), f"sma_{slow_ma}": ("sma", slow_ma)}
 
-    df.drop(["raw_signal", "position"], axis=1, inplace=True)
+def sma_cross_signal(prices: np.ndarray, indicators: dict, params: dict) -> np.ndarray:
+    """
+    Array version of sma_cross
 
-    df.attrs["RSI_strips"] = strips
+    :param prices: Prices
+    :param indicators: Must hold 'sma_<fast_ma>' and 'sma_<slow_ma>'
+    :param params: fast_ma, slow_ma
+    :return: Signal array (1 buy, -1 sell, 0 otherwise)
+    :rtype: ndarray
+    """
+    fast_above = indicators[f"sma_{params['fast_ma']}"] > indicators[f"sma_{params['slow_ma']}"]
+    return kernels.cross_signal(fast_above)
+
+def rsi_cross_indicators(params: dict) -> dict:
+    length = params["length"]
+    if length <= 0:
+        raise ValueError("⚠️ length must be positive")
+    return {f"RSI_{length}": ("rsi", length)}
 
-    return df
\ No newline at end of file
+def rsi_cross_signal(prices: np.ndarray, indicators: dict, params: dict) -> np.ndarray:
+    """
+    Array version of rsi_cross
+
+    :param prices: Prices
+    :param indicators: Must hold 'RSI_<length>'
+    :param params: length, strips
+    :return: Signal array (1 buy, -1 sell, 0 otherwise)
+    :rtype: ndarray
+    """
+    rsi = np.asarray(indicators[f"RSI_{params['length']}"], dtype=float)
+    lower_strip, upper_strip = params["strips"]
+    return kernels.threshold_signal(rsi, float(lower_strip), float(upper_strip))
+
+SMA_CROSS = ArrayStrategy(name="sma_cross",
+                          indicators=sma_cross_indicators,
+                          signal=sma_cross_signal,
+                          params={"fast_ma": 20, "slow_ma": 50})
+
+RSI_CROSS = ArrayStrategy(name="rsi_cross",
+                          indicators=rsi_cross_indicators,
+                          signal=rsi_cross_signal,
+                          params={"length": 14, "strips": [30, 70]})
+
+# Strategies available by name
+STRATEGIES = {
+    SMA_CROSS.name: SMA_CROSS,
+    RSI_CROSS.name: RSI_CROSS,
+}
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+# Synthetic prices shared by the tests: geometric Brownian motion on business days
+
+def gbm(n: int, seed: int = 0, start: str = "2000-01-03") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    df = pd.DataFrame({"adj close": prices}, index=pd.bdate_range(start, periods=n, name="Date"))
+    df.attrs["name"] = f"GBM{seed}"
+    return df
+
+def ohlcv(n: int, seed: int = 0, start: str = "2000-01-03") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = gbm(n, seed, start)["adj close"]
+    spread = close * rng.uniform(0.0, 0.02, n)
+    df = pd.DataFrame({"Adj Close": close, "Close": close, "High": close + spread, "Low": close - spread,
+                       "Open": close.shift(1).fillna(close.iloc[0]), "Volume": rng.integers(1e5, 1e6, n).astype(float)})
+    df.attrs["name"] = f"GBM{seed}"
+    return df
+
+@pytest.fixture
+def prices() -> pd.DataFrame:
+    return gbm(1500, seed=1)
+
+@pytest.fixture
+def panel() -> pd.DataFrame:
+    return pd.concat({f"T{seed}": gbm(800, seed)["adj close"] for seed in range(6)}, axis=1)
+
+@pytest.fixture
+def ml_data() -> tuple:
+    """
+    (X, y) of process_data on a synthetic OHLCV history
+    """
+    from trading_lab.machineLearning.data import process_data
+    return process_data(ohlcv(1200, seed=5))
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.backtest import batch
+from trading_lab.backtest.batch import run_batch
+from trading_lab.backtest.engine import run_backtest
+from trading_lab.backtest.metrics import summary_stats
+from trading_lab.strategies.strategies import RSI_CROSS
+
+
+def test_rows_match_single_ticker_backtests(panel):
+    res = run_batch(panel, "rsi_cross", params={"length": 10}, n_workers=1)
+    assert list(res.index) == list(panel.columns)
+    for ticker in panel.columns:
+        expected = summary_stats(run_backtest(RSI_CROSS, panel[ticker], params={"length": 10})["rets"])["Strategy"]
+        np.testing.assert_allclose(res.loc[ticker, expected.index].to_numpy(dtype=float), expected.to_numpy())
+
+def test_process_pool_gives_the_same_table(panel):
+    in_process = run_batch(panel, "rsi_cross", n_workers=1, chunksize=2)
+    pooled = run_batch(panel, "rsi_cross", n_workers=2, chunksize=2)
+    pd.testing.assert_frame_equal(in_process, pooled)
+
+def test_listing_gaps_and_missing_tickers(panel):
+    panel = panel.copy()
+    panel.iloc[:200, 0] = np.nan          # listed later
+    panel["EMPTY"] = np.nan               # never listed
+    res = run_batch(panel, "rsi_cross", n_workers=1)
+
+    assert res.loc["EMPTY", "error"] == "no price"
+    assert res.drop(index="EMPTY")["error"].isna().all()
+    expected = summary_stats(run_backtest(RSI_CROSS, panel["T0"].iloc[200:])["rets"])["Strategy"]
+    np.testing.assert_allclose(res.loc["T0", expected.index].to_numpy(dtype=float), expected.to_numpy())
+
+def test_in_process_failure_releases_the_prices(panel, monkeypatch):
+    def fail(rows):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(batch, "_backtest_rows", fail)
+    with pytest.raises(RuntimeError, match="boom"):
+        run_batch(panel, "rsi_cross", n_workers=1)
+    assert batch._WORKER == {}
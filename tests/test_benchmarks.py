@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from cases import CASES
+from run import bench_case, compare
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_every_case_runs(case):
+    setup, function = CASES[case]
+    res = bench_case(setup, function, 1_000, repeat=1)
+    assert res["time_s"] >= 0 and res["peak_mb"] >= 0
+
+def test_compare_flags_regressions_only():
+    baseline = {"a": {"1k": {"time_s": 1.0, "peak_mb": 10.0}}, "b": {"1k": {"time_s": 1.0, "peak_mb": 10.0}}}
+    results = {"a": {"1k": {"time_s": 1.3, "peak_mb": 10.0}}, "b": {"1k": {"time_s": 0.5, "peak_mb": 12.0}},
+               "new": {"1k": {"time_s": 9.0, "peak_mb": 99.0}}}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("a [1k] time_s")
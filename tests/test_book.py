@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.backtest.book import run_book
+from trading_lab.backtest.engine import run_backtest
+from trading_lab.strategies.strategies import SMA_CROSS
+
+
+def _prices(n=60, n_assets=2, seed=0):
+    rng = np.random.default_rng(seed)
+    rets = rng.normal(0.0005, 0.01, size=(n, n_assets))
+    index = pd.bdate_range("2020-01-01", periods=n)
+    return pd.DataFrame(100 * np.cumprod(1 + rets, axis=0), index=index, columns=list("AB")[:n_assets])
+
+
+@pytest.mark.parametrize("rebalance", [None, 21])
+def test_entry_between_rebalances_is_bought(rebalance):
+    prices = _prices()
+    pos = np.zeros(prices.shape)
+    pos[:, 0] = 1
+    pos[5:, 1] = 1
+
+    book = run_book(prices, pos, rebalance=rebalance)
+    weights = book.weights_frame()
+
+    assert weights["B"].iloc[:5].eq(0).all()
+    assert weights["B"].iloc[5] == pytest.approx(0.5)
+    assert weights["A"].iloc[5] == pytest.approx(0.5)
+    assert book.turnover.iloc[5] > 0
+    assert (weights["B"].iloc[5:] > 0).all()
+
+
+def test_exit_reallocates_to_remaining_assets():
+    prices = _prices()
+    pos = np.ones(prices.shape)
+    pos[10:, 1] = 0
+
+    book = run_book(prices, pos, rebalance=None)
+
+    assert book.weights[10, 1] == 0
+    assert book.weights[10, 0] == pytest.approx(1.0)
+    assert book.cash.iloc[10] == pytest.approx(0.0)
+
+
+def test_weights_drift_when_nothing_changes():
+    prices = _prices()
+    book = run_book(prices, np.ones(prices.shape), rebalance=None)
+
+    assert book.turnover.iloc[1:].eq(0).all()
+    assert not np.allclose(book.weights[-1], book.weights[0])
+
+
+def test_single_asset_matches_run_backtest(prices):
+    res = run_backtest(SMA_CROSS, prices, params={"fast_ma": 10, "slow_ma": 40})
+    close = prices.loc[res.index, ["adj close"]]
+
+    book = run_book(close, res[["pos"]], rebalance=1)
+
+    np.testing.assert_allclose(book.rets.to_numpy(), res["rets"].to_numpy(), atol=1e-10)
+    np.testing.assert_allclose(book.eq_curve.to_numpy(), res["eq_curve"].to_numpy())
+
+
+def test_invalid_scheme():
+    prices = _prices()
+    with pytest.raises(ValueError, match="scheme"):
+        run_book(prices, np.ones(prices.shape), scheme="nope")
+    with pytest.raises(ValueError, match="scores"):
+        run_book(prices, np.ones(prices.shape), scheme="signal")
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from trading_lab.indicators.cache import IndicatorCache, fingerprint
+from trading_lab.indicators.indicators import rsi_array, sma_array
+
+
+def test_fingerprint_follows_the_values(prices):
+    values = prices["adj close"].to_numpy()
+    assert fingerprint(values) == fingerprint(values.copy())
+    changed = values.copy()
+    changed[100] += 1e-9
+    assert fingerprint(changed) != fingerprint(values)
+
+def test_hits_return_the_computed_array(prices):
+    values = prices["adj close"].to_numpy()
+    cache = IndicatorCache()
+    first = cache.get(values, "rsi", 14)
+    assert cache.get(values.copy(), "rsi", 14) is first
+    np.testing.assert_array_equal(first, rsi_array(values, 14))
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    with pytest.raises(ValueError):
+        first[0] = 1.0                                   # read-only
+
+def test_lru_eviction_and_spill(prices, tmp_path):
+    values = prices["adj close"].to_numpy()
+    cache = IndicatorCache(max_bytes=2 * values.nbytes, spill_dir=tmp_path)
+    for length in (10, 20, 30):
+        cache.get(values, "sma", length)
+    assert cache.stats()["evictions"] == 1 and cache.nbytes <= cache.max_bytes
+
+    np.testing.assert_array_equal(cache.get(values, "sma", 10), sma_array(values, 10))
+    assert cache.stats()["spill_hits"] == 1
+
+def test_numpy_lengths_share_the_spill_file(prices, tmp_path):
+    values = prices["adj close"].to_numpy()
+    cache = IndicatorCache(max_bytes=values.nbytes, spill_dir=tmp_path)
+    cache.get(values, "sma", np.int64(20))
+    cache.get(values, "sma", 50)                         # evicts and spills sma 20
+
+    cache.get(values, "sma", 20)
+    assert cache.stats()["spill_hits"] == 1 and cache.stats()["misses"] == 2
+    assert len(list(tmp_path.glob("*.npy"))) == 2
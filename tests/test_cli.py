@@ -0,0 +1,114 @@
+import sys
+
+import pandas as pd
+import pytest
+
+from trading_lab import cli
+from trading_lab.config import RUN_DEFAULTS, load_run_config
+
+YAML = """
+tickers: [T0, T1]
+start: 2000-01-03
+workers: 1
+backtests:
+  - strategy: sma_cross
+    grid: {fast_ma: [10, 20], slow_ma: 50}
+  - strategy: rsi_cross
+train:
+  - grid: {max_depth: [2, 3]}
+    n_splits: 2
+"""
+
+TOML = """
+tickers = ["T0", "T1"]
+start = 2000-01-03
+workers = 1
+
+[[backtests]]
+strategy = "sma_cross"
+grid = {fast_ma = [10, 20], slow_ma = 50}
+
+[[backtests]]
+strategy = "rsi_cross"
+
+[[train]]
+grid = {max_depth = [2, 3]}
+n_splits = 2
+"""
+
+
+@pytest.fixture
+def yaml_config(tmp_path):
+    path = tmp_path / "universe.yaml"
+    path.write_text(YAML.replace("workers: 1", f"workers: 1\noutput: {tmp_path / 'out'}"))
+    return path
+
+
+def test_yaml_and_toml_give_the_same_config(yaml_config, tmp_path):
+    toml_path = tmp_path / "universe.toml"
+    toml_path.write_text(TOML.replace("workers = 1", f"workers = 1\noutput = '{tmp_path / 'out'}'"))
+
+    from_yaml, from_toml = load_run_config(yaml_config), load_run_config(toml_path)
+
+    assert from_yaml == from_toml
+    assert from_yaml["name"] == "universe" and from_yaml["start"] == "2000-01-03"
+    assert from_yaml["format"] == RUN_DEFAULTS["format"]
+
+
+def test_invalid_configs(tmp_path):
+    for name, text, match in [("a.json", "{}", "yaml"), ("b.yaml", "tickers: [A]\nfoo: 1", "Unknown"),
+                              ("c.yaml", "start: 2020-01-01", "tickers"),
+                              ("d.yaml", "tickers: [A]\nformat: xlsx", "format")]:
+        (tmp_path / name).write_text(text)
+        with pytest.raises(ValueError, match=match):
+            load_run_config(tmp_path / name)
+
+
+def test_missing_parser_packages(yaml_config, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "yaml", None)
+    with pytest.raises(ValueError, match="pyyaml"):
+        load_run_config(yaml_config)
+
+    toml_path = tmp_path / "universe.toml"
+    toml_path.write_text(TOML)
+    monkeypatch.setitem(sys.modules, "tomllib", None)
+    monkeypatch.setitem(sys.modules, "tomli", None)
+    with pytest.raises(ValueError, match="tomli"):
+        load_run_config(toml_path)
+
+
+def test_expand_jobs(yaml_config):
+    config = load_run_config(yaml_config)
+    jobs = cli.expand_jobs(config)
+
+    assert [job["kind"] for job in jobs] == ["backtest"] * 3 + ["train"] * 2
+    assert [job["params"] for job in jobs[:2]] == [{"fast_ma": 10, "slow_ma": 50}, {"fast_ma": 20, "slow_ma": 50}]
+    assert jobs[2]["params"] == {} and jobs[3]["options"] == {"n_splits": 2}
+    assert len({job["id"] for job in jobs}) == len(jobs)
+    assert [job["id"] for job in cli.expand_jobs({**config, "end": "2001-01-01"})] != [job["id"] for job in jobs]
+
+
+def test_run_resumes_and_collects(yaml_config, tmp_path, panel, monkeypatch, capsys):
+    yaml_config.write_text(yaml_config.read_text().split("train:")[0])
+    loads = []
+
+    def load_panels(config, fields):
+        loads.append(fields)
+        return {"Adj Close": panel[config["tickers"]]}
+
+    monkeypatch.setattr(cli, "_load_panels", load_panels)
+
+    assert cli.main(["run", str(yaml_config)]) == 0
+    assert len(list((tmp_path / "out" / "backtest").glob("*.parquet"))) == 3
+    assert cli.main(["run", str(yaml_config)]) == 0
+    assert loads == [["Adj Close"]]                 # Second run: every job already done
+    assert "3 already done" in capsys.readouterr().out
+
+    assert cli.main(["collect", str(yaml_config)]) == 0
+    res = pd.read_parquet(tmp_path / "out" / "universe.parquet")
+    assert len(res) == 3 * 2 and set(res["strategy"]) == {"sma_cross", "rsi_cross"}
+
+
+def test_main_reports_config_errors(tmp_path, capsys):
+    assert cli.main(["jobs", str(tmp_path / "missing.txt")]) == 2
+    assert "yaml" in capsys.readouterr().err
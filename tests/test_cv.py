@@ -0,0 +1,38 @@
+import pytest
+
+from trading_lab.machineLearning.cv import walk_forward_cv, walk_forward_splits
+
+
+def test_expanding_splits_are_chronological_and_purged():
+    splits = walk_forward_splits(120, n_splits=3, test_size=20, purge=5, embargo=2)
+    assert [(test.start, test.stop) for _, test in splits] == [(60, 80), (80, 100), (100, 120)]
+    for train, test in splits:
+        assert train.start == 0
+        # create_target looks 'purge' bars ahead: no training target reaches the test window
+        assert train.stop - 1 + 5 < test.start
+        assert test.start - train.stop == 5 + 2
+
+def test_rolling_splits_keep_train_size():
+    splits = walk_forward_splits(200, n_splits=4, test_size=25, window="rolling", train_size=50, purge=5)
+    for train, test in splits:
+        assert train.stop - train.start == 50
+        assert train.stop == test.start - 5
+
+def test_invalid_splits():
+    with pytest.raises(ValueError):
+        walk_forward_splits(100, window="sliding")
+    with pytest.raises(ValueError):
+        walk_forward_splits(50, n_splits=5, test_size=10, purge=5)
+
+@pytest.mark.parametrize("warm_start", [False, True])
+def test_cv_scores_every_fold(ml_data, warm_start):
+    pytest.importorskip("xgboost")
+    X, y = ml_data
+    splits = walk_forward_splits(len(X), n_splits=3, purge=5)
+    scores, models = walk_forward_cv(X, y, {"max_depth": 2, "n_estimators": 8}, splits,
+                                     n_workers=2, warm_start=warm_start)
+    assert list(scores.index) == [0, 1, 2] and len(models) == 3
+    assert scores["accuracy"].between(0, 1).all()
+    assert (scores["train_end"] < scores["test_start"]).all()
+    if warm_start:
+        assert models[-1].get_booster().num_boosted_rounds() == 8 + 2 + 2
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.backtest.engine import compute_indicators, run_backtest, run_backtests
+from trading_lab.backtest.portfolio import equity_curve, signal_to_pos, strat_rets
+from trading_lab.strategies.protocol import ArrayStrategy
+from trading_lab.strategies.strategies import RSI_CROSS, SMA_CROSS, rsi_cross, sma_cross
+
+
+def _dataframe_pipeline(df: pd.DataFrame) -> pd.DataFrame:
+    pos = signal_to_pos(df)
+    rets = strat_rets(df, pos).fillna(0)
+    return pd.DataFrame({"pos": pos.astype(float), "rets": rets, "eq_curve": equity_curve(rets)})
+
+@pytest.mark.parametrize("strategy, params, build", [
+    (SMA_CROSS, {"fast_ma": 10, "slow_ma": 40}, lambda df: sma_cross(df, 10, 40)),
+    (RSI_CROSS, {"length": 14, "strips": [30, 70]}, lambda df: rsi_cross(df, 14, [30, 70])),
+])
+def test_engine_matches_the_dataframe_pipeline(prices, strategy, params, build):
+    res = run_backtest(strategy, prices, params=params)
+    expected = _dataframe_pipeline(build(prices.copy()))
+
+    pd.testing.assert_index_equal(res.index, expected.index)
+    np.testing.assert_array_equal(res["pos"], expected["pos"])
+    np.testing.assert_allclose(res["rets"], expected["rets"], atol=1e-12)
+    np.testing.assert_allclose(res["eq_curve"], expected["eq_curve"], rtol=1e-10)
+
+def test_any_strategy_runs_through_the_engine(prices):
+    # Long while the price is above its 20-day SMA
+    def signal(values, indicators, params):
+        above = (values > indicators["sma"]).astype(np.int8)
+        return np.diff(above, prepend=above[0])
+
+    above_sma = ArrayStrategy("above_sma", lambda params: {"sma": ("sma", params["length"])}, signal, {"length": 20})
+    res = run_backtest(above_sma, prices)
+    assert len(res) == len(prices) - 19
+    assert set(np.unique(res["pos"])) <= {0.0, 1.0} and res["pos"].iloc[-1] == 0
+
+def test_shared_indicators_are_computed_once(prices):
+    cache = {}
+    values = prices["adj close"].to_numpy()
+    compute_indicators(values, {"fast": ("sma", 10), "slow": ("sma", 40)}, cache=cache)
+    first = cache[("sma", 10)]
+    runs = run_backtests([(SMA_CROSS, {"fast_ma": 10, "slow_ma": 40}), (SMA_CROSS, {"fast_ma": 10, "slow_ma": 60})],
+                         values)
+    assert len(runs) == 2
+    compute_indicators(values, {"fast": ("sma", 10)}, cache=cache)
+    assert cache[("sma", 10)] is first
+
+def test_no_signal_raises():
+    flat = np.full(300, 100.0)
+    with pytest.raises(ValueError):
+        run_backtest(RSI_CROSS, flat)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.backtest.engine import run_backtest
+from trading_lab.backtest.events import event_backtest, event_backtest_to_csv, iter_csv_bars
+from trading_lab.strategies.strategies import STRATEGIES
+
+
+@pytest.mark.parametrize("name, params", [
+    ("sma_cross", {"fast_ma": 10, "slow_ma": 40}),
+    ("rsi_cross", {"length": 14, "strips": [30, 70]}),
+    ("rsi_cross", {"length": 14, "strips": [50, 50]}),        # Touching strips, both crosses possible in a row
+])
+def test_event_driven_matches_vectorized(prices, name, params):
+    bars = zip(prices.index, prices["adj close"].to_numpy())
+    res = event_backtest(bars, name, params=params)
+    expected = run_backtest(STRATEGIES[name], prices, params=params)
+
+    assert list(res.index) == list(expected.index)
+    np.testing.assert_array_equal(res["pos"], expected["pos"])
+    np.testing.assert_allclose(res["rets"], expected["rets"], atol=1e-15)
+    np.testing.assert_allclose(res["eq_curve"], expected["eq_curve"], rtol=1e-12)
+
+def test_crossed_strips_are_rejected_by_both_backtests(prices):
+    params = {"length": 14, "strips": [60, 40]}
+    bars = zip(prices.index, prices["adj close"].to_numpy())
+    with pytest.raises(ValueError, match="upper strip"):
+        event_backtest(bars, "rsi_cross", params=params)
+    with pytest.raises(ValueError, match="upper strip"):
+        run_backtest(STRATEGIES["rsi_cross"], prices, params=params)
+
+def test_csv_round_trip(prices, tmp_path):
+    prices.to_csv(tmp_path / "bars.csv")
+    n_rows = event_backtest_to_csv(iter_csv_bars(tmp_path / "bars.csv", chunksize=100), "rsi_cross",
+                                   tmp_path / "out.csv")
+    out = pd.read_csv(tmp_path / "out.csv", index_col=0, parse_dates=True)
+    expected = run_backtest(STRATEGIES["rsi_cross"], prices)
+    assert n_rows == len(expected)
+    np.testing.assert_allclose(out["eq_curve"], expected["eq_curve"], rtol=1e-12)
+
+def test_no_signal_raises():
+    bars = zip(pd.bdate_range("2020-01-01", periods=200), np.full(200, 100.0))
+    with pytest.raises(ValueError):
+        event_backtest(bars, "sma_cross", params={"fast_ma": 5, "slow_ma": 20})
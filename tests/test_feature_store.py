@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ohlcv
+from trading_lab.machineLearning.data import process_data
+from trading_lab.machineLearning.store import FeatureStore
+
+
+def test_training_set_matches_process_data(tmp_path):
+    df = ohlcv(1200, seed=5)
+    store = FeatureStore(tmp_path, dtype=np.float64)
+    store.update("AAA", df)
+
+    X, y = store.training_set("AAA")
+    X_ref, y_ref = process_data(df)
+
+    # The store holds back the last 'horizon' rows, whose target is not known yet
+    X_ref, y_ref = X_ref.iloc[:len(X)], y_ref.iloc[:len(y)]
+    np.testing.assert_allclose(X.to_numpy(), X_ref.to_numpy())
+    np.testing.assert_array_equal(y.to_numpy(), y_ref.to_numpy())
+    assert list(X.columns) == list(X_ref.columns)
+
+
+def test_incremental_update_equals_full_build(tmp_path):
+    df = ohlcv(1500, seed=6)
+    full = FeatureStore(tmp_path / "full", dtype=np.float64)
+    full.update("AAA", df)
+    step = FeatureStore(tmp_path / "step", dtype=np.float64)
+    step.update("AAA", df.iloc[:1300])
+
+    assert step.update("AAA", df) > 0
+    assert step.update("AAA", df) == step.horizon        # Only the pending rows again
+
+    X_full, y_full = full.training_set("AAA", include_pending=True)
+    X_step, y_step = step.training_set("AAA", include_pending=True)
+    pd.testing.assert_frame_equal(X_step, X_full)
+    pd.testing.assert_series_equal(y_step, y_full)
+
+
+def test_short_update_frame_raises_and_keeps_the_store(tmp_path):
+    df = ohlcv(1600, seed=7)
+    store = FeatureStore(tmp_path, dtype=np.float64)
+    store.update("AAA", df.iloc[:-100])
+    meta = store.meta("AAA")
+    X_before, _ = store.training_set("AAA", include_pending=True)
+
+    with pytest.raises(ValueError, match="bars before the new dates"):
+        store.update("AAA", df.iloc[-110:])
+
+    assert store.meta("AAA") == meta
+    pd.testing.assert_frame_equal(store.training_set("AAA", include_pending=True)[0], X_before)
+    assert store.update("AAA", df.iloc[-1200:]) == 100 + store.horizon
+
+
+def test_short_history_updates_from_its_first_bar(tmp_path):
+    df = ohlcv(500, seed=8)
+    store = FeatureStore(tmp_path, dtype=np.float64)
+    store.update("AAA", df.iloc[:-20])
+
+    assert store.update("AAA", df) == 20 + store.horizon
+
+
+def test_several_tickers_and_date_range(tmp_path):
+    store = FeatureStore(tmp_path)
+    store.update("AAA", ohlcv(600, seed=1))
+    store.update("BBB", ohlcv(600, seed=2))
+
+    X, y = store.training_set(["AAA", "BBB"], start="2000-06-01", end="2001-01-31")
+
+    assert X.index.names == ["ticker", "date"]
+    assert set(X.index.get_level_values("ticker")) == {"AAA", "BBB"}
+    dates = X.index.get_level_values("date")
+    assert dates.min() >= pd.Timestamp("2000-06-01") and dates.max() <= pd.Timestamp("2001-01-31")
+    assert X.dtypes.eq(np.float32).all() and len(y) == len(X)
+
+
+def test_no_tickers_raises(tmp_path):
+    store = FeatureStore(tmp_path)
+    with pytest.raises(ValueError, match="No tickers"):
+        store.training_set([])
+    with pytest.raises(ValueError, match="No features stored"):
+        store.training_set(["ZZZ"])
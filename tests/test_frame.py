@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ohlcv
+from trading_lab.data.frame import PriceFrame
+from trading_lab.indicators.indicators import add_rsi, add_sma
+from trading_lab.machineLearning.data import create_features
+
+
+def test_round_trip_keeps_values_and_attrs(prices):
+    prices.attrs["RSI_strips"] = [30, 70]
+    frame = PriceFrame.from_frame(prices)
+
+    assert frame.name == prices.attrs["name"]
+    assert len(frame) == len(prices)
+    df = frame.to_frame()
+    pd.testing.assert_frame_equal(df, prices, check_freq=False, check_names=False,
+                                  check_index_type=False)
+    assert df.attrs["RSI_strips"] == [30, 70]
+
+
+def test_length_mismatch_raises(prices):
+    frame = PriceFrame.from_frame(prices)
+    with pytest.raises(ValueError, match="values for"):
+        frame["bad"] = np.zeros(3)
+
+
+def test_slice_is_a_view(prices):
+    frame = PriceFrame.from_frame(prices)
+    part = frame.slice(10, 20)
+
+    assert len(part) == 10
+    assert part.index[0] == prices.index[10]
+    assert np.shares_memory(part["adj close"], frame["adj close"])
+
+
+def test_astype_float32_halves_memory(prices):
+    frame = PriceFrame.from_frame(prices)
+    small = frame.astype(np.float32)
+
+    assert small["adj close"].dtype == np.float32
+    assert small.nbytes - small.dates.nbytes == (frame.nbytes - frame.dates.nbytes) // 2
+    np.testing.assert_allclose(small["adj close"], frame["adj close"], rtol=1e-6)
+
+
+def test_indicators_match_dataframe(prices):
+    frame = PriceFrame.from_frame(prices)
+    frame.add_indicator("sma", 20)
+    add_rsi(frame, 14)
+    df = add_sma(add_rsi(prices.copy(), 14), 20)
+
+    np.testing.assert_allclose(frame["sma_20"], df["sma_20"], equal_nan=True)
+    np.testing.assert_allclose(frame["RSI_14"], df["RSI_14"], equal_nan=True)
+
+
+def test_create_features_on_price_frame():
+    df = ohlcv(400, seed=3)
+    expected = create_features(df)
+
+    features = create_features(PriceFrame.from_frame(df))
+
+    assert isinstance(features, PriceFrame)
+    assert features.keys() == list(expected.columns)
+    np.testing.assert_allclose(features.matrix(), expected.to_numpy(), equal_nan=True)
+
+
+def test_drop_shares_columns(prices):
+    frame = PriceFrame.from_frame(prices)
+    frame.add_indicator("sma", 5)
+    dropped = frame.drop(["sma_5"])
+
+    assert dropped.keys() == ["adj close"]
+    assert dropped["adj close"] is frame["adj close"]
@@ -0,0 +1,35 @@
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from imports import MODULES, measure
+
+import trading_lab
+
+
+@pytest.mark.parametrize("module", sorted(MODULES))
+def test_import_loads_no_heavy_dependency(module):
+    assert measure(module, repeat=1)["heavy"] == []
+
+
+def test_subpackages_are_loaded_on_first_access():
+    assert trading_lab.backtest is importlib.import_module("trading_lab.backtest")
+    assert {"backtest", "machineLearning"} <= set(dir(trading_lab))
+    with pytest.raises(AttributeError, match="no attribute"):
+        trading_lab.missing
+
+
+def test_xgboost_loads_on_first_training():
+    pytest.importorskip("xgboost")
+    code = ("import sys\nfrom conftest import ohlcv\n"
+            "from trading_lab.machineLearning.data import process_data\n"
+            "from trading_lab.machineLearning.models import train_xgboost\n"
+            "assert 'xgboost' not in sys.modules\n"
+            "train_xgboost(*process_data(ohlcv(400)), {'n_estimators': 2})\n"
+            "assert 'xgboost' in sys.modules\n")
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).parent)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from trading_lab.machineLearning.inference import InferenceSession
+from trading_lab.machineLearning.models import predict, train_xgboost
+
+pytest.importorskip("xgboost")
+
+
+@pytest.fixture
+def model(ml_data):
+    X, y = ml_data
+    return train_xgboost(X, y, {"n_estimators": 10, "max_depth": 2, "n_jobs": 1})
+
+
+def test_predictions_match_the_model(model, ml_data, tmp_path):
+    X, _ = ml_data
+    expected = predict(model, X).to_numpy()
+
+    session = InferenceSession(model)
+    np.testing.assert_array_equal(session.predict(X), expected)
+    np.testing.assert_array_equal(session.predict(X.to_numpy()), expected)
+    assert [session.predict_one(row) for row in X.to_numpy()[:20]] == list(expected[:20])
+
+    path = tmp_path / "model.ubj"
+    model.save_model(path)
+    np.testing.assert_array_equal(InferenceSession(path).predict(X), expected)
+
+
+def test_probabilities_match_the_model(model, ml_data):
+    X, _ = ml_data
+    probas = InferenceSession(model).predict_proba(X)
+    np.testing.assert_allclose(probas, model.predict_proba(X), atol=1e-5)
+
+
+def test_n_threads_leaves_the_caller_booster_untouched(model, ml_data):
+    X, _ = ml_data
+    booster = model.get_booster()
+    before = booster.save_config()
+
+    session = InferenceSession(booster, n_threads=1)
+
+    assert session.booster is not booster
+    assert booster.save_config() == before
+    np.testing.assert_array_equal(session.predict(X), predict(model, X).to_numpy())
+
+
+def test_batch_splits_per_ticker_and_caches_dmatrix(model, ml_data):
+    X, _ = ml_data
+    session = InferenceSession(model, dmatrix_cache=2)
+    out = session.predict_batch({"A": X.iloc[:50], "B": X.iloc[50:80].to_numpy()})
+
+    assert out["A"].index.equals(X.index[:50]) and out["B"].shape == (30,)
+    np.testing.assert_array_equal(out["A"].to_numpy(), session.predict(X.iloc[:50]))
+    session.predict(X.iloc[:50])
+    assert len(session._dmatrices) == 2
+    assert session.latency().loc["batch", "count"] == 3
+
+
+def test_wrong_number_of_features(model):
+    with pytest.raises(ValueError, match="features"):
+        InferenceSession(model).predict(np.zeros((2, 3)))
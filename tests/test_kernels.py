@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab import kernels
+from trading_lab.indicators.indicators import rsi_array, sma_array
+
+
+# DataFrame versions the kernels replaced (shift / ffill / diff chains)
+
+def _cross_reference(above: np.ndarray) -> np.ndarray:
+    above = pd.Series(above)
+    prev = above.shift(1)
+    signal = pd.Series(0, index=above.index)
+    signal[above & (prev == False)] = 1
+    signal[(above == False) & (prev == True)] = -1
+    return signal.to_numpy()
+
+def _threshold_reference(values: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    values = pd.Series(values)
+    above, below = values > upper, values < lower
+    raw = pd.Series(0, index=values.index)
+    raw[above & (above.shift(1) == False)] = 1
+    raw[below & (below.shift(1) == False)] = -1
+    position = raw.replace(0, np.nan).ffill().fillna(0).astype(int)
+    return position.diff().fillna(0).astype(int).clip(-1, 1).to_numpy()
+
+def _pos_reference(signal: np.ndarray) -> np.ndarray:
+    pos = pd.Series(signal).replace(0, np.nan).ffill().replace(-1, 0).fillna(0).to_numpy(copy=True)
+    pos[-1] = 0
+    return pos
+
+
+@pytest.fixture
+def close():
+    rng = np.random.default_rng(7)
+    return 100 * np.cumprod(1 + rng.normal(0, 0.02, 3000))
+
+def _backends(kernel):
+    return [kernel.loop, kernel.fallback, kernel]
+
+
+def test_cross_signal(close):
+    above = sma_array(close, 20) > sma_array(close, 50)
+    expected = _cross_reference(above)
+    for fn in _backends(kernels.cross_signal):
+        np.testing.assert_array_equal(fn(above), expected)
+
+
+def test_threshold_signal(close):
+    rsi = rsi_array(close, 14)
+    expected = _threshold_reference(rsi, 30.0, 70.0)
+    assert np.abs(expected).sum() > 10
+    for fn in _backends(kernels.threshold_signal):
+        np.testing.assert_array_equal(fn(rsi, 30.0, 70.0), expected)
+
+
+def test_threshold_signal_rejects_crossed_strips(close):
+    rsi = rsi_array(close, 14)
+    for fn in _backends(kernels.threshold_signal):
+        with pytest.raises(ValueError, match="upper strip"):
+            fn(rsi, 60.0, 40.0)
+
+
+def test_signal_to_pos(close):
+    signal = kernels.cross_signal(sma_array(close, 10) > sma_array(close, 30)).astype(np.float64)
+    signal[np.flatnonzero(signal == 1)[0] - 1] = -1        # Leading sell, ignored
+    expected = _pos_reference(signal)
+    for fn in _backends(kernels.signal_to_pos):
+        np.testing.assert_array_equal(fn(signal), expected)
+
+
+def test_signal_to_pos_columns(close):
+    signal = np.column_stack([kernels.cross_signal(sma_array(close, n) > sma_array(close, 3 * n)).astype(float)
+                              for n in (5, 10, 20, 40)])
+    signal[:200, 1] = np.nan
+    signal[1000:1100, 2] = np.nan
+    signal[2500:, 3] = np.nan
+
+    expected = kernels.signal_to_pos_columns.loop(signal)
+    for j in range(signal.shape[1]):
+        rows = ~np.isnan(signal[:, j])
+        np.testing.assert_array_equal(expected[rows, j], kernels.signal_to_pos(signal[rows, j]))
+    for fn in _backends(kernels.signal_to_pos_columns)[1:]:
+        np.testing.assert_array_equal(fn(signal), expected)
+
+
+@pytest.mark.parametrize("size", [0, 1])
+def test_short_inputs(size):
+    for fn in _backends(kernels.signal_to_pos):
+        assert fn(np.ones(size)).tolist() == [0.0] * size
+    for fn in _backends(kernels.cross_signal):
+        assert fn(np.ones(size, dtype=bool)).tolist() == [0] * size
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.backtest.engine import run_backtest
+from trading_lab.backtest.metrics import trade_stats
+from trading_lab.backtest.portfolio import apply_costs, trade_ledger
+from trading_lab.strategies.strategies import RSI_CROSS
+
+
+def test_ledger_by_hand():
+    prices = np.array([10.0, 11.0, 12.0, 11.0, 10.0, 10.0, 12.0, 13.0])
+    pos = np.array([0, 1, 1, 0, 0, 1, 1, 1])
+    ledger = trade_ledger(prices, pos, index=pd.bdate_range("2020-01-01", periods=8))
+
+    assert list(ledger["entry_idx"]) == [1, 5] and list(ledger["exit_idx"]) == [3, 7]
+    assert list(ledger["holding"]) == [2, 2] and list(ledger["open"]) == [False, True]
+    np.testing.assert_allclose(ledger["pnl"], [11 / 11 - 1, 13 / 10 - 1])
+    assert ledger["entry_date"].iloc[1] == pd.Timestamp("2020-01-08")
+
+def test_ledger_compounds_to_the_equity_curve(prices):
+    res = run_backtest(RSI_CROSS, prices)
+    ledger = trade_ledger(prices.loc[res.index, "adj close"].to_numpy(), res["pos"].to_numpy(), fee=0.001)
+    growth = res["eq_curve"].iloc[-1] / res["eq_curve"].iloc[0]
+    assert np.isclose(np.prod(1 + ledger["pnl"]), growth)
+
+    net = apply_costs(res["rets"].to_numpy(), res["pos"].to_numpy(), fee=0.001)
+    assert np.isclose(np.prod(1 + ledger["net_pnl"]), np.prod(1 + net))
+
+def test_matrix_ledger_equals_column_ledgers(prices):
+    values = prices["adj close"].to_numpy()[:400]
+    rng = np.random.default_rng(0)
+    pos = (rng.random((400, 3)) < 0.7).astype(float)
+    pos[-1] = 0
+    ledger = trade_ledger(np.column_stack([values] * 3), pos, columns=["a", "b", "c"])
+    for j, name in enumerate("abc"):
+        single = trade_ledger(values, pos[:, j])
+        np.testing.assert_allclose(ledger.loc[ledger["column"] == name, "pnl"], single["pnl"])
+
+def test_costs_are_charged_on_position_changes_only():
+    rets = np.array([0.0, 0.01, 0.02, -0.01, 0.0])
+    pos = np.array([1.0, 1.0, 0.0, 0.0, 1.0])
+    net = apply_costs(rets, pos, fee=0.001, slippage_bps=5, spread_bps=10)
+    cost = 0.001 + 5e-4 + 5e-4
+    np.testing.assert_allclose(net, [(1 - cost) - 1, 0.01, 1.02 * (1 - cost) - 1, -0.01, (1 - cost) - 1])
+
+def test_trade_stats():
+    ledger = pd.DataFrame({"net_pnl": [0.1, -0.05, 0.02], "holding": [3, 5, 1]})
+    stats = trade_stats(ledger)["Strategy"]
+    assert stats["Trade Count"] == 3 and stats["Trade Win Rate"] == pytest.approx(0.6667, abs=1e-4)
+    assert stats["Trade Profit Factor"] == pytest.approx(2.4) and stats["Average Holding"] == 3
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.backtest import metrics
+from trading_lab.backtest.metrics import METRICS, EXTRA_METRICS, fused_stats, summary_stats, summary_stats_matrix
+
+
+@pytest.fixture
+def rets() -> pd.Series:
+    rng = np.random.default_rng(7)
+    values = rng.normal(0.0004, 0.012, 600)
+    values[rng.random(600) < 0.4] = 0.0
+    return pd.Series(values)
+
+def test_fused_kernel_matches_the_metric_functions(rets):
+    eq_curve = 1000 * (1 + rets).cumprod()
+    expected = [metrics.annualized_ret(rets), metrics.annualized_vol(rets), metrics.sharpe_ratio(rets, rf=0.01),
+                metrics.max_drawdown(eq_curve), metrics.win_rate(rets), metrics.profit_factor(rets)]
+    stats = fused_stats(rets, rf=0.01).iloc[0]
+    np.testing.assert_allclose(stats[METRICS].to_numpy(dtype=float), expected, rtol=1e-9)
+
+def test_compiled_loop_and_fallback_agree(rets):
+    matrix = np.column_stack([rets, rets.shift(3).fillna(0), np.zeros(len(rets))])
+    pos = (matrix != 0).astype(float)
+    args = (np.ascontiguousarray(matrix), np.ascontiguousarray(pos), np.empty((0, 3)), 0.0, 252.0)
+    with np.errstate(all="ignore"):                    # the plain Python loop divides numpy scalars by 0
+        loop = metrics._fused_kernel.loop(*args)
+    np.testing.assert_allclose(metrics._fused_kernel.fallback(*args), loop, rtol=1e-9, equal_nan=True)
+    np.testing.assert_allclose(metrics._fused_kernel(*args), loop, rtol=1e-9, equal_nan=True)
+
+def test_extended_metrics(rets):
+    pos = pd.Series(np.r_[np.zeros(100), np.ones(200), np.zeros(100), np.ones(200)])
+    stats = summary_stats(rets, pos=pos, extended=True)["Strategy"]
+    assert list(stats.index) == METRICS + EXTRA_METRICS
+    assert stats["Exposure"] == round(400 / 600, 4)
+    assert stats["Trade Count"] == 2
+
+def test_matrix_rows_equal_single_columns(rets):
+    matrix = np.column_stack([rets, -rets])
+    table = summary_stats_matrix(matrix)
+    for j in range(2):
+        np.testing.assert_array_equal(table.iloc[j].to_numpy(), summary_stats(pd.Series(matrix[:, j]))["Strategy"].to_numpy())
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ohlcv
+from trading_lab.backtest.metrics import summary_stats
+from trading_lab.machineLearning.strategy import (backtest_prediction_matrix, backtest_predictions,
+                                                  predictions_to_signal, walk_forward_backtest)
+
+
+def test_predictions_to_signal():
+    np.testing.assert_array_equal(predictions_to_signal([1, np.nan, -1, 0]), [1, 0, -1, 0])
+    with pytest.raises(ValueError, match="-1, 0 or 1"):
+        predictions_to_signal([2, 0])
+
+
+def test_backtest_predictions_follows_the_signal(prices):
+    preds = pd.Series(0, index=prices.index[:200])
+    preds.iloc[[10, 120]] = 1
+    preds.iloc[[60, 150]] = -1
+
+    res = backtest_predictions(prices, preds)
+
+    assert res["pos"].iloc[10:60].eq(1).all() and res["pos"].iloc[60:120].eq(0).all()
+    close = prices["adj close"].iloc[:200]
+    expected = (close.iloc[60] / close.iloc[10]) * (close.iloc[150] / close.iloc[120])
+    assert res["eq_curve"].iloc[-1] == pytest.approx(1000 * expected)
+
+
+def test_backtest_predictions_only_holds(prices):
+    res = backtest_predictions(prices, pd.Series(0, index=prices.index[:50]))
+    assert res["rets"].eq(0).all() and res["eq_curve"].eq(1000).all()
+
+
+def test_prediction_matrix_matches_single_ticker_backtests(panel):
+    rng = np.random.default_rng(4)
+    preds = pd.DataFrame(rng.choice([-1.0, 0.0, 1.0], size=panel.shape, p=[0.1, 0.8, 0.1]),
+                         index=panel.index, columns=panel.columns)
+    preds.iloc[:100, 1] = np.nan                        # Late start
+    preds.iloc[300:320, 2] = np.nan                     # Gap
+    preds.iloc[700:, 3] = np.nan                        # Early end
+    preds.iloc[:, 4] = 0.0                              # Only holds
+    preds.iloc[:, 5] = np.nan                           # No row at all
+    prices = panel.copy()
+    prices.iloc[500, 0] = np.nan                        # Missing price
+
+    tables = backtest_prediction_matrix(prices.to_numpy(), preds.to_numpy())
+
+    for j, ticker in enumerate(panel.columns[:5]):
+        res = backtest_predictions(prices[ticker], preds[ticker].dropna())
+        for name in ("pos", "rets", "eq_curve"):
+            column = pd.Series(tables[name][:, j], index=panel.index).dropna()
+            np.testing.assert_allclose(column.to_numpy(), res[name].to_numpy(), rtol=1e-12)
+            assert column.index.equals(res.index)
+    assert np.isnan(tables["pos"][:, 5]).all()
+
+
+@pytest.fixture
+def universe():
+    frames = [ohlcv(900, seed=seed) for seed in range(3)]
+    prices = pd.DataFrame({f"T{j}": df["Adj Close"] for j, df in enumerate(frames)})
+    volume = pd.DataFrame({f"T{j}": df["Volume"] for j, df in enumerate(frames)})
+    prices.iloc[:650, 2] = volume.iloc[:650, 2] = np.nan        # Listed during the test windows
+    return prices, volume
+
+
+def test_walk_forward_backtest(universe):
+    pytest.importorskip("xgboost")
+    prices, volume = universe
+    res = walk_forward_backtest(prices, volume, {"n_estimators": 5, "max_depth": 2, "n_jobs": 1},
+                                n_splits=3, test_size=100)
+
+    assert len(res.folds) == 3 and res.predictions.shape == (300, 3)
+    assert (res.folds["train_end"] < res.folds["test_start"]).all()
+
+    # Stats of the late listing only cover its own predicted dates
+    late = res.rets["T2"].dropna()
+    assert 0 < len(late) < len(res.rets)
+    expected = summary_stats(late, pos=res.pos["T2"].dropna(), extended=True)["Strategy"]
+    pd.testing.assert_series_equal(res.stats.loc["T2"], expected, check_names=False, atol=1e-4)
+    for ticker in ("T0", "T1"):
+        expected = summary_stats(res.rets[ticker], pos=res.pos[ticker], extended=True)["Strategy"]
+        pd.testing.assert_series_equal(res.stats.loc[ticker], expected, check_names=False, atol=1e-4)
+
+    book = res.book(rebalance=None)
+    assert len(book.rets) == len(res.rets)
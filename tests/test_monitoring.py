@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from trading_lab.backtest.metrics import EXTRA_METRICS, METRICS, summary_stats
+from trading_lab.backtest.monitoring import OnlineStats, _window_max_drawdown, rolling_stats
+
+
+def _rets(n: int = 800, seed: int = 11) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0.0004, 0.012, n)
+    values[rng.random(n) < 0.4] = 0.0
+    values[[10, 400]] = np.nan
+    return pd.Series(values, index=pd.bdate_range("2015-01-01", periods=n))
+
+def test_online_summary_equals_summary_stats():
+    rets = _rets()
+    online = OnlineStats(rf=0.01)
+    online.update_many(rets)
+    pd.testing.assert_frame_equal(online.summary(), summary_stats(rets, rf=0.01))
+
+def test_online_resumes_from_state():
+    rets = _rets()
+    whole = OnlineStats()
+    whole.update_many(rets)
+
+    first = OnlineStats()
+    first.update_many(rets[:300])
+    resumed = OnlineStats.from_state(json.loads(json.dumps(first.state())))
+    resumed.update_many(rets[300:])
+    assert resumed.stats() == whole.stats()
+
+def test_rolling_rows_equal_the_window_stats():
+    rets = _rets().fillna(0.0)
+    window = 126
+    rolling = rolling_stats(rets, window=window)
+    assert rolling.iloc[:window - 1].isna().all().all()
+
+    for end in (window, 500, len(rets)):
+        expected = summary_stats(rets.iloc[end - window:end])["Strategy"]
+        row = rolling.iloc[end - 1]
+        for name in expected.index:
+            assert abs(row[name] - expected[name]) < 1e-4, name
+
+def test_rolling_columns_follow_summary_stats():
+    rolling = rolling_stats(_rets(), window=20)
+    assert list(rolling.columns) == METRICS + EXTRA_METRICS[:1] + ["Current Drawdown"]
+
+def test_rolling_max_and_current_drawdown():
+    rets = pd.Series([0.1, -0.5, 0.2, 0.0, 0.0])
+    rolling = rolling_stats(rets, window=3)
+    # Window 0..2 falls by half then recovers 20%: max 0.5, current 0.4
+    assert np.isclose(rolling["Max Drawdown"].iloc[2], 0.5)
+    assert np.isclose(rolling["Current Drawdown"].iloc[2], 0.4)
+    # The fall is the first return of window 1..3, summary_stats does not count it either
+    assert np.isclose(rolling["Max Drawdown"].iloc[3], 0.0)
+
+def test_window_max_drawdown_backends():
+    eq_curve = (1 + _rets(3000).fillna(0.0)).cumprod().to_numpy()
+    expected = _window_max_drawdown.loop(eq_curve, 100)
+    np.testing.assert_allclose(_window_max_drawdown.fallback(eq_curve, 100), expected, equal_nan=True)
+    np.testing.assert_allclose(_window_max_drawdown(eq_curve, 100), expected, equal_nan=True)
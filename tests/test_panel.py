@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ohlcv
+from trading_lab.machineLearning.data import create_features, create_target
+from trading_lab.machineLearning.panel import FEATURES, panel_features, panel_target, panel_to_long
+
+
+@pytest.fixture
+def universe():
+    frames = [ohlcv(700, seed=seed) for seed in range(4)]
+    prices = pd.DataFrame({f"T{j}": df["Adj Close"] for j, df in enumerate(frames)})
+    volume = pd.DataFrame({f"T{j}": df["Volume"] for j, df in enumerate(frames)})
+    prices.iloc[:100, 1] = volume.iloc[:100, 1] = np.nan        # Late listing
+    prices.iloc[600:, 2] = volume.iloc[600:, 2] = np.nan        # Delisting
+    prices.iloc[300:305, 0] = volume.iloc[300:305, 0] = np.nan  # Gap
+    prices.iloc[400, 3] = np.nan                                # Single missing price
+    return frames, prices, volume
+
+
+def test_columns_match_create_features_with_gaps(universe):
+    frames, prices, volume = universe
+    out, names = panel_features(prices, volume, cross_sectional=None, dtype=np.float64)
+
+    assert names == FEATURES
+    for j, ticker in enumerate(prices.columns):
+        df = frames[j].assign(**{"Adj Close": prices[ticker], "Volume": volume[ticker]})
+        listed = prices.index.get_loc(prices[ticker].first_valid_index())
+        expected = create_features(df.iloc[listed:])[FEATURES].to_numpy()
+        np.testing.assert_allclose(out[listed:, j], expected, rtol=1e-9, equal_nan=True)
+
+
+def test_threads_and_blocks_give_the_same_features(universe):
+    _, prices, volume = universe
+    serial, _ = panel_features(prices, volume)
+    threaded, _ = panel_features(prices, volume, n_workers=2, block_size=1)
+    np.testing.assert_array_equal(serial, threaded)
+
+
+def test_cross_sectional_ranks(universe):
+    _, prices, volume = universe
+    out, names = panel_features(prices, volume, cross_sectional=["rets_5d"], dtype=np.float64)
+
+    ranks = out[:, :, names.index("rets_5d_rank")]
+    expected = pd.DataFrame(out[:, :, names.index("rets_5d")]).rank(axis=1, pct=True).to_numpy()
+    np.testing.assert_allclose(ranks, expected, equal_nan=True)
+    zscores = out[-1, :, names.index("rets_5d_z")]
+    assert np.nanmean(zscores) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_target_and_long_format(universe):
+    frames, prices, volume = universe
+    out, names = panel_features(prices, volume)
+    target = panel_target(prices)
+
+    expected = create_target(frames[3].assign(**{"Adj Close": prices["T3"]})).to_numpy()[:-5]
+    np.testing.assert_array_equal(target[:-5, 3][~np.isnan(target[:-5, 3])],
+                                  expected[~np.isnan(prices["T3"].to_numpy()[:-5])])
+    assert np.isnan(target[:100, 1]).all()
+
+    X, y = panel_to_long(out, names, prices.index, list(prices.columns), target)
+    assert not X.isna().any().any() and len(X) == len(y)
+    assert X.index.names == ["date", "ticker"]
+    t1_dates = X.xs("T1", level="ticker").index
+    assert t1_dates.min() > prices.index[100]
+
+
+def test_shape_mismatch(universe):
+    _, prices, volume = universe
+    with pytest.raises(ValueError, match="same"):
+        panel_features(prices, volume.iloc[:, :2])
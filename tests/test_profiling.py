@@ -0,0 +1,110 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from trading_lab import profiling
+from trading_lab.backtest.batch import run_batch
+from trading_lab.backtest.engine import run_backtest
+from trading_lab.strategies.strategies import SMA_CROSS
+
+
+@pytest.fixture(autouse=True)
+def no_global_profiler():
+    previous = profiling.disable()
+    yield
+    profiling.disable()
+    if previous is not None:
+        profiling.enable(previous)
+
+
+def test_stages_are_no_ops_when_disabled():
+    assert profiling.stage("a") is profiling.stage("b")
+
+    @profiling.timed("test.f")
+    def f(x):
+        return x + 1
+
+    assert f(1) == 2 and profiling.active() is None
+
+
+def test_nested_stages_and_enclosing_profiler():
+    with profiling.profiling() as outer:
+        with profiling.profiling() as inner:
+            with profiling.stage("test.outer"):
+                for _ in range(3):
+                    with profiling.stage("test.inner"):
+                        time.sleep(0.001)
+
+    for profiler in (inner, outer):
+        assert profiler.stages["test.inner"]["count"] == 3
+        assert profiler.stages["test.inner"]["self_ns"] == profiler.stages["test.inner"]["total_ns"]
+        assert profiler.stages["test.outer"]["self_ns"] < profiler.stages["test.outer"]["total_ns"]
+        assert profiler.stages["test.outer"]["total_ns"] >= profiler.stages["test.inner"]["total_ns"]
+    summary = outer.summary()
+    assert summary.loc["test.outer", "share"] == pytest.approx(1.0)
+    assert summary.loc["test.inner", "p50_ms"] >= 1.0
+
+
+def test_nested_profile_inside_a_timed_stage_is_not_counted_twice():
+    @profiling.timed("test.outer")
+    def outer():
+        time.sleep(0.002)
+        # e.g. run_backtest(profile=True) called from a timed function
+        with profiling.profiling():
+            with profiling.stage("test.inner"):
+                time.sleep(0.005)
+
+    start = time.perf_counter_ns()
+    with profiling.profiling() as profiler:
+        outer()
+    wall_ns = time.perf_counter_ns() - start
+
+    stages = profiler.stages
+    assert stages["test.outer"]["total_ns"] >= stages["test.inner"]["total_ns"]
+    assert stages["test.outer"]["self_ns"] == stages["test.outer"]["total_ns"] - stages["test.inner"]["total_ns"]
+    assert sum(stats["self_ns"] for stats in stages.values()) == stages["test.outer"]["total_ns"] <= wall_ns
+    assert profiler.summary()["share"].max() == pytest.approx(1.0)
+
+
+def test_merge_and_dict_round_trip():
+    a, b = profiling.Profiler(trace=True), profiling.Profiler(trace=True)
+    a.record("s", a._t0, 2_000)
+    b.record("s", b._t0, 8_000)
+    b.record("t", b._t0, 1_000)
+
+    merged = profiling.Profiler.from_dict(json.loads(json.dumps(a.to_dict()))).merge(b.to_dict())
+
+    assert merged.stages["s"]["count"] == 2 and merged.stages["s"]["total_ns"] == 10_000
+    assert merged.stages["s"]["min_ns"] == 2_000 and merged.stages["s"]["max_ns"] == 8_000
+    assert sum(merged.stages["s"]["hist"]) == 2 and "t" in merged.stages
+    assert len(merged.events) == 3
+
+
+def test_chrome_trace(tmp_path, prices):
+    with profiling.profiling(trace=True) as profiler:
+        run_backtest(SMA_CROSS, prices)
+    profiler.to_chrome_trace(tmp_path / "trace.json")
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert events and {event["ph"] for event in events} == {"X"}
+    assert {"engine.indicators", "indicators.sma"} <= {event["name"] for event in events}
+
+
+def test_memory_tracking(prices):
+    with profiling.profiling(memory=True) as profiler:
+        run_backtest(SMA_CROSS, prices)
+    assert profiler.stages["engine.indicators"]["peak_bytes"] > 0
+
+
+def test_run_backtest_profile_returns_the_same_table(prices):
+    res, summary = run_backtest(SMA_CROSS, prices, profile=True)
+    pd.testing.assert_frame_equal(res, run_backtest(SMA_CROSS, prices))
+    assert "engine.indicators" in summary.index
+
+
+def test_run_batch_merges_worker_stages(panel):
+    res, summary = run_batch(panel, "sma_cross", n_workers=2, chunksize=3, profile=True)
+    pd.testing.assert_frame_equal(res, run_batch(panel, "sma_cross", n_workers=1))
+    assert summary.loc["indicators.sma", "count"] >= 2 * len(panel.columns)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from trading_lab.machineLearning import registry as registry_module
+from trading_lab.machineLearning.models import grid_search, train_xgboost
+from trading_lab.machineLearning.registry import ModelRegistry, config_hash, data_fingerprint
+
+pytest.importorskip("xgboost")
+
+PARAMS = {"n_estimators": 5, "max_depth": 2, "n_jobs": 1}
+
+
+def test_config_hash_depends_on_params_and_data(ml_data):
+    X, y = ml_data
+    key = config_hash(PARAMS, X, y)
+
+    assert config_hash(dict(reversed(PARAMS.items())), X.copy(), y.copy()) == key
+    assert config_hash(PARAMS, X, y, data_hash=data_fingerprint(X, y)) == key
+    assert config_hash({**PARAMS, "max_depth": 3}, X, y) != key
+    assert config_hash(PARAMS, X.iloc[1:], y.iloc[1:]) != key
+
+
+def test_save_load_and_cache_hit(ml_data, tmp_path):
+    X, y = ml_data
+    registry = ModelRegistry(tmp_path)
+    calls = []
+
+    def train(X_train, y_train, params):
+        calls.append(params)
+        return train_xgboost(X_train, y_train, params)
+
+    model = registry.get_or_train(PARAMS, X, y, train=train)
+    again = registry.get_or_train(PARAMS, X, y, train=train)
+
+    assert len(calls) == 1
+    np.testing.assert_array_equal(again.predict(X), model.predict(X))
+    meta = registry.list().iloc[0]
+    assert meta["features"] == list(X.columns) and meta["data_fingerprint"] == data_fingerprint(X, y)
+    with pytest.raises(ValueError, match="No model"):
+        registry.load("missing")
+
+
+def test_evicts_least_recently_used(ml_data, tmp_path):
+    X, y = ml_data
+    registry = ModelRegistry(tmp_path)
+    first = registry.save(train_xgboost(X, y, PARAMS), PARAMS, X, y)
+    second_params = {**PARAMS, "max_depth": 3}
+    registry.save(train_xgboost(X, y, second_params), second_params, X, y)
+
+    registry.max_bytes = registry.list()["nbytes"].max()
+    deleted = registry.evict()
+
+    assert deleted == [first]
+    assert registry.get(PARAMS, X, y) is None
+
+
+def test_grid_search_hashes_the_training_set_once(ml_data, tmp_path, monkeypatch):
+    X, y = ml_data
+    calls = []
+    original = registry_module.data_fingerprint
+    monkeypatch.setattr(registry_module, "data_fingerprint", lambda *args: calls.append(1) or original(*args))
+
+    grid = {"n_estimators": [3, 5], "max_depth": [2], "n_jobs": [1]}
+    best_params, _, results = grid_search(X.iloc[:600], y.iloc[:600], X.iloc[600:], y.iloc[600:], grid,
+                                          registry=ModelRegistry(tmp_path))
+
+    assert len(results) == 2 and best_params in results.drop(columns="val_accuracy").to_dict("records")
+    assert len(calls) == 1
@@ -0,0 +1,42 @@
+import itertools
+
+import pytest
+
+from trading_lab.machineLearning.search import (budget_rungs, decode_combination, grid_size,
+                                                halving_search, sample_combinations)
+
+GRID = {"max_depth": [2, 3, 4], "learning_rate": [0.05, 0.1], "gamma": [0.0, 0.5, 1.0, 2.0]}
+
+
+def test_decoding_follows_product_order():
+    assert grid_size(GRID) == 24
+    product = [dict(zip(GRID, combo)) for combo in itertools.product(*GRID.values())]
+    assert [decode_combination(GRID, index) for index in range(24)] == product
+
+def test_sampling_is_distinct_and_seeded():
+    sample = sample_combinations(GRID, 10, seed=1)
+    assert len({tuple(params.values()) for params in sample}) == 10
+    assert sample == sample_combinations(GRID, 10, seed=1)
+    assert len(sample_combinations(GRID, 100)) == 24
+
+def test_budget_rungs():
+    assert budget_rungs(10, 100, eta=3) == [10, 30, 90, 100]
+    assert budget_rungs(50, 50) == [50]
+
+def test_halving_search_resumes_from_checkpoint(ml_data, tmp_path):
+    pytest.importorskip("xgboost")
+    X, y = ml_data
+    split = int(len(X) * 0.7)
+    args = (X.iloc[:split], y.iloc[:split], X.iloc[split:], y.iloc[split:],
+            {"max_depth": [2, 3], "learning_rate": [0.1, 0.3], "n_estimators": [5, 15]})
+
+    best_params, model, results = halving_search(*args, n_trials=4, n_workers=1, checkpoint_dir=tmp_path)
+    assert best_params["n_estimators"] == 15
+    assert list(results["rung"].value_counts().sort_index()) == [4, 2]
+    assert model.get_booster().num_boosted_rounds() == 15
+
+    # Every trial is in the checkpoint, a rerun trains nothing and gives the same results
+    n_lines = len((tmp_path / "trials.jsonl").read_text().splitlines())
+    again = halving_search(*args, n_trials=4, n_workers=1, checkpoint_dir=tmp_path)
+    assert len((tmp_path / "trials.jsonl").read_text().splitlines()) == n_lines
+    assert again[0] == best_params
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from trading_lab.data import store
+from trading_lab.data.store import import_cached, load_panel, load_prices, missing_ranges, _merge_intervals
+
+from conftest import ohlcv
+
+
+class FakeProvider:
+    """
+    Serves a synthetic OHLCV history, only the bars published before 'today', and records every call
+    """
+    def __init__(self, start: str = "2020-01-01", n: int = 2000, today: str | None = None):
+        self.history = ohlcv(n, seed=3, start=start)
+        self.today = pd.Timestamp(today) if today else None
+        self.calls = []
+
+    def __call__(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        self.calls.append((start, end))
+        dates = self.history.index
+        mask = (dates >= pd.Timestamp(start)) & (dates < pd.Timestamp(end))
+        if self.today is not None:
+            mask &= dates < self.today
+        return self.history.loc[mask]
+
+
+def test_merge_intervals():
+    merged = _merge_intervals([["2020-03-01", "2020-04-01"], ["2020-01-01", "2020-02-01"],
+                               ["2020-02-01", "2020-02-15"], ["2020-03-15", "2020-05-01"]])
+    assert merged == [["2020-01-01", "2020-02-15"], ["2020-03-01", "2020-05-01"]]
+
+def test_round_trip_served_from_store(tmp_path):
+    provider = FakeProvider()
+    first = load_prices("fake", "2020-02-01", "2021-01-01", root=tmp_path, provider=provider)
+    second = load_prices("fake", "2020-02-01", "2021-01-01", root=tmp_path, provider=provider)
+
+    assert provider.calls == [("2020-02-01", "2021-01-01")]
+    pd.testing.assert_frame_equal(first, second)
+    expected = provider.history.loc["2020-02-01":"2020-12-31"]
+    pd.testing.assert_series_equal(first["Adj Close"], expected["Adj Close"], check_names=False, check_freq=False)
+
+def test_only_head_and_tail_gaps_are_fetched(tmp_path):
+    provider = FakeProvider()
+    load_prices("fake", "2020-06-01", "2020-09-01", root=tmp_path, provider=provider)
+    df = load_prices("fake", "2020-03-01", "2020-12-01", root=tmp_path, provider=provider)
+
+    assert provider.calls == [("2020-06-01", "2020-09-01"), ("2020-03-01", "2020-06-01"), ("2020-09-01", "2020-12-01")]
+    assert missing_ranges("fake", "2020-03-01", "2020-12-01", root=tmp_path) == []
+    assert df.index.is_monotonic_increasing and not df.index.has_duplicates
+    assert df.index[0] >= pd.Timestamp("2020-03-01") and df.index[-1] < pd.Timestamp("2020-12-01")
+
+def test_coverage_stops_at_today(tmp_path, monkeypatch):
+    provider = FakeProvider(start="2026-01-01", n=400, today="2026-10-17")
+    monkeypatch.setattr(store, "_today", lambda: pd.Timestamp("2026-10-18"))
+    load_prices("fake", "2026-01-01", "2027-01-01", root=tmp_path, provider=provider)
+    assert missing_ranges("fake", "2026-01-01", "2027-01-01", root=tmp_path) == [["2026-10-18", "2027-01-01"]]
+
+    # Later on, the bars published since are fetched
+    provider.today = pd.Timestamp("2026-12-02")
+    monkeypatch.setattr(store, "_today", lambda: pd.Timestamp("2026-12-02"))
+    df = load_prices("fake", "2026-01-01", "2027-01-01", root=tmp_path, provider=provider)
+    assert provider.calls[-1] == ("2026-10-18", "2027-01-01")
+    assert df.index[-1] == pd.Timestamp("2026-12-01")
+
+def test_offline_never_calls_the_provider(tmp_path):
+    provider = FakeProvider()
+    df = load_prices("fake", "2020-01-01", "2020-06-01", root=tmp_path, provider=provider, offline=True)
+    assert provider.calls == [] and df.empty
+
+def test_import_cached_layout(tmp_path):
+    df = import_cached("fake", "2020-01-01", "2020-06-01", raw=False, root=tmp_path, provider=FakeProvider())
+    assert list(df.columns) == ["adj close"]
+    assert df.index.name == "Date" and df.attrs["name"] == "fake"
+
+def test_load_panel_aligns_tickers(tmp_path):
+    provider = FakeProvider()
+    load_prices("late", "2020-01-01", "2020-03-01", root=tmp_path, provider=lambda *a: provider.history.iloc[:0])
+    panel = load_panel(["fake", "late"], "2020-01-01", "2020-03-01", root=tmp_path, provider=provider)
+    assert list(panel.columns) == ["fake", "late"]
+    assert panel["late"].isna().all() and panel["fake"].notna().all()
+
+def test_write_prices_needs_a_range_for_empty_tables(tmp_path):
+    with pytest.raises(ValueError):
+        store.write_prices(pd.DataFrame(), "fake", root=tmp_path)
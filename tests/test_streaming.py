@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+import pytest
+
+from trading_lab.indicators.indicators import add_rsi, add_sma
+from trading_lab.indicators.streaming import RollingSMA, WilderRSI, indicator_from_state
+
+
+@pytest.mark.parametrize("indicator, add, length, column", [
+    (RollingSMA, add_sma, 20, "sma_20"),
+    (WilderRSI, add_rsi, 14, "RSI_14"),
+])
+def test_streaming_equals_batch_exactly(prices, indicator, add, length, column):
+    values = prices["adj close"].to_numpy()
+    streamed = indicator(length).update_many(values)
+    batch = add(prices.copy(), length)[column].to_numpy()
+    np.testing.assert_array_equal(streamed, batch)
+
+@pytest.mark.parametrize("make", [lambda: RollingSMA(30), lambda: WilderRSI(10)])
+def test_resume_from_state(prices, make):
+    values = prices["adj close"].to_numpy()
+    full = make().update_many(values)
+
+    first = make()
+    head = first.update_many(values[:700])
+    resumed = indicator_from_state(json.loads(json.dumps(first.state())))
+    tail = resumed.update_many(values[700:])
+    np.testing.assert_array_equal(np.concatenate([head, tail]), full)
+
+def test_sma_handles_missing_bars():
+    values = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0])
+    sma = RollingSMA(2).update_many(values)
+    np.testing.assert_array_equal(np.isnan(sma), [True, False, True, True, False, False, False])
+    assert sma[-1] == 6.5
+
+def test_invalid_length():
+    with pytest.raises(ValueError):
+        RollingSMA(0)
+    with pytest.raises(ValueError):
+        WilderRSI(-1)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading_lab.backtest.metrics import summary_stats
+from trading_lab.backtest.portfolio import signal_to_pos, strat_rets
+from trading_lab.backtest.sweep import rolling_means, sweep_sma
+from trading_lab.strategies.strategies import sma_cross
+
+
+def test_rolling_means_match_pandas(prices):
+    # The means are of the centered prices, shifted back here
+    values = prices["adj close"].to_numpy()
+    means = rolling_means(values, [5, 50])
+    for window, sma in means.items():
+        np.testing.assert_allclose(sma + values.mean(), prices["adj close"].rolling(window).mean().to_numpy(), rtol=1e-10)
+
+def test_sweep_matches_the_dataframe_pipeline(prices):
+    res = sweep_sma(prices, fast_range=[5, 10, 60], slow_range=[20, 50])
+    # fast < slow only: (5, 20), (10, 20), (5, 50), (10, 50)
+    assert list(zip(res["fast_sma"], res["slow_sma"])) == [(5, 20), (10, 20), (5, 50), (10, 50)]
+
+    for _, row in res.iterrows():
+        df = sma_cross(prices.copy(), int(row["fast_sma"]), int(row["slow_sma"]))
+        rets = strat_rets(df, signal_to_pos(df))
+        rets[rets.abs() <= 1e-12] = 0.0
+        expected = summary_stats(rets.fillna(0))["Strategy"]
+        np.testing.assert_allclose(row[expected.index].to_numpy(dtype=float), expected.to_numpy(), atol=2e-4)
+
+def test_costs_only_lower_returns(prices):
+    gross = sweep_sma(prices, [5], [20])
+    net = sweep_sma(prices, [5], [20], fee=0.001, slippage_bps=5)
+    assert net["Annualized Return"].iloc[0] < gross["Annualized Return"].iloc[0]
+
+def test_invalid_grids(prices):
+    with pytest.raises(ValueError):
+        sweep_sma(prices, [50], [20])
+    with pytest.raises(ValueError):
+        sweep_sma(prices, [5], [len(prices)])
+    with pytest.raises(ValueError):
+        sweep_sma(pd.Series([1.0, np.nan, 2.0] * 20), [2], [3])
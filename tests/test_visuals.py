@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from trading_lab.backtest.portfolio import equity_curve, signal_to_pos, strat_rets
+from trading_lab.backtest.visuals import (backtest_panels, downsample, lttb_indices, minmax_indices,
+                                          plot_backtest, render_pngs)
+from trading_lab.strategies.strategies import rsi_cross, sma_cross
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(3)
+    values = np.cumsum(rng.normal(size=20_000))
+    values[[123, 9_876]] = values.max() + 5, values.min() - 5     # Spikes any plot must show
+    values[500:510] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("method", ["minmax", "lttb"])
+def test_downsampling_keeps_extremes_and_endpoints(values, method):
+    idx = downsample(values, 200, method=method, keep=[7, 15_000])
+
+    assert np.all(np.diff(idx) > 0)
+    assert {0, values.size - 1, 123, 9_876, 7, 15_000} <= set(idx.tolist())
+    assert len(idx) <= 210
+    assert not np.isnan(values[idx[1:-1]]).any()
+
+
+def test_minmax_takes_the_extremes_of_every_bucket(values):
+    idx = minmax_indices(values, 100)
+    size = -(-values.size // 100)
+    for start in range(0, values.size, size):
+        block = values[start:start + size]
+        if not np.isnan(block).all():
+            assert start + np.nanargmin(block) in idx and start + np.nanargmax(block) in idx
+
+
+def test_small_inputs_are_kept_whole():
+    np.testing.assert_array_equal(minmax_indices(np.arange(10.0), 10), np.arange(10))
+    np.testing.assert_array_equal(lttb_indices(np.arange(10.0), 20), np.arange(10))
+    assert lttb_indices(np.arange(1000.0), 50).size == 50
+    with pytest.raises(ValueError, match="Unknown method"):
+        downsample(np.arange(10.0), 5, method="nope")
+
+
+@pytest.fixture
+def table(prices):
+    df = sma_cross(prices.copy(), fast_ma=20, slow_ma=50)
+    pos = signal_to_pos(df)
+    return df, equity_curve(strat_rets(df, pos).fillna(0))
+
+
+def test_panels_keep_every_trade(table):
+    df, eq_curve = table
+    panels = backtest_panels(df, eq_curve, n_points=100)
+
+    buys, sells = df.index[df["signal"] == 1], df.index[df["signal"] == -1]
+    assert len(panels["buys"][0]) == len(buys) and len(panels["sells"][0]) == len(sells)
+    price_dates = set(panels["price"][0])
+    assert set(buys.to_numpy()) <= price_dates and set(sells.to_numpy()) <= price_dates
+    assert len(panels["price"][0]) < len(df)
+    assert set(panels["overlays"]) == {"sma_20", "sma_50"} and panels["equity"] is not None
+
+
+def test_plot_and_render_pngs(table, prices, tmp_path):
+    pytest.importorskip("matplotlib")
+    df, eq_curve = table
+    rsi = rsi_cross(prices.copy(), 14)
+
+    fig = plot_backtest(df, eq_curve, title="sma", width=300, height=200)
+    assert len(fig.axes) == 2
+
+    paths = render_pngs({"sma": (df, eq_curve), "rsi": rsi}, tmp_path / "png", width=300, height=200,
+                        n_workers=1)
+    assert sorted(paths) == sorted(str(tmp_path / "png" / f"{name}.png") for name in ("sma", "rsi"))
+    for path in paths:
+        with open(path, "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"